@@ -0,0 +1,32 @@
+"""Shared fixtures for the judge test modules"""
+
+import threading
+
+import pytest
+
+from scripts.stub_llm_server import StubConfig, create_server
+from src import llm
+
+
+@pytest.fixture
+def stub_api(tmp_path, monkeypatch):
+    """Point the LLM client at a stub server with a fresh cache; yields its config."""
+    config = StubConfig()
+    server = create_server(port=0, config=config)
+    thread = threading.Thread(target=server.serve_forever, daemon=True)
+    thread.start()
+
+    monkeypatch.setenv("OPENAI_API_KEY", "test-key")
+    monkeypatch.setenv("OPENAI_API_BASE", f"http://127.0.0.1:{server.server_port}/v1")
+    monkeypatch.setenv("LLM_CACHE_PATH", str(tmp_path / "cache.sqlite3"))
+    monkeypatch.setenv("LLM_MAX_RETRIES", "0")
+    monkeypatch.delenv("LLM_CASSETTE_MODE", raising=False)
+    llm.reset_openai_client()
+    llm.get_memory_cache().clear()
+    try:
+        yield config
+    finally:
+        server.shutdown()
+        server.server_close()
+        llm.reset_openai_client()
+        llm.get_memory_cache().clear()
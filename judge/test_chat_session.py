@@ -0,0 +1,74 @@
+"""Tests for multi-turn ChatSession history handling"""
+
+import asyncio
+
+import pytest
+
+from src.chat_session import ChatSession
+
+
+def filled_session(turns=4):
+    """A session whose next turn must trim old turns to fit the budget."""
+    session = ChatSession(system_msg="You fix CI.", max_tokens=100, token_budget=400, keep_turns=1)
+    for index in range(turns):
+        session.history += [
+            {"role": "user", "content": f"turn {index} " + "x" * 800},
+            {"role": "assistant", "content": f"reply {index}"},
+        ]
+    return session
+
+
+class TestChatSession:
+
+    def test_successful_turn_trims_and_appends(self, stub_api):
+        session = filled_session()
+
+        reply = session.send("Initial CI status: pass")
+
+        assert not reply.startswith("Error calling API")
+        assert session.dropped_turns > 0
+        assert session.history[-1] == {"role": "assistant", "content": reply}
+
+    def test_failed_turn_restores_trimmed_history(self, stub_api):
+        session = filled_session()
+        before = list(session.history)
+        stub_api.error_rate = 1.0
+
+        reply = session.send("Initial CI status: pass")
+
+        assert reply.startswith("Error calling API")
+        assert session.history == before
+        assert session.dropped_turns == 0
+
+    def test_raised_error_restores_trimmed_history(self, stub_api):
+        session = filled_session()
+        session.raise_on_error = True
+        before = list(session.history)
+        stub_api.error_rate = 1.0
+
+        with pytest.raises(Exception):
+            session.send("Initial CI status: pass")
+
+        assert session.history == before
+        assert session.dropped_turns == 0
+
+    def test_async_failed_turn_restores_trimmed_history(self, stub_api):
+        session = filled_session()
+        before = list(session.history)
+        stub_api.error_rate = 1.0
+
+        reply = asyncio.run(session.asend("Initial CI status: pass"))
+
+        assert reply.startswith("Error calling API")
+        assert session.history == before
+
+    def test_retry_after_failure_sees_full_history(self, stub_api):
+        session = filled_session()
+        stub_api.error_rate = 1.0
+        session.send("Initial CI status: pass")
+        stub_api.error_rate = 0.0
+
+        session.send("Initial CI status: pass")
+
+        assert session.dropped_turns > 0
+        assert [m["role"] for m in session.history[-2:]] == ["user", "assistant"]
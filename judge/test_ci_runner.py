@@ -0,0 +1,135 @@
+"""Tests for the in-process CI runner and the workspace CIPipeline"""
+
+import importlib
+import os
+
+import pytest
+
+from scripts.create_baseline import create_baseline
+from src.llm import _cache_key
+from src.tools.ci_runner import (
+    collect_ci_timings,
+    load_ci_pipeline,
+    parse_checks,
+    run_ci_pipeline,
+)
+
+
+def make_workspace(tmp_path, seed=None):
+    workspace = tmp_path / "workspace"
+    create_baseline(str(workspace))
+    if seed:
+        importlib.import_module(f"scenarios.{seed}").induce_errors(str(workspace))
+    return workspace
+
+
+class TestParseChecks:
+
+    @pytest.mark.parametrize(
+        "checks, expected",
+        [
+            ("syntax,lint", ["syntax", "lint"]),
+            ("lint, syntax", ["syntax", "lint"]),
+            ("tests security", ["tests", "security"]),
+            (["config"], ["config"]),
+            ("syntax,,syntax", ["syntax"]),
+        ],
+    )
+    def test_subsets_in_pipeline_order(self, checks, expected):
+        assert parse_checks(checks) == expected
+
+    @pytest.mark.parametrize(
+        "checks",
+        ["", None, "all", "syntax,unknown", [], "syntax,lint,tests,dependencies,config,security"],
+    )
+    def test_full_pipeline(self, checks):
+        assert parse_checks(checks) is None
+
+
+class TestRunCIPipeline:
+
+    @pytest.mark.parametrize("seed", ["seed_lint", "seed_syntax"])
+    def test_same_tree_gives_same_observation(self, tmp_path, seed):
+        workspace = make_workspace(tmp_path, seed)
+
+        with collect_ci_timings() as timings:
+            first = run_ci_pipeline(str(workspace), parallel=True)
+            second = run_ci_pipeline(str(workspace), parallel=True)
+
+        assert first["status"] == second["status"] == "fail"
+        assert "timings" not in first and "timings" not in second
+        # Wall times still reach telemetry
+        assert len(timings) == 2 and "total" in timings[0]["timings"]
+
+        observations = [f"Initial CI status: {r}" for r in (first, second)]
+        keys = {_cache_key(o, None, None, "gpt-4o-mini", 1000) for o in observations}
+        assert len(keys) == 1
+
+    def test_passing_tree_result_is_stable(self, tmp_path):
+        workspace = make_workspace(tmp_path)
+
+        first = run_ci_pipeline(str(workspace), parallel=True)
+        second = run_ci_pipeline(str(workspace), parallel=True)
+
+        assert first == second == {"action": "run_ci_pipeline", "status": "pass"}
+
+
+class TestCIPipelineCache:
+
+    CHECKS = ["syntax", "lint", "config", "security"]
+
+    def run(self, workspace, use_cache=True):
+        pipeline_class = load_ci_pipeline(workspace / "ci_pipeline.py").CIPipeline
+        result = pipeline_class(workspace, use_cache=use_cache).run_all_checks(only=self.CHECKS)
+        result.pop("timings")
+        return result
+
+    def test_cached_run_matches_uncached(self, tmp_path):
+        workspace = make_workspace(tmp_path, "seed_lint")
+
+        cold = self.run(workspace)
+        assert (workspace / ".ci_cache").exists()
+        assert self.run(workspace) == cold == self.run(workspace, use_cache=False)
+
+    def test_same_size_edit_with_restored_mtime_is_rechecked(self, tmp_path):
+        workspace = make_workspace(tmp_path)
+        calculator = workspace / "calculator.py"
+        assert self.run(workspace)["overall_status"] == "pass"
+
+        stat = calculator.stat()
+        source = calculator.read_text()
+        broken = source.replace("def add(a, b):", "def add(a, b)!", 1)
+        assert len(broken) == len(source)
+        calculator.write_text(broken)
+        os.utime(calculator, ns=(stat.st_atime_ns, stat.st_mtime_ns))
+
+        assert self.run(workspace, use_cache=False)["overall_status"] == "fail"
+        assert self.run(workspace)["overall_status"] == "fail"
+
+    def test_fix_invalidates_cached_failure(self, tmp_path):
+        workspace = make_workspace(tmp_path, "seed_syntax")
+        assert self.run(workspace)["overall_status"] == "fail"
+
+        calculator = workspace / "calculator.py"
+        calculator.write_text(calculator.read_text().replace("def add(a, b)", "def add(a, b):"))
+
+        assert self.run(workspace)["overall_status"] == "pass"
+
+    def test_no_temp_files_left_behind(self, tmp_path):
+        workspace = make_workspace(tmp_path)
+        pipeline_class = load_ci_pipeline(workspace / "ci_pipeline.py").CIPipeline
+
+        pipeline_class(workspace).run_all_checks(only=self.CHECKS, parallel=True)
+
+        leftovers = [p.name for p in workspace.iterdir() if p.name.startswith(".ci_cache.")]
+        assert leftovers == []
+
+    def test_subset_run_lists_its_checks(self, tmp_path):
+        workspace = make_workspace(tmp_path, "seed_lint")
+
+        syntax = run_ci_pipeline(str(workspace), checks="syntax")
+        lint = run_ci_pipeline(str(workspace), checks="lint")
+
+        assert syntax == {"action": "run_ci_pipeline", "status": "pass", "checks": ["syntax"]}
+        assert lint["status"] == "fail" and lint["checks"] == ["lint"]
+        assert '"test": "tests"' not in lint["error"]
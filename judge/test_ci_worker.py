@@ -0,0 +1,143 @@
+"""Tests for the persistent CI worker (fork server)"""
+
+import asyncio
+import os
+import re
+import shutil
+import socket
+import subprocess
+import sys
+import tempfile
+import time
+
+import pytest
+
+from judge.test_ci_runner import make_workspace
+from src import ci_worker
+from src.tools.ci_runner import arun_ci_pipeline, run_ci_pipeline
+
+pytestmark = pytest.mark.skipif(not hasattr(os, "fork"), reason="needs fork()")
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+
+def without_durations(result):
+    """The result with pytest's "in 0.12s" wall times blanked out."""
+    return {**result, "error": re.sub(r"in \d+\.\d+s", "in _s", result.get("error", ""))}
+
+
+@pytest.fixture
+def socket_dir():
+    # AF_UNIX paths are limited to ~100 bytes, so keep it short
+    path = tempfile.mkdtemp(prefix="ciw-")
+    try:
+        yield path
+    finally:
+        shutil.rmtree(path, ignore_errors=True)
+
+
+@pytest.fixture(scope="module")
+def worker():
+    """A CIWorkerServer in its own process, as ``python -m src.ci_worker serve``."""
+    socket_dir = tempfile.mkdtemp(prefix="ciw-")
+    path = os.path.join(socket_dir, "worker.sock")
+    env = {k: v for k, v in os.environ.items() if k != "CI_WORKER_SOCKET"}
+    process = subprocess.Popen(
+        [sys.executable, "-m", "src.ci_worker", "serve", "--socket", path],
+        cwd=ROOT,
+        env=env,
+        stdout=subprocess.DEVNULL,
+    )
+    try:
+        deadline = time.monotonic() + 60
+        while not os.path.exists(path):
+            assert process.poll() is None, "CI worker exited"
+            assert time.monotonic() < deadline, "CI worker did not start"
+            time.sleep(0.05)
+        yield path
+    finally:
+        process.terminate()
+        process.wait(10)
+        shutil.rmtree(socket_dir, ignore_errors=True)
+
+
+@pytest.fixture
+def silent_worker(socket_dir, monkeypatch):
+    """A socket that accepts connections but never answers."""
+    path = os.path.join(socket_dir, "silent.sock")
+    sock = socket.socket(socket.AF_UNIX, socket.SOCK_STREAM)
+    sock.bind(path)
+    sock.listen()
+    monkeypatch.setenv("CI_WORKER_SOCKET", path)
+    monkeypatch.setenv("CI_WORKER_TIMEOUT", "0.2")
+    try:
+        yield path
+    finally:
+        sock.close()
+
+
+class TestCIWorker:
+
+    @pytest.mark.parametrize("seed", ["seed_syntax", "seed_lint"])
+    @pytest.mark.parametrize("checks", [None, ["tests"]])
+    def test_result_matches_local_run(self, tmp_path, worker, seed, checks):
+        workspace = make_workspace(tmp_path, seed)
+
+        remote = ci_worker.request(str(workspace), worker, checks=checks)
+        local = run_ci_pipeline(str(workspace), checks=checks)
+
+        assert without_durations(remote) == without_durations(local)
+
+    def test_missing_workspace(self, tmp_path, worker):
+        result = ci_worker.request(str(tmp_path / "missing"), worker)
+
+        assert result["status"] == "fail"
+        assert "workspace not found" in result["error"]
+
+    def test_run_ci_pipeline_uses_worker(self, tmp_path, worker, monkeypatch):
+        workspace = make_workspace(tmp_path, "seed_lint")
+        monkeypatch.setenv("CI_WORKER_SOCKET", worker)
+        requests = []
+        request = ci_worker.request
+
+        def counting_request(*args, **kwargs):
+            requests.append(args)
+            return request(*args, **kwargs)
+
+        monkeypatch.setattr(ci_worker, "request", counting_request)
+
+        result = run_ci_pipeline(str(workspace), checks="lint")
+
+        assert len(requests) == 1
+        assert result["status"] == "fail" and result["checks"] == ["lint"]
+
+
+class TestCIWorkerTimeout:
+
+    def test_timeout_is_reported_not_rerun_locally(self, tmp_path, silent_worker):
+        workspace = make_workspace(tmp_path, "seed_lint")
+
+        result = run_ci_pipeline(str(workspace))
+
+        assert result == {
+            "action": "run_ci_pipeline",
+            "status": "fail",
+            "error": "CI pipeline timed out on the CI worker",
+        }
+
+    def test_async_timeout_is_reported(self, tmp_path, silent_worker):
+        workspace = make_workspace(tmp_path, "seed_lint")
+
+        result = asyncio.run(arun_ci_pipeline(str(workspace)))
+
+        assert result["error"] == "CI pipeline timed out on the CI worker"
+
+    def test_worker_down_falls_back_to_local_run(self, tmp_path, socket_dir, monkeypatch):
+        workspace = make_workspace(tmp_path, "seed_lint")
+        stale = os.path.join(socket_dir, "stale.sock")
+        open(stale, "w").close()
+        monkeypatch.setenv("CI_WORKER_SOCKET", stale)
+
+        result = run_ci_pipeline(str(workspace), checks="lint")
+
+        assert result["status"] == "fail" and "E302" in result["error"]
@@ -0,0 +1,180 @@
+"""Tests for run events, timing spans and event sinks"""
+
+import json
+import queue
+import threading
+
+import pytest
+
+from judge.test_react_runner import CI_FULL, FIX_COLON, ScriptedAgent
+from scripts.create_baseline import create_baseline
+from src import llm
+from src.events import EventEmitter, JSONLEventSink, QueueEventSink
+from src.react_runner import run_react_loop
+from src.stream_parser import StreamedReasoning
+
+
+class StreamingAgent(ScriptedAgent):
+    """Streams its reasoning from the LLM; acts and observes like ScriptedAgent."""
+
+    def __init__(self):
+        super().__init__([])
+
+    def reason_stream(self, observation):
+        return StreamedReasoning(llm.stream_openai_chat(observation, use_cache=False))
+
+
+def by_type(events, event_type):
+    return [event for event in events if event["type"] == event_type]
+
+
+class TestEventEmitter:
+
+    def test_span_emits_start_and_end_with_context(self):
+        events = []
+        emitter = EventEmitter(events.append, workspace="/tmp/ws")
+
+        with emitter.span("reason", turn=1) as span:
+            span.set(tool="run_ci_pipeline")
+
+        start, end = events
+        assert start["type"] == "reason_start" and end["type"] == "reason_end"
+        assert start["run_id"] == end["run_id"] and end["workspace"] == "/tmp/ws"
+        assert end["tool"] == "run_ci_pipeline" and end["duration_seconds"] >= 0
+
+    def test_span_carries_usage_recorded_during_it(self):
+        events = []
+        usage = [{"total_tokens": 5}]
+        emitter = EventEmitter(events.append, usage=usage)
+
+        span = emitter.span("reason")
+        usage.append({"prompt_tokens": 10, "completion_tokens": 2, "total_tokens": 12})
+        span.end()
+
+        assert events[-1]["llm_calls"] == 1 and events[-1]["total_tokens"] == 12
+
+    def test_skipped_usage_is_left_out(self):
+        events = []
+        usage = []
+        emitter = EventEmitter(events.append, usage=usage)
+
+        span = emitter.span("act")
+        usage.append({"total_tokens": 12})
+        span.skip_usage()
+        span.end()
+
+        assert "total_tokens" not in events[-1]
+
+    def test_end_open_closes_inner_spans_only(self):
+        events = []
+        emitter = EventEmitter(events.append)
+        turn = emitter.span("turn")
+        emitter.span("reason")
+
+        emitter.end_open(after=turn)
+        turn.end()
+
+        assert [e["type"] for e in events] == [
+            "turn_start",
+            "reason_start",
+            "reason_end",
+            "turn_end",
+        ]
+        assert events[2]["completed"] is False and "completed" not in events[3]
+
+    def test_failing_sink_does_not_stop_others(self):
+        events = []
+
+        def broken(event):
+            raise RuntimeError("sink down")
+
+        EventEmitter([broken, events.append]).emit("run_start")
+
+        assert [e["type"] for e in events] == ["run_start"]
+
+
+class TestSinks:
+
+    def test_jsonl_sink_keeps_lines_intact_across_threads(self, tmp_path):
+        sink = JSONLEventSink(str(tmp_path / "logs" / "events.jsonl"))
+
+        def emit(worker):
+            for index in range(50):
+                sink({"type": "tick", "worker": worker, "index": index, "pad": "x" * 500})
+
+        threads = [threading.Thread(target=emit, args=(worker,)) for worker in range(4)]
+        for thread in threads:
+            thread.start()
+        for thread in threads:
+            thread.join()
+
+        lines = (tmp_path / "logs" / "events.jsonl").read_text().splitlines()
+        assert len(lines) == 200
+        assert {(e["worker"], e["index"]) for e in map(json.loads, lines)} == {
+            (worker, index) for worker in range(4) for index in range(50)
+        }
+
+    def test_queue_sink(self):
+        events = queue.Queue()
+
+        EventEmitter(QueueEventSink(events)).emit("run_start", max_turns=3)
+
+        assert events.get_nowait()["max_turns"] == 3
+
+    def test_events_path_env_adds_jsonl_sink(self, tmp_path, monkeypatch):
+        path = tmp_path / "events.jsonl"
+        monkeypatch.setenv("REACT_EVENTS_PATH", str(path))
+
+        EventEmitter().emit("run_start")
+
+        assert json.loads(path.read_text())["type"] == "run_start"
+
+
+@pytest.fixture
+def syntax_workspace(tmp_path, monkeypatch):
+    monkeypatch.setenv("AGENT_FAST_PATH", "0")
+    workspace = tmp_path / "workspace"
+    create_baseline(str(workspace))
+    calculator = workspace / "calculator.py"
+    calculator.write_text(calculator.read_text().replace("def add(a, b):", "def add(a, b)"))
+    return str(workspace)
+
+
+class TestRunEvents:
+
+    def test_loop_emits_spans_per_phase(self, syntax_workspace):
+        events = []
+        agent = ScriptedAgent(
+            [
+                {"reasoning": "Add the colon", "tool_call": FIX_COLON},
+                {"reasoning": "Verify", "tool_call": CI_FULL},
+            ]
+        )
+
+        assert run_react_loop(agent, syntax_workspace, events=events.append) == "success"
+
+        assert events[0]["type"] == "run_start" and events[-1]["type"] == "run_end"
+        assert events[-1]["result"] == "success" and events[-1]["turns"] == 2
+        assert by_type(events, "initial_ci_end")[0]["ci_status"] == "fail"
+        assert [e["tool"] for e in by_type(events, "act_end")] == [
+            "fix_syntax_error",
+            "run_ci_pipeline",
+        ]
+        for phase in ("turn", "reason", "act", "observe"):
+            assert len(by_type(events, f"{phase}_start")) == len(by_type(events, f"{phase}_end"))
+
+    def test_streamed_reason_span_carries_its_tokens(self, stub_api, syntax_workspace):
+        events = []
+
+        result = run_react_loop(StreamingAgent(), syntax_workspace, events=events.append)
+
+        reason_ends = by_type(events, "reason_end")
+        assert result == "success" and len(reason_ends) == 2
+        for event in reason_ends:
+            assert event["source"] == "stream" and event["llm_calls"] == 1
+            assert event["total_tokens"] > 0
+            assert 0 < event["tool_call_seconds"] <= event["duration_seconds"]
+        assert all("total_tokens" not in e for e in by_type(events, "act_end"))
+        assert by_type(events, "run_end")[0]["total_tokens"] == sum(
+            e["total_tokens"] for e in reason_ends
+        )
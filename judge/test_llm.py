@@ -0,0 +1,192 @@
+"""Tests for the cached LLM client against the local stub server (no API key needed)"""
+
+import asyncio
+
+import pytest
+
+from src import llm
+
+
+def cache_key(prompt, system_msg=None):
+    return llm._cache_key(prompt, system_msg, None, "gpt-4o-mini", 1000)
+
+
+class TestCacheTiers:
+
+    def test_repeat_call_served_from_memory(self, stub_api):
+        first = llm.call_openai_chat("Say hello")
+        second = llm.call_openai_chat("Say hello")
+
+        assert first == second
+        assert stub_api.requests == 1
+        assert llm.get_memory_cache().get(cache_key("Say hello")) == first
+
+    def test_disk_hit_is_promoted_to_memory(self, stub_api):
+        content = llm.call_openai_chat("Say hello")
+        llm.get_memory_cache().clear()
+
+        assert llm._cache_lookup(cache_key("Say hello")) == ("disk", content)
+        assert llm._cache_lookup(cache_key("Say hello")) == ("memory", content)
+        assert stub_api.requests == 1
+
+    def test_miss_reports_no_content(self, stub_api):
+        assert llm._cache_lookup(cache_key("never asked")) == ("disk", None)
+
+
+class TestCassetteRecording:
+
+    @pytest.fixture
+    def recording(self, stub_api, tmp_path, monkeypatch):
+        monkeypatch.setenv("LLM_CASSETTE_MODE", "record")
+        monkeypatch.setenv("LLM_CASSETTE_PATH", str(tmp_path / "cassette.jsonl"))
+        return stub_api
+
+    def test_sync_recording_writes_cache(self, recording):
+        content = llm.call_openai_chat("Say hello")
+
+        assert not content.startswith("Error calling API")
+        assert llm.get_cache_store().get(cache_key("Say hello")) == content
+
+    def test_async_recording_writes_cache_like_sync(self, recording):
+        content = asyncio.run(llm.acall_openai_chat("Say hello async"))
+
+        assert not content.startswith("Error calling API")
+        assert llm.get_cache_store().get(cache_key("Say hello async")) == content
+        assert recording.requests == 1
+
+
+class TestCassetteReplay:
+
+    PROMPT = "CI failed in /tmp/tmp{}/calculator.py: 1 failed in {}s"
+
+    @pytest.fixture
+    def cassette_path(self, stub_api, tmp_path, monkeypatch):
+        path = tmp_path / "cassette.jsonl"
+        monkeypatch.setenv("LLM_CASSETTE_PATH", str(path))
+        monkeypatch.setenv("LLM_CASSETTE_MODE", "record")
+        recorded = llm.call_openai_chat(self.PROMPT.format("abc123", "0.12"))
+        monkeypatch.setenv("LLM_CASSETTE_MODE", "replay")
+        return path, recorded
+
+    def test_replay_ignores_volatile_prompt_details(self, cassette_path, stub_api):
+        _, recorded = cassette_path
+        requests = stub_api.requests
+
+        replayed = llm.call_openai_chat(self.PROMPT.format("xyz789", "0.31"))
+
+        assert replayed == recorded
+        assert stub_api.requests == requests  # Served from the cassette
+
+    def test_replay_miss_honours_raise_on_error(self, cassette_path):
+        with pytest.raises(llm.LLMRequestError):
+            llm.call_openai_chat("never recorded", raise_on_error=True)
+        assert llm.call_openai_chat("never recorded").startswith("Error calling API")
+
+    def test_async_replay_miss_honours_raise_on_error(self, cassette_path):
+        with pytest.raises(llm.LLMRequestError):
+            asyncio.run(llm.acall_openai_chat("never recorded", raise_on_error=True))
+
+    def test_replay_finds_entries_recorded_under_raw_keys(self, cassette_path, monkeypatch):
+        path, _ = cassette_path
+        monkeypatch.setenv("LLM_CASSETTE_MODE", "record")
+        previous = llm.set_prompt_normalizer(None)
+        try:
+            recorded = llm.call_openai_chat("Legacy recording in /tmp/tmpold")
+        finally:
+            llm.set_prompt_normalizer(previous)
+        monkeypatch.setenv("LLM_CASSETTE_MODE", "replay")
+
+        assert llm.call_openai_chat("Legacy recording in /tmp/tmpold") == recorded
+
+
+SIMPLE = "Syntax error in calculator.py: expected ':' at line 1"
+HARD = "Test failures: assert add(2, 2) == 5"
+TIERS = ["tier-small", "tier-medium", "tier-large"]
+
+
+class TestModelRouter:
+
+    def test_simple_prompts_start_at_the_cheapest_tier(self):
+        router = llm.ModelRouter(TIERS, default_tier=1)
+
+        assert router.select(SIMPLE) == 0
+        assert router.select(HARD) == 1
+
+    def test_prior_failures_start_higher_up_to_the_last_tier(self):
+        router = llm.ModelRouter(TIERS)
+
+        assert [router.select(SIMPLE, failures) for failures in range(4)] == [0, 1, 2, 2]
+
+    def test_from_env(self, monkeypatch):
+        monkeypatch.setenv("LLM_MODEL_TIERS", " tier-small, tier-large ,")
+        monkeypatch.setenv("LLM_ROUTER_DEFAULT_TIER", "5")
+
+        router = llm.ModelRouter.from_env()
+
+        assert router.tiers == ["tier-small", "tier-large"]
+        assert router.default_tier == 1
+
+
+class TestRoutedLLM:
+
+    @pytest.fixture
+    def routed(self, stub_api):
+        return llm.RoutedLLM(llm.ModelRouter(TIERS, default_tier=1))
+
+    def test_valid_reply_from_first_tier(self, routed, stub_api):
+        response = routed.invoke(SIMPLE)
+
+        assert llm.is_valid_tool_call(response.content)
+        assert stub_api.models == ["tier-small"]
+        assert response.usage["model"] == "tier-small"
+        assert routed.route_stats() == {"escalations": 0, "tier-small": 1}
+
+    def test_hard_prompt_starts_at_default_tier(self, routed, stub_api):
+        routed.invoke(HARD)
+
+        assert stub_api.models == ["tier-medium"]
+
+    def test_invalid_tool_call_escalates(self, routed, stub_api):
+        stub_api.prose_models = {"tier-small"}
+
+        response = routed.invoke(SIMPLE)
+
+        assert llm.is_valid_tool_call(response.content)
+        assert stub_api.models == ["tier-small", "tier-medium"]
+        assert response.usage["model"] == "tier-medium"
+        assert routed.route_stats()["escalations"] == 1
+
+    def test_api_error_reply_escalates(self, routed, stub_api):
+        stub_api.failing_models = {"tier-small", "tier-medium"}
+
+        response = routed.invoke(SIMPLE)
+
+        assert llm.is_valid_tool_call(response.content)
+        assert stub_api.models == TIERS
+
+    def test_last_tier_reply_returned_as_is(self, routed, stub_api):
+        stub_api.prose_models = set(TIERS)
+
+        response = routed.invoke(SIMPLE)
+
+        assert not llm.is_valid_tool_call(response.content)
+        assert stub_api.models == TIERS
+        assert routed.route_stats()["escalations"] == 2
+
+    def test_recorded_failures_move_later_calls_up(self, routed, stub_api):
+        routed.record_failure()
+        routed.invoke(SIMPLE)
+        routed.record_failure()
+        routed.invoke(SIMPLE + " (again)")
+        routed.record_success()
+        routed.invoke(SIMPLE + " (once more)")
+
+        assert stub_api.models == ["tier-medium", "tier-large", "tier-small"]
+
+    def test_stream_uses_the_selected_tier(self, routed, stub_api):
+        routed.record_failure()
+
+        text = "".join(routed.stream(SIMPLE))
+
+        assert llm.is_valid_tool_call(text)
+        assert stub_api.models == ["tier-medium"]
@@ -0,0 +1,142 @@
+"""Tests for the LLM response cache tiers"""
+
+import time
+
+from src.llm_cache import LRUCache, SQLiteCacheStore
+
+
+class TestSQLiteCacheStore:
+
+    def test_set_get_roundtrip(self, tmp_path):
+        store = SQLiteCacheStore(str(tmp_path / "cache.sqlite3"))
+
+        store.set("key", "value")
+
+        assert store.get("key") == "value"
+        assert store.get("missing") is None
+        assert "key" in store and len(store) == 1
+
+    def test_replace_keeps_one_entry(self, tmp_path):
+        store = SQLiteCacheStore(str(tmp_path / "cache.sqlite3"))
+
+        store.set("key", "old")
+        store.set("key", "new")
+
+        assert store.get("key") == "new"
+        assert len(store) == 1
+
+    def test_large_values_are_compressed(self, tmp_path):
+        store = SQLiteCacheStore(str(tmp_path / "cache.sqlite3"), compress_min_bytes=64)
+        value = "CI pipeline failed " * 200
+
+        store.set("big", value)
+        store.set("small", "short")
+
+        assert store.get("big") == value
+        assert store.get("small") == "short"
+        assert store.stats()["compressed_entries"] == 1
+
+    def test_uncompressed_store_reads_compressed_rows(self, tmp_path):
+        path = str(tmp_path / "cache.sqlite3")
+        value = "x" * 1000
+        SQLiteCacheStore(path, compress_min_bytes=64).set("key", value)
+
+        assert SQLiteCacheStore(path, compress=False).get("key") == value
+
+    def test_expired_entries_are_misses_and_pruned(self, tmp_path):
+        store = SQLiteCacheStore(str(tmp_path / "cache.sqlite3"), ttl=60)
+        store.set("old", "value")
+        store.set("fresh", "value")
+        conn = store._connect()
+        with conn:
+            conn.execute(
+                "UPDATE responses SET created_at = ? WHERE key = 'old'", (time.time() - 120,)
+            )
+
+        assert store.get("old") is None
+        assert store.get_entry("fresh")[0] == "value"
+        assert store.prune()["expired"] == 1
+        assert len(store) == 1
+
+    def test_prune_evicts_least_recently_used_beyond_max_bytes(self, tmp_path):
+        store = SQLiteCacheStore(
+            str(tmp_path / "cache.sqlite3"), max_bytes=1000, compress=False, prune_every=0
+        )
+        for index in range(10):
+            store.set(f"key{index}", "v" * 200)
+        conn = store._connect()
+        with conn:
+            for index in range(10):
+                conn.execute(
+                    "UPDATE responses SET accessed_at = ? WHERE key = ?",
+                    (1000 + index, f"key{index}"),
+                )
+
+        result = store.prune()
+
+        assert result["evicted"] > 0
+        remaining = {f"key{index}" for index in range(10) if f"key{index}" in store}
+        assert remaining == {f"key{index}" for index in range(10 - len(remaining), 10)}
+        assert store.stats()["payload_bytes"] <= 1000
+
+    def test_compact_reports_sizes(self, tmp_path):
+        store = SQLiteCacheStore(str(tmp_path / "cache.sqlite3"))
+        store.set("key", "value")
+
+        result = store.compact()
+
+        assert result["bytes_after"] > 0
+        assert store.get("key") == "value"
+
+
+class TestLRUCache:
+
+    def test_evicts_least_recently_used_by_count(self):
+        cache = LRUCache(max_entries=2)
+        cache.set("a", "1")
+        cache.set("b", "2")
+        cache.get("a")
+        cache.set("c", "3")
+
+        assert cache.get("b") is None
+        assert cache.get("a") == "1" and cache.get("c") == "3"
+        assert cache.stats()["evictions"] == 1
+
+    def test_bounded_by_bytes(self):
+        cache = LRUCache(max_entries=100, max_bytes=50)
+        for index in range(10):
+            cache.set(f"k{index}", "v" * 10)
+
+        assert cache.stats()["bytes"] <= 50
+        assert len(cache) == 4
+
+    def test_oversized_value_is_not_cached(self):
+        cache = LRUCache(max_bytes=10)
+
+        cache.set("key", "v" * 100)
+
+        assert cache.get("key") is None
+        assert cache.stats()["bytes"] == 0
+
+    def test_replacing_value_updates_bytes(self):
+        cache = LRUCache()
+        cache.set("key", "v" * 10)
+        cache.set("key", "v" * 20)
+
+        assert cache.stats()["bytes"] == len("key") + 20
+
+    def test_expired_entries_are_misses(self):
+        cache = LRUCache(ttl=60)
+        cache.set("old", "value", created_at=time.time() - 120)
+        cache.set("fresh", "value")
+
+        assert cache.get("old") is None
+        assert cache.get("fresh") == "value"
+        assert len(cache) == 1
+        assert cache.stats()["bytes"] == len("fresh") + len("value")
+
+    def test_no_ttl_keeps_old_entries(self):
+        cache = LRUCache()
+        cache.set("old", "value", created_at=0)
+
+        assert cache.get("old") == "value"
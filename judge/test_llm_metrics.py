@@ -0,0 +1,127 @@
+"""Tests for LLM usage, cost and cache-hit accounting"""
+
+import asyncio
+import uuid
+
+import pytest
+
+from src import llm
+from src.llm_metrics import UsageTracker, collect_usage, last_call_record, usage_scope
+from src.stream_parser import StreamedReasoning
+
+PROMPT = "Syntax error in calculator.py: expected ':' at line 1"
+
+
+def scope_name():
+    return f"test-{uuid.uuid4().hex[:8]}"
+
+
+class TestUsageTracker:
+
+    def test_cost_uses_pricing_override(self, monkeypatch):
+        monkeypatch.setenv("LLM_PRICING", '{"tier-test": [1.0, 2.0]}')
+        tracker = UsageTracker()
+
+        assert tracker.cost("tier-test", 1_000_000, 500_000) == pytest.approx(2.0)
+        assert tracker.cost("gpt-4o-mini", 1_000_000, 0) == pytest.approx(0.15)
+        assert tracker.cost("unknown-model", 1_000, 1_000) == 0.0
+
+    def test_records_are_bounded_but_summaries_are_not(self):
+        tracker = UsageTracker(max_records=2)
+        for _ in range(3):
+            with tracker.track("gpt-4o-mini") as call:
+                call.update(prompt_tokens=10, completion_tokens=5, total_tokens=15)
+
+        assert len(tracker.records()) == 2
+        assert tracker.summary()["total_tokens"] == 45
+
+
+class TestCallAccounting:
+
+    def test_scope_summary_adds_up(self, stub_api):
+        tracker = llm.get_usage_tracker()
+        scope = scope_name()
+
+        with usage_scope(scope), collect_usage() as collected:
+            llm.call_openai_chat(PROMPT)
+            llm.call_openai_chat(PROMPT)  # Memory hit
+            llm.call_openai_chat("Test failures: assert 4 == 5")
+            stub_api.error_rate = 1.0
+            llm.call_openai_chat("Another prompt")
+
+        records = tracker.records(scope)
+        summary = tracker.summary(scope)
+        assert [r["source"] for r in records] == ["api", "memory", "api", "shared"]
+        assert [r["error"] for r in records] == [False, False, False, True]
+        assert collected == records
+        assert last_call_record() == records[-1]
+        assert summary["calls"] == 4 and summary["api_calls"] == 2
+        assert summary["cache_hits"] == 1 and summary["errors"] == 1
+        assert summary["cache_hit_rate"] == 0.25
+        assert summary["total_tokens"] == sum(r["total_tokens"] for r in records) > 0
+        assert records[1]["total_tokens"] == 0 and records[1]["cost_usd"] == 0.0
+        expected_cost = sum(
+            tracker.cost(r["model"], r["prompt_tokens"], r["completion_tokens"])
+            for r in records
+            if r["source"] == "api"
+        )
+        assert summary["cost_usd"] == pytest.approx(expected_cost, abs=1e-6) and expected_cost > 0
+
+    def test_disk_hit_after_restart_is_free(self, stub_api):
+        tracker = llm.get_usage_tracker()
+        scope = scope_name()
+        llm.call_openai_chat(PROMPT)
+        llm.get_memory_cache().clear()
+
+        with usage_scope(scope):
+            llm.call_openai_chat(PROMPT)
+
+        (record,) = tracker.records(scope)
+        assert record["source"] == "disk" and record["cost_usd"] == 0.0
+        assert stub_api.requests == 1
+
+    def test_prefix_summary_sums_scopes(self, stub_api):
+        tracker = llm.get_usage_tracker()
+        prefix = scope_name()
+
+        for name in ("a", "b"):
+            with usage_scope(f"{prefix}/{name}"):
+                llm.call_openai_chat(f"{PROMPT} ({name})")
+
+        by_scope = tracker.summary_by_scope()
+        combined = tracker.summary(prefix=prefix)
+        assert combined["calls"] == 2 and combined["api_calls"] == 2
+        assert combined["total_tokens"] == sum(
+            by_scope[f"{prefix}/{name}"]["total_tokens"] for name in ("a", "b")
+        )
+
+    def test_concurrent_tasks_keep_their_scopes(self, stub_api):
+        tracker = llm.get_usage_tracker()
+        prefix = scope_name()
+
+        async def run(name):
+            with usage_scope(f"{prefix}/{name}"), collect_usage() as collected:
+                await llm.acall_openai_chat(f"{PROMPT} ({name})")
+                return collected
+
+        async def main():
+            return await asyncio.gather(run("a"), run("b"))
+
+        collected_a, collected_b = asyncio.run(main())
+
+        assert [r["scope"] for r in collected_a] == [f"{prefix}/a"]
+        assert [r["scope"] for r in collected_b] == [f"{prefix}/b"]
+        assert tracker.summary(prefix=prefix)["api_calls"] == 2
+
+    def test_streamed_reasoning_is_collected_in_callers_scope(self, stub_api):
+        tracker = llm.get_usage_tracker()
+        scope = scope_name()
+
+        with usage_scope(scope), collect_usage() as collected:
+            streamed = StreamedReasoning(llm.stream_openai_chat(PROMPT, use_cache=False))
+            assert streamed.wait_for_tool_call()["tool"] == "fix_syntax_error"
+            streamed.result(timeout=5)
+
+        assert len(collected) == 1 and collected[0]["scope"] == scope
+        assert collected[0]["total_tokens"] > 0
+        assert tracker.summary(scope)["api_calls"] == 1
@@ -0,0 +1,180 @@
+"""Tests for retries, backoff and hedged LLM requests"""
+
+import asyncio
+import itertools
+import time
+
+import pytest
+
+from src import llm
+from src.llm_retry import (
+    LatencyTracker,
+    LLMRequestError,
+    RequestMetrics,
+    RetryPolicy,
+    acall_with_retries,
+    call_with_retries,
+)
+
+
+def metric_deltas(before):
+    after = llm.get_request_metrics()
+    return {field: after[field] - before[field] for field in RequestMetrics.FIELDS}
+
+
+def slow_primary(delay=0.5):
+    """fn whose first call takes ``delay`` seconds and later calls return at once."""
+    calls = itertools.count()
+
+    def fn():
+        if next(calls) == 0:
+            time.sleep(delay)
+            return "primary"
+        return "hedge"
+
+    return fn
+
+
+class TestRetryPolicy:
+
+    def test_backoff_grows_and_is_capped(self):
+        policy = RetryPolicy(base_delay=1.0, max_delay=4.0)
+
+        assert all(0 <= policy.backoff(0) <= 1.0 for _ in range(50))
+        assert all(0 <= policy.backoff(5) <= 4.0 for _ in range(50))
+
+    def test_backoff_honours_retry_after_up_to_max_delay(self):
+        policy = RetryPolicy(base_delay=0.0, max_delay=4.0)
+
+        assert policy.backoff(0, retry_after=2.0) == 2.0
+        assert policy.backoff(0, retry_after=30.0) == 4.0
+
+    def test_from_env(self, monkeypatch):
+        monkeypatch.setenv("LLM_MAX_RETRIES", "5")
+        monkeypatch.setenv("LLM_HEDGE_REQUESTS", "true")
+        monkeypatch.setenv("LLM_HEDGE_DELAY", "0.25")
+
+        policy = RetryPolicy.from_env()
+
+        assert policy.max_retries == 5
+        assert policy.hedge and policy.hedge_delay == 0.25
+
+
+class TestRetriesAgainstStub:
+
+    @pytest.fixture
+    def fast_backoff(self, monkeypatch):
+        monkeypatch.setenv("LLM_MAX_RETRIES", "3")
+        monkeypatch.setenv("LLM_RETRY_BASE_DELAY", "0")
+        monkeypatch.setenv("LLM_RETRY_MAX_DELAY", "0.01")
+
+    def test_rate_limited_requests_are_retried_then_succeed(self, stub_api, fast_backoff):
+        stub_api.rate_limit_first = 2
+        before = llm.get_request_metrics()
+
+        content = llm.call_openai_chat("Say hello", raise_on_error=True)
+
+        assert content.startswith("{")
+        assert stub_api.requests == 3
+        deltas = metric_deltas(before)
+        assert deltas["attempts"] == 3 and deltas["retries"] == 2
+        assert deltas["successes"] == 1 and deltas["failures"] == 0
+
+    def test_async_retries_then_succeeds(self, stub_api, fast_backoff):
+        stub_api.rate_limit_first = 1
+
+        content = asyncio.run(llm.acall_openai_chat("Say hello", raise_on_error=True))
+
+        assert content.startswith("{") and stub_api.requests == 2
+
+    def test_retry_waits_for_retry_after(self, stub_api, monkeypatch):
+        monkeypatch.setenv("LLM_MAX_RETRIES", "1")
+        monkeypatch.setenv("LLM_RETRY_BASE_DELAY", "0")
+        stub_api.rate_limit_first = 1  # The stub sends Retry-After: 1
+
+        start = time.perf_counter()
+        llm.call_openai_chat("Say hello", raise_on_error=True)
+
+        assert time.perf_counter() - start >= 1.0
+
+    def test_exhausted_retries_raise(self, stub_api, fast_backoff):
+        stub_api.error_rate = 1.0
+        before = llm.get_request_metrics()
+
+        with pytest.raises(LLMRequestError, match="after 4 attempts"):
+            llm.call_openai_chat("Say hello", raise_on_error=True)
+
+        assert stub_api.requests == 4
+        assert metric_deltas(before)["failures"] == 1
+
+    def test_non_retryable_failure_raises_after_one_attempt(self, stub_api, fast_backoff):
+        stub_api.api_key = "another-key"  # 401s are not retried
+        before = llm.get_request_metrics()
+
+        with pytest.raises(LLMRequestError, match="after 1 attempts"):
+            llm.call_openai_chat("Say hello", raise_on_error=True)
+
+        deltas = metric_deltas(before)
+        assert stub_api.requests == 1
+        assert deltas["attempts"] == 1 and deltas["retries"] == 0
+        assert deltas["failures"] == 1
+
+
+class TestHedging:
+
+    def test_slow_primary_is_hedged(self):
+        metrics = RequestMetrics()
+        policy = RetryPolicy(hedge=True, hedge_delay=0.05)
+
+        result = call_with_retries(slow_primary(), policy, metrics, LatencyTracker())
+
+        assert result == "hedge"
+        counts = metrics.snapshot()
+        assert counts["hedges_fired"] == 1 and counts["hedges_won"] == 1
+        assert counts["attempts"] == 1 and counts["successes"] == 1
+
+    def test_fast_primary_fires_no_hedge(self):
+        metrics = RequestMetrics()
+        policy = RetryPolicy(hedge=True, hedge_delay=0.5)
+
+        result = call_with_retries(lambda: "primary", policy, metrics, LatencyTracker())
+
+        assert result == "primary"
+        assert metrics.snapshot()["hedges_fired"] == 0
+
+    def test_hedge_delay_follows_observed_p95(self):
+        metrics = RequestMetrics()
+        latencies = LatencyTracker(min_samples=5)
+        for _ in range(5):
+            latencies.add(0.05)
+        # Without samples a zero hedge_delay means "don't hedge"
+        policy = RetryPolicy(hedge=True, hedge_delay=0)
+
+        assert call_with_retries(slow_primary(), policy, metrics, latencies) == "hedge"
+        assert metrics.snapshot()["hedges_won"] == 1
+
+    def test_async_slow_primary_is_hedged_and_cancelled(self):
+        metrics = RequestMetrics()
+        cancelled = []
+        calls = itertools.count()
+
+        async def fn():
+            if next(calls) == 0:
+                try:
+                    await asyncio.sleep(5)
+                except asyncio.CancelledError:
+                    cancelled.append(True)
+                    raise
+                return "primary"
+            return "hedge"
+
+        policy = RetryPolicy(hedge=True, hedge_delay=0.05)
+
+        async def main():
+            result = await acall_with_retries(fn, policy, metrics, LatencyTracker())
+            await asyncio.sleep(0)  # Let the cancellation land
+            return result
+
+        assert asyncio.run(main()) == "hedge"
+        assert cancelled == [True]
+        assert metrics.snapshot()["hedges_won"] == 1
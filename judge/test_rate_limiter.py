@@ -0,0 +1,118 @@
+"""Tests for the cross-process token-bucket rate limiter"""
+
+import multiprocessing
+import os
+
+import pytest
+
+from src import llm, rate_limiter
+from src.llm_metrics import collect_usage
+from src.rate_limiter import SharedRateLimiter, estimate_tokens
+
+
+class FakeClock:
+    """Stands in for the time module inside src.rate_limiter."""
+
+    def __init__(self, now=1000.0):
+        self.now = now
+
+    def time(self):
+        return self.now
+
+    def sleep(self, seconds):
+        self.now += seconds
+
+
+@pytest.fixture
+def clock(monkeypatch):
+    clock = FakeClock()
+    monkeypatch.setattr(rate_limiter, "time", clock)
+    return clock
+
+
+def token_balance(limiter):
+    with open(limiter.path, "rb") as f:
+        return rate_limiter._STATE.unpack(f.read())[2]
+
+
+def reserve_in_child(path, count):
+    limiter = SharedRateLimiter(path, requests_per_minute=60, burst_seconds=5)
+    for _ in range(count):
+        limiter.reserve()
+
+
+class TestSharedRateLimiter:
+
+    def test_disabled_never_waits(self, tmp_path):
+        limiter = SharedRateLimiter(str(tmp_path / "limits"))
+
+        assert not limiter.enabled
+        assert [limiter.reserve(10_000) for _ in range(5)] == [0.0] * 5
+        assert not os.path.exists(limiter.path)
+
+    def test_requests_beyond_burst_are_spaced_out(self, tmp_path, clock):
+        # 60 rpm with a 5 second burst: 5 requests at once, then one per second
+        limiter = SharedRateLimiter(str(tmp_path / "limits"), requests_per_minute=60)
+
+        waits = [limiter.reserve() for _ in range(7)]
+
+        assert waits == [0.0] * 5 + [pytest.approx(1.0), pytest.approx(2.0)]
+        assert limiter.stats() == {"throttled": 2, "throttled_seconds": 3.0}
+
+    def test_buckets_refill_over_time(self, tmp_path, clock):
+        limiter = SharedRateLimiter(str(tmp_path / "limits"), tokens_per_minute=600)
+        assert limiter.reserve(50) == 0.0  # Capacity is 5 seconds: 50 tokens
+
+        assert limiter.reserve(20) == pytest.approx(2.0)
+        clock.now += 3.0
+
+        assert limiter.reserve(10) == 0.0
+
+    def test_settle_gives_back_unused_tokens(self, tmp_path, clock):
+        limiter = SharedRateLimiter(str(tmp_path / "limits"), tokens_per_minute=6000)
+        limiter.reserve(400)
+
+        limiter.settle(400, 100)
+
+        assert token_balance(limiter) == pytest.approx(500 - 100)
+
+    def test_settle_charges_overruns_and_caps_refunds(self, tmp_path, clock):
+        limiter = SharedRateLimiter(str(tmp_path / "limits"), tokens_per_minute=6000)
+        limiter.reserve(100)
+
+        limiter.settle(100, 300)
+        assert token_balance(limiter) == pytest.approx(500 - 300)
+
+        limiter.settle(1000, 0)
+        assert token_balance(limiter) == pytest.approx(500)
+
+    def test_limits_are_shared_across_processes(self, tmp_path):
+        path = str(tmp_path / "limits")
+        child = multiprocessing.get_context("spawn").Process(
+            target=reserve_in_child, args=(path, 5)
+        )
+        child.start()
+        child.join(30)
+        assert child.exitcode == 0
+
+        # The child used up the burst, so this process has to wait
+        limiter = SharedRateLimiter(path, requests_per_minute=60, burst_seconds=5)
+        assert limiter.reserve() > 0.5
+
+
+class TestStreamedCallsSettle:
+
+    def test_stream_gives_back_unused_max_tokens(self, stub_api, monkeypatch):
+        monkeypatch.setenv("LLM_RATE_LIMIT_TPM", "6000")
+        monkeypatch.setenv("LLM_RATE_LIMIT_BURST_SECONDS", "600")  # 60000 tokens
+        limiter = llm.get_rate_limiter()
+        estimate = estimate_tokens([{"role": "user", "content": "Say hello"}], 1000)
+
+        with collect_usage() as usage:
+            text = "".join(llm.stream_openai_chat("Say hello", use_cache=False))
+
+        assert text.startswith("{")
+        actual = usage[0]["total_tokens"]
+        assert 0 < actual < estimate
+        # Only the reported usage stays charged (plus a little refill meanwhile)
+        assert 60000 - token_balance(limiter) == pytest.approx(actual, abs=20)
@@ -0,0 +1,248 @@
+"""Tests for the ReAct runners with a scripted agent (no LLM needed)"""
+
+import asyncio
+import os
+import threading
+import time
+
+import pytest
+
+from scripts.create_baseline import create_baseline
+from src.helpers import execute_tool_in_workspace
+from src.react_runner import arun_react_loop, run_react_loop
+
+
+class ScriptedAgent:
+    """Replays canned reasoning; act() runs the requested tool for real."""
+
+    def __init__(self, reasonings):
+        self.reasonings = list(reasonings)
+        self.acted = []
+        self.workspace_path = None
+
+    def reason(self, observation):
+        return self.reasonings.pop(0)
+
+    def act(self, reasoning):
+        self.acted.append(reasoning)
+        tool_call = reasoning["tool_call"]
+        result = execute_tool_in_workspace(
+            self.workspace_path, tool_call["tool"], tool_call.get("input", "")
+        )
+        return {
+            "action": tool_call["tool"],
+            "input": tool_call.get("input", ""),
+            "status": "success",
+            "result": result,
+        }
+
+    def observe(self, action_result):
+        result = action_result["result"]
+        # As in ReActAgent, only a full pipeline pass means CI is green
+        green = (
+            action_result["action"] == "run_ci_pipeline"
+            and result.get("status") == "pass"
+            and not result.get("checks")
+        )
+        return {
+            "observation": f"{action_result['action']}: {result.get('status')}",
+            "ci_status": "pass" if green else "fail",
+            "next_action_needed": True,
+        }
+
+
+@pytest.fixture
+def broken_workspace(tmp_path, monkeypatch):
+    monkeypatch.setenv("AGENT_FAST_PATH", "0")
+    workspace = tmp_path / "workspace"
+    create_baseline(str(workspace))
+    calculator = workspace / "calculator.py"
+    calculator.write_text(calculator.read_text().replace("def add(a, b):", "def add(a, b)"))
+    return workspace
+
+
+FIX_COLON = {"tool": "fix_syntax_error", "input": "calculator.py:1:add_colon"}
+CI_SYNTAX = {"tool": "run_ci_pipeline", "input": "syntax"}
+CI_FULL = {"tool": "run_ci_pipeline", "input": ""}
+
+
+def single_item_batch():
+    return [
+        {
+            "reasoning": "Add the missing colon",
+            "tool_calls": [FIX_COLON],
+        },
+        {"reasoning": "Verify", "tool_call": CI_FULL},
+    ]
+
+
+class TestBatchedToolCalls:
+
+    def test_single_item_tool_calls_runs_as_tool_call(self, broken_workspace):
+        agent = ScriptedAgent(single_item_batch())
+
+        assert run_react_loop(agent, str(broken_workspace), max_turns=3) == "success"
+        assert agent.acted[0]["tool_call"] == FIX_COLON
+        assert "tool_calls" not in agent.acted[0]
+
+    def test_single_item_tool_calls_async(self, broken_workspace):
+        agent = ScriptedAgent(single_item_batch())
+
+        result = asyncio.run(
+            arun_react_loop(agent, str(broken_workspace), max_turns=3, speculate=False)
+        )
+
+        assert result == "success"
+        assert agent.acted[0]["tool_call"] == FIX_COLON
+
+
+class TestSpeculativeCI:
+
+    def test_subset_request_does_not_reuse_full_speculative_run(self, broken_workspace):
+        agent = ScriptedAgent([
+            {"reasoning": "Fix", "tool_call": FIX_COLON},
+            {"reasoning": "Quick check", "tool_call": CI_SYNTAX},
+            {"reasoning": "Verify", "tool_call": CI_FULL},
+        ])
+        events = []
+
+        result = asyncio.run(
+            arun_react_loop(agent, str(broken_workspace), max_turns=4, events=events.append)
+        )
+
+        assert result == "success"
+        # The full speculative run after the fix was not passed off as "syntax"
+        assert [a["tool_call"] for a in agent.acted] == [FIX_COLON, CI_SYNTAX, CI_FULL]
+        types = [e["type"] for e in events]
+        assert types.count("speculative_ci_started") == types.count("speculative_ci_discarded") == 1
+        assert not any(e.get("speculative") for e in events if e["type"] == "act_end")
+
+    def test_full_request_reuses_speculative_run(self, broken_workspace):
+        agent = ScriptedAgent(single_item_batch())
+        events = []
+
+        result = asyncio.run(
+            arun_react_loop(agent, str(broken_workspace), max_turns=3, events=events.append)
+        )
+
+        assert result == "success"
+        assert len(agent.acted) == 1
+        assert [e.get("speculative") for e in events if e["type"] == "act_end"] == [None, True]
+
+    def test_edit_waits_for_discarded_speculative_run(self, broken_workspace, monkeypatch):
+        import src.react_runner as react_runner
+
+        state = {"running": False, "overlapped": False}
+
+        def slow_ci(workspace, tool, params=""):
+            state["running"] = True
+            time.sleep(0.3)
+            state["running"] = False
+            return execute_tool_in_workspace(workspace, tool, params)
+
+        async def aexecute(workspace, tool, params=""):
+            return await asyncio.to_thread(slow_ci, workspace, tool, params)
+
+        monkeypatch.setattr(react_runner, "aexecute_tool_in_workspace", aexecute)
+
+        class CheckingAgent(ScriptedAgent):
+            def act(self, reasoning):
+                state["overlapped"] |= state["running"]
+                return super().act(reasoning)
+
+        analyze = {"tool": "analyze_file", "input": "calculator.py"}
+        agent = CheckingAgent([
+            {"reasoning": "Fix", "tool_call": FIX_COLON},
+            {"reasoning": "Look again", "tool_call": analyze},
+            {"reasoning": "Verify", "tool_call": CI_FULL},
+        ])
+
+        assert asyncio.run(arun_react_loop(agent, str(broken_workspace), max_turns=4)) == "success"
+        assert not state["overlapped"]
+
+
+class BarrierAgent(ScriptedAgent):
+    """Waits for the other loops before its first step so the runs overlap."""
+
+    def __init__(self, reasonings, barrier):
+        super().__init__(reasonings)
+        self.barrier = barrier
+
+    def reason(self, observation):
+        if self.barrier is not None:
+            self.barrier.wait(timeout=30)
+            self.barrier = None
+        return super().reason(observation)
+
+
+class TestConcurrentLoops:
+
+    @pytest.fixture
+    def workspaces(self, tmp_path, monkeypatch):
+        """Two workspaces, each missing a colon on a different line; cwd is a third dir."""
+        monkeypatch.setenv("AGENT_FAST_PATH", "0")
+        cwd = tmp_path / "cwd"
+        cwd.mkdir()
+        monkeypatch.chdir(cwd)
+        created = {}
+        for name, line in (("first", "def add(a, b):"), ("second", "def subtract(a, b):")):
+            workspace = tmp_path / name
+            create_baseline(str(workspace))
+            calculator = workspace / "calculator.py"
+            clean = calculator.read_text()
+            calculator.write_text(clean.replace(line, line[:-1]))
+            created[name] = workspace
+        return created, clean, cwd
+
+    @staticmethod
+    def scripts():
+        return {
+            "first": [
+                {"reasoning": "Fix add", "tool_call": FIX_COLON},
+                {"reasoning": "Verify", "tool_call": CI_FULL},
+            ],
+            "second": [
+                {
+                    "reasoning": "Fix subtract",
+                    "tool_call": {"tool": "fix_syntax_error", "input": "calculator.py:5:add_colon"},
+                },
+                {"reasoning": "Verify", "tool_call": CI_FULL},
+            ],
+        }
+
+    def test_threads_edit_only_their_own_workspace(self, workspaces):
+        created, clean, cwd = workspaces
+        barrier = threading.Barrier(len(created))
+        agents = {name: BarrierAgent(script, barrier) for name, script in self.scripts().items()}
+        results = {}
+
+        def run(name):
+            results[name] = run_react_loop(agents[name], str(created[name]), max_turns=3)
+
+        threads = [threading.Thread(target=run, args=(name,)) for name in created]
+        for thread in threads:
+            thread.start()
+        for thread in threads:
+            thread.join(120)
+
+        assert results == {"first": "success", "second": "success"}
+        for workspace in created.values():
+            assert (workspace / "calculator.py").read_text() == clean
+        assert os.getcwd() == str(cwd) and not os.listdir(cwd)
+
+    def test_async_loops_edit_only_their_own_workspace(self, workspaces):
+        created, clean, cwd = workspaces
+        agents = {name: ScriptedAgent(script) for name, script in self.scripts().items()}
+
+        async def main():
+            return await asyncio.gather(
+                *(
+                    arun_react_loop(agents[name], str(created[name]), max_turns=3)
+                    for name in created
+                )
+            )
+
+        assert asyncio.run(main()) == ["success", "success"]
+        for workspace in created.values():
+            assert (workspace / "calculator.py").read_text() == clean
+        assert os.getcwd() == str(cwd) and not os.listdir(cwd)
@@ -0,0 +1,137 @@
+"""Tests for in-flight request coalescing"""
+
+import asyncio
+import threading
+import time
+
+import pytest
+
+from src.singleflight import AsyncSingleFlight, SingleFlight
+
+
+class TestSingleFlight:
+
+    def test_concurrent_calls_share_one_execution(self):
+        flight = SingleFlight()
+        calls = []
+        results = []
+
+        def fetch():
+            calls.append(1)
+            time.sleep(0.1)
+            return "answer"
+
+        threads = [
+            threading.Thread(target=lambda: results.append(flight.do("key", fetch)))
+            for _ in range(5)
+        ]
+        for thread in threads:
+            thread.start()
+        for thread in threads:
+            thread.join()
+
+        assert len(calls) == 1
+        assert results == ["answer"] * 5
+        assert flight.in_flight() == 0
+
+    def test_error_reaches_every_caller(self):
+        flight = SingleFlight()
+        errors = []
+
+        def fetch():
+            time.sleep(0.1)
+            raise ValueError("boom")
+
+        def call():
+            try:
+                flight.do("key", fetch)
+            except ValueError as e:
+                errors.append(e)
+
+        threads = [threading.Thread(target=call) for _ in range(3)]
+        for thread in threads:
+            thread.start()
+        for thread in threads:
+            thread.join()
+
+        assert len(errors) == 3
+
+    def test_different_keys_run_separately(self):
+        flight = SingleFlight()
+
+        assert flight.do("a", lambda: 1) == 1
+        assert flight.do("b", lambda: 2) == 2
+
+
+class TestAsyncSingleFlight:
+
+    def test_concurrent_calls_share_one_execution(self):
+        flight = AsyncSingleFlight()
+        calls = []
+
+        async def fetch():
+            calls.append(1)
+            await asyncio.sleep(0.05)
+            return "answer"
+
+        async def main():
+            return await asyncio.gather(*(flight.do("key", fetch) for _ in range(5)))
+
+        assert asyncio.run(main()) == ["answer"] * 5
+        assert len(calls) == 1
+
+    def test_cancelled_first_caller_does_not_fail_followers(self):
+        flight = AsyncSingleFlight()
+
+        async def fetch():
+            await asyncio.sleep(0.1)
+            return "answer"
+
+        async def main():
+            leader = asyncio.create_task(flight.do("key", fetch))
+            await asyncio.sleep(0)
+            followers = [asyncio.create_task(flight.do("key", fetch)) for _ in range(2)]
+            await asyncio.sleep(0.01)
+            leader.cancel()
+            with pytest.raises(asyncio.CancelledError):
+                await leader
+            return await asyncio.gather(*followers)
+
+        assert asyncio.run(main()) == ["answer", "answer"]
+
+    def test_call_is_cancelled_when_every_caller_gives_up(self):
+        flight = AsyncSingleFlight()
+        finished = []
+
+        async def fetch():
+            await asyncio.sleep(0.1)
+            finished.append(1)
+            return "answer"
+
+        async def main():
+            callers = [asyncio.create_task(flight.do("key", fetch)) for _ in range(2)]
+            await asyncio.sleep(0.01)
+            for caller in callers:
+                caller.cancel()
+            await asyncio.gather(*callers, return_exceptions=True)
+            await asyncio.sleep(0.15)
+            # A new call after the cancelled one runs afresh
+            return await flight.do("key", fetch)
+
+        assert asyncio.run(main()) == "answer"
+        assert finished == [1]
+
+    def test_error_reaches_every_caller(self):
+        flight = AsyncSingleFlight()
+
+        async def fetch():
+            await asyncio.sleep(0.01)
+            raise ValueError("boom")
+
+        async def main():
+            return await asyncio.gather(
+                *(flight.do("key", fetch) for _ in range(3)), return_exceptions=True
+            )
+
+        results = asyncio.run(main())
+        assert [type(r) for r in results] == [ValueError] * 3
@@ -0,0 +1,132 @@
+"""Tests for early tool-call extraction from streamed LLM output"""
+
+import json
+
+import pytest
+
+from src import llm
+from src.llm_retry import LLMRequestError
+from src.stream_parser import StreamedReasoning, ToolCallStreamParser
+
+REPLY = json.dumps(
+    {
+        "tool_call": {"tool": "fix_syntax_error", "input": "calculator.py:3:add_colon"},
+        "reasoning": "Missing colon on line 3 {not a brace that matters}",
+    }
+)
+
+
+def chunks(text, size=7):
+    return [text[i : i + size] for i in range(0, len(text), size)]
+
+
+class TestToolCallStreamParser:
+
+    def test_tool_call_emitted_before_reasoning_arrives(self):
+        parser = ToolCallStreamParser()
+        emitted_at = None
+        for index, chunk in enumerate(chunks(REPLY)):
+            if parser.feed(chunk) is not None:
+                emitted_at = index
+                break
+
+        assert parser.tool_call == json.loads(REPLY)["tool_call"]
+        assert '"reasoning"' not in "".join(chunks(REPLY)[: emitted_at + 1])
+
+    def test_tool_call_after_reasoning_with_escaped_quotes(self):
+        reply = json.dumps(
+            {"reasoning": 'Says "}" and {', "tool_call": {"tool": "run_ci_pipeline", "input": ""}}
+        )
+        parser = ToolCallStreamParser()
+        results = [parser.feed(chunk) for chunk in chunks(reply, 3)]
+
+        assert [r for r in results if r is not None] == [
+            {"tool": "run_ci_pipeline", "input": ""}
+        ]
+
+    def test_nested_tool_call_key_is_ignored(self):
+        reply = '{"reasoning": {"tool_call": {"tool": "nested"}}, "tool_call": {"tool": "top"}}'
+        parser = ToolCallStreamParser()
+        for chunk in chunks(reply, 5):
+            parser.feed(chunk)
+
+        assert parser.tool_call == {"tool": "top"}
+
+    def test_streamed_reasoning_result(self):
+        streamed = StreamedReasoning(iter(chunks(REPLY)))
+
+        assert streamed.wait_for_tool_call()["tool"] == "fix_syntax_error"
+        assert streamed.result(timeout=5) == json.loads(REPLY)
+
+
+class FakeStream:
+    """Stand-in for openai's Stream: yields chunks, optionally fails, records close()."""
+
+    def __init__(self, parts, fail_after=None):
+        self.parts = parts
+        self.fail_after = fail_after
+        self.closed = False
+
+    def __iter__(self):
+        for index, part in enumerate(self.parts):
+            if index == self.fail_after:
+                raise ConnectionError("connection reset")
+            delta = type("Delta", (), {"content": part})()
+            choice = type("Choice", (), {"delta": delta})()
+            yield type("Chunk", (), {"choices": [choice]})()
+
+    def close(self):
+        self.closed = True
+
+
+@pytest.fixture
+def fake_stream(monkeypatch, tmp_path):
+    """Make stream_openai_chat read from a FakeStream; returns a setter."""
+    state = {}
+
+    class Completions:
+        def create(self, **kwargs):
+            return state["stream"]
+
+    client = type("Client", (), {})()
+    client.chat = type("Chat", (), {"completions": Completions()})()
+    monkeypatch.setattr(llm, "get_openai_client", lambda: client)
+    monkeypatch.setenv("LLM_CACHE_PATH", str(tmp_path / "cache.sqlite3"))
+    monkeypatch.delenv("LLM_CASSETTE_MODE", raising=False)
+
+    def use(stream):
+        state["stream"] = stream
+        return stream
+
+    return use
+
+
+class TestStreamOpenAIChat:
+
+    def test_early_stop_closes_stream(self, fake_stream):
+        stream = fake_stream(FakeStream(chunks(REPLY)))
+
+        tokens = llm.stream_openai_chat("early stop", use_cache=False)
+        next(tokens)
+        tokens.close()
+
+        assert stream.closed
+
+    def test_mid_stream_error_raises_instead_of_appending_text(self, fake_stream):
+        stream = fake_stream(FakeStream(chunks(REPLY), fail_after=2))
+
+        received = []
+        with pytest.raises(LLMRequestError):
+            for token in llm.stream_openai_chat("mid-stream error", use_cache=False):
+                received.append(token)
+
+        assert received == chunks(REPLY)[:2]
+        assert stream.closed
+
+    def test_mid_stream_error_reported_by_streamed_reasoning(self, fake_stream):
+        fake_stream(FakeStream(chunks(REPLY), fail_after=2))
+
+        streamed = StreamedReasoning(llm.stream_openai_chat("parser error", use_cache=False))
+
+        assert streamed.wait_for_tool_call() is None
+        assert streamed.result()["error"].startswith("Streaming failed")
@@ -2,14 +2,26 @@ from __future__ import annotations
 
 import json
 import sys
+import uuid
 from typing import Any, Dict
 
+from src.llm import get_usage_tracker, usage_scope
 from src.orchestrator import orchestrate_ci_fix
 
 
 def run(seed_name: str) -> Dict[str, Any]:
     """Run the CI autofix agent on the provided seed scenario."""
-    return orchestrate_ci_fix(seed_name)
+    # LLM usage is recorded under "<seed>/<run id>" so runs and scenarios both aggregate
+    run_scope = f"{seed_name}/{uuid.uuid4().hex[:8]}"
+    with usage_scope(run_scope):
+        out = orchestrate_ci_fix(seed_name)
+
+    tracker = get_usage_tracker()
+    out["llm_usage"] = {
+        "run": tracker.summary(run_scope),
+        "scenario": tracker.summary(prefix=f"{seed_name}/"),
+    }
+    return out
 
 
 def main(argv: list[str] | None = None) -> int:
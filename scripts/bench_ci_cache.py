@@ -0,0 +1,117 @@
+#!/usr/bin/env python3
+"""Benchmark the incremental .ci_cache of CIPipeline on a synthetic workspace.
+
+Usage: python3 scripts/bench_ci_cache.py --files 5000
+"""
+
+import argparse
+import json
+import shutil
+import sys
+import tempfile
+import time
+from pathlib import Path
+
+ROOT = Path(__file__).resolve().parent.parent
+# Checks with per-file cached results; tests always run in full
+CACHED_CHECKS = ["syntax", "lint", "config", "security"]
+
+MODULE_TEMPLATE = '''"""Synthetic module {index}"""
+
+
+def value_{index}(x):
+    return x + {index}
+
+
+class Item{index}:
+    def __init__(self, name):
+        self.name = name
+
+    def describe(self):
+        return f"{{self.name}}: {{value_{index}(1)}}"
+'''
+
+CONFIG_TEMPLATE = """name: config-{index}
+settings:
+  enabled: true
+  retries: {index}
+"""
+
+
+def build_workspace(path, files, per_package=100):
+    """Baseline workspace plus files modules in packages and some YAML."""
+    sys.path.insert(0, str(ROOT / "scripts"))
+    from create_baseline import create_baseline
+
+    create_baseline(str(path))
+    for index in range(files):
+        package = path / f"pkg_{index // per_package:03d}"
+        if index % per_package == 0:
+            package.mkdir()
+            (package / "__init__.py").write_text("")
+        (package / f"mod_{index:05d}.py").write_text(MODULE_TEMPLATE.format(index=index))
+    config_dir = path / "config"
+    config_dir.mkdir()
+    for index in range(max(1, files // 100)):
+        (config_dir / f"service_{index:03d}.yml").write_text(CONFIG_TEMPLATE.format(index=index))
+
+
+def timed(pipeline, checks):
+    start = time.perf_counter()
+    result = pipeline.run_all_checks(only=checks)
+    return round(time.perf_counter() - start, 3), result["overall_status"]
+
+
+def per_check(pipeline_class, path, use_cache):
+    return {
+        name: timed(pipeline_class(path, use_cache=use_cache), [name])[0]
+        for name in CACHED_CHECKS
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--files", type=int, default=5000)
+    parser.add_argument("--keep", action="store_true", help="Keep the workspace")
+    args = parser.parse_args()
+
+    sys.path.insert(0, str(ROOT))
+    from src.tools.ci_runner import load_ci_pipeline
+
+    workdir = Path(tempfile.mkdtemp(prefix="bench_ci_cache_"))
+    path = workdir / "workspace"
+    try:
+        build_workspace(path, args.files)
+        pipeline_class = load_ci_pipeline(path / "ci_pipeline.py").CIPipeline
+
+        uncached, status = timed(pipeline_class(path, use_cache=False), CACHED_CHECKS)
+        cold, _ = timed(pipeline_class(path), CACHED_CHECKS)
+        warm, _ = timed(pipeline_class(path), CACHED_CHECKS)
+
+        # One file edited, as after a fix
+        edited = path / "pkg_000" / "mod_00000.py"
+        edited.write_text(edited.read_text() + "\n\ndef extra():\n    return 0\n")
+        one_changed, _ = timed(pipeline_class(path), CACHED_CHECKS)
+
+        summary = {
+            "files": args.files,
+            "checks": CACHED_CHECKS,
+            "status": status,
+            "uncached_seconds": uncached,
+            "cold_cache_seconds": cold,
+            "warm_unchanged_seconds": warm,
+            "warm_one_changed_seconds": one_changed,
+            "speedup_one_changed": round(uncached / one_changed, 1) if one_changed else None,
+            "per_check_uncached_seconds": per_check(pipeline_class, path, False),
+            "per_check_warm_seconds": per_check(pipeline_class, path, True),
+        }
+        print(json.dumps(summary, indent=2))
+    finally:
+        if args.keep:
+            print(f"Workspace kept at {path}", file=sys.stderr)
+        else:
+            shutil.rmtree(workdir, ignore_errors=True)
+
+
+if __name__ == "__main__":
+    main()
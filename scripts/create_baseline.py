@@ -74,19 +74,102 @@ pyyaml>=6.0
     (baseline_path / "ci_pipeline.py").write_text(
         """#!/usr/bin/env python3
 
+import argparse
+import hashlib
+import os
 import subprocess
 import sys
+import tempfile
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
 from pathlib import Path
 import yaml
 import ast
 import json
 
+CACHE_FILE = ".ci_cache"
+# Files whose content changes flake8 results for every file
+LINT_CONFIG_FILES = ("setup.cfg", "tox.ini", ".flake8")
 
+
+# Per-file results of the syntax, lint, config and security checks are kept
+# in CACHE_FILE keyed by content hash, so a run only re-checks the files that
+# changed since the last run_all_checks (use_cache=False to disable)
 class CIPipeline:
-    def __init__(self, repo_path="."):
+    def __init__(self, repo_path=".", use_cache=True):
         self.repo_path = Path(repo_path)
-
-    def run_all_checks(self):
+        self.use_cache = use_cache
+        self._cache = None
+        self._cache_text = None
+        self._hashed = {}
+        self._cache_lock = threading.Lock()
+
+    def _cache_version(self):
+        # Cached results are only valid for this pipeline and lint config
+        digest = hashlib.sha256()
+        for path in [globals().get("__file__", "")] + [
+            self.repo_path / name for name in LINT_CONFIG_FILES
+        ]:
+            if path and os.path.isfile(path):
+                digest.update(Path(path).read_bytes())
+        return digest.hexdigest()[:16]
+
+    def _cache_data(self):
+        if self._cache is None:
+            version = self._cache_version()
+            cache = {}
+            self._cache_text = None
+            if self.use_cache:
+                try:
+                    self._cache_text = (self.repo_path / CACHE_FILE).read_text()
+                    cache = json.loads(self._cache_text)
+                except (OSError, ValueError):
+                    pass
+            if cache.get("version") != version:
+                cache = {"version": version, "files": {}}
+            self._cache = cache
+        return self._cache
+
+    def _save_cache(self):
+        if not self.use_cache or self._cache is None:
+            return
+        files = self._cache["files"]
+        for rel_path in [p for p in files if not (self.repo_path / p).exists()]:
+            del files[rel_path]
+        text = json.dumps(self._cache)
+        if text == self._cache_text:
+            return
+        try:
+            # A unique temp file per save: runs may overlap in one process
+            fd, tmp_path = tempfile.mkstemp(prefix=f"{CACHE_FILE}.", dir=self.repo_path)
+            try:
+                with os.fdopen(fd, "w") as f:
+                    f.write(text)
+                os.replace(tmp_path, self.repo_path / CACHE_FILE)
+            except OSError:
+                os.unlink(tmp_path)
+                raise
+        except OSError:
+            pass  # The cache is an optimization only
+
+    def _file_entry(self, path):
+        # Cached results of a file, emptied when its content hash changed.
+        # Every file is hashed once per run (mtime and size can miss an edit);
+        # checks running in parallel share that entry
+        files = self._cache_data()["files"]
+        rel_path = path.relative_to(self.repo_path).as_posix()
+        with self._cache_lock:
+            entry = self._hashed.get(rel_path)
+            if entry is None:
+                digest = hashlib.sha1(path.read_bytes()).hexdigest()
+                entry = files.get(rel_path)
+                if not entry or entry.get("hash") != digest:
+                    entry = {"hash": digest}
+                files[rel_path] = self._hashed[rel_path] = entry
+            return entry
+
+    def run_all_checks(self, only=None, skip=None, parallel=False):
         checks = [
             ("syntax", self.check_syntax),
             ("lint", self.check_lint),
@@ -96,27 +179,52 @@ class CIPipeline:
             ("security", self.check_security)
         ]
 
-        results = []
-        all_passed = True
-
-        for test_name, check_func in checks:
+        names = [name for name, _ in checks]
+        unknown = [name for name in list(only or []) + list(skip or []) if name not in names]
+        if unknown:
+            raise ValueError(f"Unknown checks: {', '.join(unknown)}")
+        if only:
+            checks = [check for check in checks if check[0] in only]
+        if skip:
+            checks = [check for check in checks if check[0] not in skip]
+
+        self._cache = None  # Pick up results stored by other runs
+        self._hashed = {}
+        self._cache_data()  # Loaded once before checks share it across threads
+        durations = {}
+        start = time.perf_counter()
+
+        def run_check(check):
+            test_name, check_func = check
+            check_start = time.perf_counter()
             try:
                 passed, error = check_func()
                 result = {"test": test_name, "status": "pass" if passed else "fail"}
 
                 if not passed:
                     result["error"] = error
-                    all_passed = False
-
-                results.append(result)
 
             except Exception as e:
-                results.append({"test": test_name, "status": "fail", "error": str(e)})
-                all_passed = False
-
+                result = {"test": test_name, "status": "fail", "error": str(e)}
+            durations[test_name] = round(time.perf_counter() - check_start, 3)
+            return result
+
+        # Subprocess-bound lint and tests overlap with the parsing checks;
+        # map() keeps results in check order
+        if parallel and len(checks) > 1:
+            with ThreadPoolExecutor(max_workers=len(checks)) as pool:
+                results = list(pool.map(run_check, checks))
+        else:
+            results = [run_check(check) for check in checks]
+        all_passed = all(result["status"] == "pass" for result in results)
+
+        timings = {name: durations[name] for name, _ in checks}
+        timings["total"] = round(time.perf_counter() - start, 3)
+        self._save_cache()
         return {
             "overall_status": "pass" if all_passed else "fail",
-            "checks": results
+            "checks": results,
+            "timings": timings
         }
 
     def check_syntax(self):
@@ -127,29 +235,57 @@ class CIPipeline:
                 continue
 
             try:
-                with open(py_file, 'r') as f:
-                    ast.parse(f.read())
-            except SyntaxError as e:
-                return False, f"Syntax error in {py_file}: {e.msg} at line {e.lineno}"
+                entry = self._file_entry(py_file)
+                if "syntax" not in entry:
+                    try:
+                        with open(py_file, 'r') as f:
+                            ast.parse(f.read())
+                        entry["syntax"] = None
+                    except SyntaxError as e:
+                        entry["syntax"] = [e.msg, e.lineno]
+                if entry["syntax"]:
+                    msg, lineno = entry["syntax"]
+                    return False, f"Syntax error in {py_file}: {msg} at line {lineno}"
             except Exception as e:
                 return False, f"Error parsing {py_file}: {str(e)}"
 
         return True, None
 
     def check_lint(self):
+        # flake8 runs only on files without a cached result
         try:
-            result = subprocess.run(
-                ["python3", "-m", "flake8", ".", "--max-line-length=100"],
-                cwd=self.repo_path,
-                capture_output=True,
-                text=True,
-                timeout=30
-            )
-
-            if result.returncode == 0:
+            entries = {}
+            for py_file in self.repo_path.rglob("*.py"):
+                if "__pycache__" not in str(py_file):
+                    name = f"./{py_file.relative_to(self.repo_path).as_posix()}"
+                    entries[name] = self._file_entry(py_file)
+            stale = [name for name, entry in entries.items() if "lint" not in entry]
+
+            if stale:
+                # A full run keeps flake8's own file discovery
+                targets = ["."] if len(stale) == len(entries) else sorted(stale)
+                result = subprocess.run(
+                    ["python3", "-m", "flake8", *targets, "--max-line-length=100"],
+                    cwd=self.repo_path,
+                    capture_output=True,
+                    text=True,
+                    timeout=30
+                )
+
+                issues = {name: [] for name in stale}
+                for line in result.stdout.splitlines(keepends=True):
+                    issues.setdefault(line.split(":", 1)[0], []).append(line)
+                if result.returncode not in (0, 1) or set(issues) - set(stale):
+                    # flake8 error or output for unknown files: report as is
+                    return False, f"Linting issues:\\n{result.stdout}"
+                for name in stale:
+                    entries[name]["lint"] = issues[name]
+
+            output = "".join(line for name in sorted(entries) for line in entries[name]["lint"])
+            if not output:
                 return True, None
             else:
-                return False, f"Linting issues:\\n{result.stdout}"
+                return False, f"Linting issues:\\n{output}"
 
         except subprocess.TimeoutExpired:
             return False, "Linting check timed out"
@@ -205,8 +341,12 @@ class CIPipeline:
 
         for yaml_file in yaml_files:
             try:
+                entry = self._file_entry(yaml_file)
+                if entry.get("config"):
+                    continue
                 with open(yaml_file, 'r') as f:
                     yaml.safe_load(f)
+                entry["config"] = True  # Only passes are cached
             except yaml.YAMLError as e:
                 return False, f"YAML error in {yaml_file}: {str(e)}"
             except Exception as e:
@@ -223,17 +363,10 @@ class CIPipeline:
                 continue
 
             try:
-                with open(py_file, 'r') as f:
-                    lines = f.read().split('\\n')
-
-                for line_num, line in enumerate(lines, 1):
-                    line_lower = line.lower()
-                    patterns = ['api_key', 'secret_key', 'password']
-                    if any(pattern in line_lower for pattern in patterns):
-                        if '=' in line and any(quote in line for quote in ['"', "'"]):
-                            value_part = line.split('=', 1)[1].strip()
-                            if value_part.startswith(('"', "'")) and len(value_part) > 10:
-                                security_issues.append(f"{py_file}:{line_num}")
+                entry = self._file_entry(py_file)
+                if "security" not in entry:
+                    entry["security"] = self._secret_lines(py_file)
+                security_issues.extend(f"{py_file}:{line_num}" for line_num in entry["security"])
 
             except Exception:
                 continue
@@ -243,11 +376,42 @@ class CIPipeline:
 
         return True, None
 
+    def _secret_lines(self, py_file):
+        with open(py_file, 'r') as f:
+            lines = f.read().split('\\n')
+
+        found = []
+        for line_num, line in enumerate(lines, 1):
+            line_lower = line.lower()
+            patterns = ['api_key', 'secret_key', 'password']
+            if any(pattern in line_lower for pattern in patterns):
+                if '=' in line and any(quote in line for quote in ['"', "'"]):
+                    value_part = line.split('=', 1)[1].strip()
+                    if value_part.startswith(('"', "'")) and len(value_part) > 10:
+                        found.append(line_num)
+        return found
+
+
+def _check_list(value):
+    return [name.strip() for name in value.split(",") if name.strip()] if value else None
+
 
 def main():
-    repo_path = sys.argv[1] if len(sys.argv) > 1 else "."
-    pipeline = CIPipeline(repo_path)
-    result = pipeline.run_all_checks()
+    parser = argparse.ArgumentParser(description="Run CI checks")
+    parser.add_argument("repo_path", nargs="?", default=".")
+    parser.add_argument("--only", help="Comma-separated checks to run, e.g. syntax,lint")
+    parser.add_argument("--skip", help="Comma-separated checks to leave out")
+    parser.add_argument("--no-cache", action="store_true", help=f"Ignore and keep no {CACHE_FILE}")
+    parser.add_argument("--parallel", action="store_true", help="Run checks concurrently")
+    parser.add_argument("--timings", action="store_true", help="Include per-check wall times")
+    args = parser.parse_args()
+
+    pipeline = CIPipeline(args.repo_path, use_cache=not args.no_cache)
+    result = pipeline.run_all_checks(
+        only=_check_list(args.only), skip=_check_list(args.skip), parallel=args.parallel
+    )
+    if not args.timings:
+        result.pop("timings")
 
     print(json.dumps(result, indent=2))
     sys.exit(0 if result["overall_status"] == "pass" else 1)
@@ -0,0 +1,113 @@
+#!/usr/bin/env python3
+"""Drive many concurrent orchestrate_ci_fix runs against the stub LLM server.
+
+Usage: python3 scripts/load_test.py --runs 200 --concurrency 32 --latency 0.3
+"""
+
+import argparse
+import contextlib
+import io
+import json
+import os
+import shutil
+import sys
+import tempfile
+import threading
+import time
+from concurrent.futures import ProcessPoolExecutor
+from pathlib import Path
+
+ROOT = Path(__file__).resolve().parent.parent
+SEEDS = ["seed_syntax", "seed_import", "seed_lint", "seed_multi"]
+
+
+def _init_worker(env):
+    os.environ.update(env)
+    for path in (str(ROOT), str(ROOT / "scripts")):
+        if path not in sys.path:
+            sys.path.insert(0, path)
+
+
+def _run_one(seed_name):
+    """Run one scenario in a private working directory and time it."""
+    workdir = tempfile.mkdtemp(prefix=f"load_{seed_name}_")
+    original_cwd = os.getcwd()
+    try:
+        os.chdir(workdir)
+        from src.orchestrator import orchestrate_ci_fix
+
+        start = time.perf_counter()
+        with contextlib.redirect_stdout(io.StringIO()):
+            result = orchestrate_ci_fix(seed_name)
+        elapsed = time.perf_counter() - start
+        return {"seed": seed_name, "status": result.get("status"), "seconds": elapsed}
+    except Exception as e:
+        return {"seed": seed_name, "status": "fail", "seconds": 0.0, "error": str(e)}
+    finally:
+        os.chdir(original_cwd)
+        shutil.rmtree(workdir, ignore_errors=True)
+
+
+def _percentile(values, pct):
+    if not values:
+        return 0.0
+    ordered = sorted(values)
+    index = min(len(ordered) - 1, int(round(pct / 100 * (len(ordered) - 1))))
+    return ordered[index]
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--runs", type=int, default=100)
+    parser.add_argument("--concurrency", type=int, default=os.cpu_count() or 4)
+    parser.add_argument("--seeds", default=",".join(SEEDS), help="Comma-separated seed names")
+    parser.add_argument("--latency", type=float, default=0.0)
+    parser.add_argument("--jitter", type=float, default=0.0)
+    parser.add_argument("--error-rate", type=float, default=0.0)
+    parser.add_argument("--rate-limit-rate", type=float, default=0.0)
+    args = parser.parse_args()
+
+    sys.path.insert(0, str(ROOT / "scripts"))
+    from stub_llm_server import StubConfig, create_server
+
+    config = StubConfig(args.latency, args.jitter, args.error_rate, args.rate_limit_rate)
+    server = create_server(port=0, config=config)
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+
+    # Fresh cache so runs measure the request path rather than earlier answers
+    cache_dir = tempfile.mkdtemp(prefix="load_cache_")
+    env = {
+        "OPENAI_API_BASE": f"http://127.0.0.1:{server.server_port}/v1",
+        "OPENAI_API_KEY": "stub",
+        "LLM_CACHE_PATH": os.path.join(cache_dir, "llm_cache.sqlite3"),
+    }
+
+    seeds = [s for s in args.seeds.split(",") if s]
+    plan = [seeds[i % len(seeds)] for i in range(args.runs)]
+
+    start = time.perf_counter()
+    with ProcessPoolExecutor(
+        max_workers=args.concurrency, initializer=_init_worker, initargs=(env,)
+    ) as pool:
+        results = list(pool.map(_run_one, plan))
+    wall = time.perf_counter() - start
+
+    server.shutdown()
+    shutil.rmtree(cache_dir, ignore_errors=True)
+
+    durations = [r["seconds"] for r in results]
+    summary = {
+        "runs": len(results),
+        "passed": sum(1 for r in results if r["status"] == "pass"),
+        "concurrency": args.concurrency,
+        "wall_seconds": round(wall, 3),
+        "runs_per_second": round(len(results) / wall, 3) if wall else 0.0,
+        "p50_seconds": round(_percentile(durations, 50), 3),
+        "p95_seconds": round(_percentile(durations, 95), 3),
+        "llm_requests": config.requests,
+    }
+    print(json.dumps(summary, indent=2))
+
+
+if __name__ == "__main__":
+    main()
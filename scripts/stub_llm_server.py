@@ -0,0 +1,267 @@
+#!/usr/bin/env python3
+"""Local OpenAI-compatible stub server for offline load testing.
+
+Point the agent at it with OPENAI_API_BASE=http://127.0.0.1:8765/v1 and any
+OPENAI_API_KEY. Responses are rule-based: CI failures from the four seed
+scenarios are mapped to the matching tool call, judge prompts get a passing
+verdict and everything else asks to re-run the CI pipeline.
+"""
+
+import argparse
+import json
+import random
+import re
+import threading
+import time
+import uuid
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+
+def _reasoning(reasoning, tool, tool_input=""):
+    # tool_call first, as the agent prompt asks, so streaming can dispatch early
+    return json.dumps(
+        {"tool_call": {"tool": tool, "input": tool_input}, "reasoning": reasoning}
+    )
+
+
+def scripted_response(messages):
+    """Pick a canned reply for the last user message."""
+    prompt = messages[-1].get("content", "") if messages else ""
+    system = " ".join(m.get("content", "") for m in messages if m["role"] == "system")
+
+    if "JSON-only judge" in prompt or "JSON-only judge" in system:
+        return json.dumps(
+            {
+                "pass": True,
+                "score": 90,
+                "feedback": "Stub judge: step looks correct.",
+                "reasons": ["Scripted response from stub server"],
+            }
+        )
+
+    match = re.search(r"Syntax error in ([\w./-]+\.py): .*? at line (\d+)", prompt)
+    if match:
+        return _reasoning(
+            f"Syntax error in {match.group(1)} at line {match.group(2)}; adding the missing colon.",
+            "fix_syntax_error",
+            f"{match.group(1)}:{match.group(2)}:add_colon",
+        )
+
+    match = re.search(r"\./([\w./-]+?\.py):(\d+):\d+: E30[23]", prompt)
+    if match:
+        return _reasoning(
+            f"E302 lint error in {match.group(1)} at line {match.group(2)}; adding blank lines.",
+            "fix_syntax_error",
+            f"{match.group(1)}:{match.group(2)}:add_blank_lines",
+        )
+
+    match = re.search(
+        r"(?:\./([\w./-]+?\.py):\d+:\d+: F821 undefined name|NameError: name) \\?'(\w+)",
+        prompt,
+    )
+    if match:
+        file_path = match.group(1) or "calculator.py"
+        return _reasoning(
+            f"Module {match.group(2)} is used in {file_path} without being imported.",
+            "add_import",
+            f"{file_path}:import {match.group(2)}",
+        )
+
+    return _reasoning("Verifying the current state by running CI.", "run_ci_pipeline")
+
+
+class StubConfig:
+    def __init__(
+        self,
+        latency=0.0,
+        jitter=0.0,
+        error_rate=0.0,
+        rate_limit_rate=0.0,
+        rate_limit_first=0,
+        api_key=None,
+        prose_models=(),
+        failing_models=(),
+    ):
+        self.latency = latency
+        self.jitter = jitter
+        self.error_rate = error_rate
+        self.rate_limit_rate = rate_limit_rate
+        # The first N requests are rate limited (deterministic, for retry tests)
+        self.rate_limit_first = rate_limit_first
+        # When set, requests with another key get a 401 (any key by default)
+        self.api_key = api_key
+        # Stand-ins for weak models: prose instead of JSON, or a 500
+        self.prose_models = set(prose_models)
+        self.failing_models = set(failing_models)
+        self.requests = 0
+        self.models = []  # Model of every chat request, in order
+        self.lock = threading.Lock()
+
+
+class StubHandler(BaseHTTPRequestHandler):
+    config = StubConfig()
+    protocol_version = "HTTP/1.1"
+
+    def log_message(self, format, *args):
+        pass  # Keep load tests quiet
+
+    def _send_json(self, status, payload, headers=None):
+        body = json.dumps(payload).encode()
+        self.send_response(status)
+        self.send_header("Content-Type", "application/json")
+        self.send_header("Content-Length", str(len(body)))
+        for name, value in (headers or {}).items():
+            self.send_header(name, value)
+        self.end_headers()
+        self.wfile.write(body)
+
+    def do_GET(self):
+        if self.path.rstrip("/").endswith("/models"):
+            self._send_json(
+                200, {"object": "list", "data": [{"id": "gpt-4o-mini", "object": "model"}]}
+            )
+        else:
+            self._send_json(404, {"error": {"message": "Not found"}})
+
+    def do_POST(self):
+        length = int(self.headers.get("Content-Length", 0))
+        try:
+            request = json.loads(self.rfile.read(length) or b"{}")
+        except json.JSONDecodeError:
+            self._send_json(400, {"error": {"message": "Invalid JSON body"}})
+            return
+
+        if not self.path.rstrip("/").endswith("/chat/completions"):
+            self._send_json(404, {"error": {"message": f"Unknown path {self.path}"}})
+            return
+
+        config = self.config
+        model = request.get("model", "gpt-4o-mini")
+        with config.lock:
+            config.requests += 1
+            config.models.append(model)
+            limited = config.requests <= config.rate_limit_first
+
+        if config.api_key and self.headers.get("Authorization") != f"Bearer {config.api_key}":
+            self._send_json(
+                401, {"error": {"message": "Incorrect API key (stub)", "type": "invalid_api_key"}}
+            )
+            return
+
+        delay = config.latency + random.uniform(-config.jitter, config.jitter)
+        time.sleep(max(0.0, delay))
+
+        roll = random.random()
+        if limited or roll < config.rate_limit_rate:
+            self._send_json(
+                429,
+                {"error": {"message": "Rate limit reached (stub)", "type": "rate_limit"}},
+                {"Retry-After": "1"},
+            )
+            return
+        if roll < config.rate_limit_rate + config.error_rate or model in config.failing_models:
+            self._send_json(500, {"error": {"message": "Injected server error (stub)"}})
+            return
+
+        messages = request.get("messages", [])
+        if model in config.prose_models:
+            content = "I think the colon is missing, so you could add one."
+        else:
+            content = scripted_response(messages)
+        prompt_tokens = sum(len(m.get("content", "")) for m in messages) // 4
+        completion_tokens = len(content) // 4
+        completion_id = f"chatcmpl-{uuid.uuid4().hex[:24]}"
+
+        usage = {
+            "prompt_tokens": prompt_tokens,
+            "completion_tokens": completion_tokens,
+            "total_tokens": prompt_tokens + completion_tokens,
+        }
+
+        if request.get("stream"):
+            include_usage = (request.get("stream_options") or {}).get("include_usage")
+            self._stream(completion_id, model, content, usage if include_usage else None)
+            return
+
+        self._send_json(
+            200,
+            {
+                "id": completion_id,
+                "object": "chat.completion",
+                "created": int(time.time()),
+                "model": model,
+                "choices": [
+                    {
+                        "index": 0,
+                        "message": {"role": "assistant", "content": content},
+                        "finish_reason": "stop",
+                    }
+                ],
+                "usage": usage,
+            },
+        )
+
+    def _stream(self, completion_id, model, content, usage=None):
+        self.send_response(200)
+        self.send_header("Content-Type", "text/event-stream")
+        self.send_header("Cache-Control", "no-cache")
+        self.send_header("Connection", "close")
+        self.end_headers()
+
+        def send(chunk):
+            chunk = {
+                "id": completion_id,
+                "object": "chat.completion.chunk",
+                "created": int(time.time()),
+                "model": model,
+                **chunk,
+            }
+            self.wfile.write(f"data: {json.dumps(chunk)}\n\n".encode())
+            self.wfile.flush()
+
+        def event(delta, finish_reason=None):
+            send({"choices": [{"index": 0, "delta": delta, "finish_reason": finish_reason}]})
+
+        event({"role": "assistant", "content": ""})
+        for i in range(0, len(content), 16):
+            event({"content": content[i : i + 16]})
+        event({}, "stop")
+        if usage is not None:
+            # As with stream_options.include_usage: a last chunk with no choices
+            send({"choices": [], "usage": usage})
+        self.wfile.write(b"data: [DONE]\n\n")
+        self.wfile.flush()
+        self.close_connection = True
+
+
+def create_server(host="127.0.0.1", port=8765, config=None):
+    """Create (but do not start) a stub server; port 0 picks a free port."""
+    handler = type("ConfiguredStubHandler", (StubHandler,), {"config": config or StubConfig()})
+    server = ThreadingHTTPServer((host, port), handler)
+    server.daemon_threads = True
+    return server
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--host", default="127.0.0.1")
+    parser.add_argument("--port", type=int, default=8765)
+    parser.add_argument("--latency", type=float, default=0.0, help="Mean seconds per response")
+    parser.add_argument("--jitter", type=float, default=0.0, help="Uniform +/- seconds added to latency")
+    parser.add_argument("--error-rate", type=float, default=0.0, help="Fraction of 500 responses")
+    parser.add_argument("--rate-limit-rate", type=float, default=0.0, help="Fraction of 429 responses")
+    args = parser.parse_args()
+
+    config = StubConfig(args.latency, args.jitter, args.error_rate, args.rate_limit_rate)
+    server = create_server(args.host, args.port, config)
+    print(f"Stub LLM server listening on http://{args.host}:{server.server_port}/v1")
+    try:
+        server.serve_forever()
+    except KeyboardInterrupt:
+        pass
+    finally:
+        server.server_close()
+
+
+if __name__ == "__main__":
+    main()
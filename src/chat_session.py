@@ -0,0 +1,181 @@
+"""Multi-turn chat sessions on top of the cached LLM client"""
+
+from __future__ import annotations
+
+from typing import Any, Dict, List, Optional
+
+from .llm import acall_openai_chat, call_openai_chat
+from .rate_limiter import estimate_tokens
+
+_ERROR_PREFIX = "Error calling API:"
+
+SUMMARY_PROMPT = (
+    "Summarize the earlier part of this CI-fixing conversation in a few short "
+    "bullet points: failures seen, fixes attempted and their outcome. "
+    "Reply with the bullet points only."
+)
+
+
+class ChatSession:
+    """Structured message history with a stable prefix and a token budget.
+
+    The system message always comes first and never changes, so providers that
+    cache prompt prefixes can reuse it across turns. When the history exceeds
+    ``token_budget`` the oldest turns are dropped (``keep_turns`` most recent
+    turns are always kept); with ``summarize`` they are first folded into a
+    running summary placed right after the system message. Each turn's answer
+    is cached under the full message list, so replaying a conversation is free.
+    """
+
+    def __init__(
+        self,
+        system_msg: Optional[str] = None,
+        model: str = "gpt-4o-mini",
+        max_tokens: int = 1000,
+        token_budget: int = 8000,
+        keep_turns: int = 2,
+        summarize: bool = False,
+        raise_on_error: bool = False,
+    ):
+        self.system_msg = system_msg
+        self.model = model
+        self.max_tokens = max_tokens
+        self.token_budget = token_budget
+        self.keep_turns = keep_turns
+        self.summarize = summarize
+        self.raise_on_error = raise_on_error
+        self.summary: Optional[str] = None
+        self.history: List[Dict[str, str]] = []
+        self.dropped_turns = 0
+
+    @property
+    def messages(self) -> List[Dict[str, str]]:
+        """Return the messages sent on the next turn (prefix + history)."""
+        messages = []
+        if self.system_msg:
+            messages.append({"role": "system", "content": self.system_msg})
+        if self.summary:
+            messages.append(
+                {
+                    "role": "system",
+                    "content": f"Summary of earlier turns:\n{self.summary}",
+                }
+            )
+        return messages + self.history
+
+    def token_count(self) -> int:
+        """Estimated prompt tokens of the current messages."""
+        return estimate_tokens(self.messages, 0)
+
+    def _turns(self) -> List[List[Dict[str, str]]]:
+        """Group history into turns, each starting with a user message."""
+        turns: List[List[Dict[str, str]]] = []
+        for message in self.history:
+            if message["role"] == "user" or not turns:
+                turns.append([])
+            turns[-1].append(message)
+        return turns
+
+    def _trim(self) -> List[Dict[str, str]]:
+        """Drop old turns until under budget and return the dropped messages."""
+        turns = self._turns()
+        dropped: List[Dict[str, str]] = []
+        budget = self.token_budget - self.max_tokens
+        while len(turns) > self.keep_turns and self.token_count() > budget:
+            dropped.extend(turns.pop(0))
+            self.history = [m for turn in turns for m in turn]
+            self.dropped_turns += 1
+        return dropped
+
+    def _summary_prompt(self, dropped: List[Dict[str, str]]) -> str:
+        transcript = "\n".join(f"{m['role']}: {m['content']}" for m in dropped)
+        if self.summary:
+            transcript = f"Previous summary:\n{self.summary}\n\n{transcript}"
+        return transcript
+
+    def _set_summary(self, result: str) -> None:
+        # Keep the old summary rather than storing an error message
+        if not result.startswith(_ERROR_PREFIX):
+            self.summary = result
+
+    def _snapshot(self) -> tuple:
+        return list(self.history), self.summary, self.dropped_turns
+
+    def _restore(self, snapshot: tuple) -> None:
+        self.history, self.summary, self.dropped_turns = snapshot
+
+    def _finish(self, reply: str, snapshot: tuple) -> str:
+        if reply.startswith(_ERROR_PREFIX):
+            # Leave history (including trimmed turns) as it was so the turn
+            # can simply be retried
+            self._restore(snapshot)
+        else:
+            self.history.append({"role": "assistant", "content": reply})
+        return reply
+
+    def send(self, content: str, **kwargs: Any) -> str:
+        """Add a user message, get the assistant reply and record it."""
+        snapshot = self._snapshot()
+        self.history.append({"role": "user", "content": content})
+        dropped = self._trim()
+        if dropped and self.summarize:
+            self._set_summary(
+                call_openai_chat(
+                    self._summary_prompt(dropped),
+                    SUMMARY_PROMPT,
+                    model=self.model,
+                    max_tokens=300,
+                )
+            )
+        messages = self.messages
+        try:
+            reply = call_openai_chat(
+                content,
+                model=self.model,
+                max_tokens=self.max_tokens,
+                raise_on_error=self.raise_on_error,
+                messages=messages,
+                **kwargs,
+            )
+        except Exception:
+            self._restore(snapshot)
+            raise
+        return self._finish(reply, snapshot)
+
+    async def asend(self, content: str, **kwargs: Any) -> str:
+        """Async counterpart of send."""
+        snapshot = self._snapshot()
+        self.history.append({"role": "user", "content": content})
+        dropped = self._trim()
+        if dropped and self.summarize:
+            self._set_summary(
+                await acall_openai_chat(
+                    self._summary_prompt(dropped),
+                    SUMMARY_PROMPT,
+                    model=self.model,
+                    max_tokens=300,
+                )
+            )
+        messages = self.messages
+        try:
+            reply = await acall_openai_chat(
+                content,
+                model=self.model,
+                max_tokens=self.max_tokens,
+                raise_on_error=self.raise_on_error,
+                messages=messages,
+                **kwargs,
+            )
+        except Exception:
+            self._restore(snapshot)
+            raise
+        return self._finish(reply, snapshot)
+
+    def reset(self) -> None:
+        """Forget the conversation but keep the system prefix."""
+        self.history = []
+        self.summary = None
+        self.dropped_turns = 0
+
+
+__all__ = ["ChatSession"]
@@ -0,0 +1,337 @@
+"""Persistent CI worker: a fork server that runs CI pipelines on request
+
+``python -m src.ci_worker serve`` imports the CI tooling (flake8, pyflakes,
+pycodestyle, pytest, yaml) once and listens on a Unix socket. Each request
+forks a child that inherits those modules, so a verification skips
+interpreter startup and imports. Inside the child, ``python3 -m flake8`` /
+``python3 -m pytest`` calls made by the workspace's CIPipeline run in a
+forked grandchild instead of a fresh interpreter.
+
+Clients send one JSON line ``{"workspace": "/abs/path"}`` (optionally with
+``"checks": ["syntax", ...]``) and read back one
+JSON line with the run_ci_pipeline result. run_ci_pipeline uses the worker
+when CI_WORKER_SOCKET points at a running server, waiting up to
+CI_WORKER_TIMEOUT seconds (default 180) for the result.
+"""
+
+from __future__ import annotations
+
+import asyncio
+import importlib
+import json
+import os
+import runpy
+import signal
+import socket
+import socketserver
+import subprocess
+import sys
+import tempfile
+import time
+from typing import Any, Dict, List, Optional
+
+# Modules imported up front so forked children get them for free
+PRELOAD_MODULES = [
+    "yaml",
+    "pyflakes.checker",
+    "pycodestyle",
+    "flake8.main.cli",
+    "flake8.main.application",
+    "pytest",
+    "_pytest.config",
+    "_pytest.terminal",
+]
+
+# ``python3 -m <module>`` commands served without a fresh interpreter
+FORKED_MODULES = ("flake8", "pytest")
+
+_real_subprocess_run = subprocess.run
+
+
+def default_timeout() -> float:
+    """Seconds to wait for a worker result (CI_WORKER_TIMEOUT, default 180)."""
+    return float(os.getenv("CI_WORKER_TIMEOUT", "180"))
+
+
+def default_socket_path() -> str:
+    return os.getenv("CI_WORKER_SOCKET") or os.path.join(
+        tempfile.gettempdir(), f"ci-worker-{os.getuid()}.sock"
+    )
+
+
+def preload(modules: List[str] = PRELOAD_MODULES) -> List[str]:
+    """Import what is available; return the modules that were loaded."""
+    loaded = []
+    for name in modules:
+        try:
+            importlib.import_module(name)
+            loaded.append(name)
+        except ImportError:
+            pass
+    return loaded
+
+
+def warm_up() -> None:
+    """Run pytest and flake8 once on an empty dir so their entry-point
+    plugins are imported before children are forked."""
+    import contextlib
+    import io
+
+    with tempfile.TemporaryDirectory() as empty:
+        runs = (("pytest", ["-q", "-p", "no:cacheprovider", empty]), ("flake8", [empty]))
+        for module, argv in runs:
+            if module not in sys.modules:
+                continue
+            quiet = contextlib.redirect_stdout(io.StringIO())
+            with quiet, contextlib.redirect_stderr(io.StringIO()):
+                try:
+                    if module == "pytest":
+                        sys.modules["pytest"].main(argv)
+                    else:
+                        sys.modules["flake8.main.cli"].main(argv)
+                except SystemExit:
+                    pass
+                except Exception:
+                    pass  # Warm-up is best effort
+
+
+def _forked_module(args: Any) -> Optional[str]:
+    """The module of a ``python3 -m <module> ...`` command we can serve."""
+    if not isinstance(args, (list, tuple)) or len(args) < 3 or args[1] != "-m":
+        return None
+    interpreters = ("python", "python3", os.path.basename(sys.executable))
+    if os.path.basename(str(args[0])) not in interpreters:
+        return None
+    return args[2] if args[2] in FORKED_MODULES and args[2] in sys.modules else None
+
+
+def _run_module(
+    python: str, module: str, argv: List[str], cwd: str, stdout_fd: int, stderr_fd: int
+) -> int:
+    """Body of the grandchild: behave like ``python3 -m module argv`` in cwd."""
+    # Report the interpreter name that was asked for (pytest prints it)
+    executable = os.path.join(os.path.dirname(sys.executable), os.path.basename(python))
+    if os.path.exists(executable):
+        sys.executable = executable
+    os.chdir(cwd)
+    os.dup2(stdout_fd, 1)
+    os.dup2(stderr_fd, 2)
+    sys.argv = [module, *argv]
+    sys.path.insert(0, cwd)  # As `python -m` does
+    try:
+        runpy.run_module(module, run_name="__main__", alter_sys=True)
+        code = 0
+    except SystemExit as e:
+        if e.code is None or isinstance(e.code, int):
+            code = e.code or 0
+        else:
+            print(e.code, file=sys.stderr)
+            code = 1
+    except BaseException as e:
+        print(f"{type(e).__name__}: {e}", file=sys.stderr)
+        code = 1
+    sys.stdout.flush()
+    sys.stderr.flush()
+    return code
+
+
+def forked_run(args, cwd=None, capture_output=False, text=False, timeout=None, **kwargs):
+    """subprocess.run replacement used inside worker children.
+
+    Pre-imported ``python3 -m flake8|pytest`` commands with captured output run
+    in a forked grandchild; anything else goes to the real subprocess.run.
+    """
+    module = _forked_module(args)
+    if module is None or not capture_output or kwargs:
+        return _real_subprocess_run(
+            args, cwd=cwd, capture_output=capture_output, text=text, timeout=timeout, **kwargs
+        )
+
+    with tempfile.TemporaryFile() as out, tempfile.TemporaryFile() as err:
+        sys.stdout.flush()
+        sys.stderr.flush()
+        pid = os.fork()
+        if pid == 0:
+            code = 1
+            try:
+                code = _run_module(
+                    str(args[0]),
+                    module,
+                    list(args[3:]),
+                    str(cwd or os.getcwd()),
+                    out.fileno(),
+                    err.fileno(),
+                )
+            finally:
+                os._exit(code)
+
+        deadline = None if timeout is None else time.monotonic() + timeout
+        while True:
+            done, status = os.waitpid(pid, os.WNOHANG)
+            if done:
+                break
+            if deadline is not None and time.monotonic() > deadline:
+                os.kill(pid, signal.SIGKILL)
+                os.waitpid(pid, 0)
+                raise subprocess.TimeoutExpired(args, timeout)
+            time.sleep(0.002)
+
+        returncode = os.waitstatus_to_exitcode(status)
+        out.seek(0)
+        err.seek(0)
+        stdout, stderr = out.read(), err.read()
+    if text:
+        stdout = stdout.decode(errors="replace")
+        stderr = stderr.decode(errors="replace")
+    return subprocess.CompletedProcess(list(args), returncode, stdout, stderr)
+
+
+class _Handler(socketserver.StreamRequestHandler):
+    def handle(self) -> None:
+        # Runs in a forked child; patching is local to this request
+        from .tools.ci_runner import run_ci_pipeline
+
+        subprocess.run = forked_run
+        try:
+            request = json.loads(self.rfile.readline() or b"{}")
+            workspace = request.get("workspace")
+            if not workspace or not os.path.isdir(workspace):
+                result = {
+                    "action": "run_ci_pipeline",
+                    "status": "fail",
+                    "error": f"CI error - workspace not found: {workspace}",
+                }
+            else:
+                # Sequential: forking flake8/pytest from a threaded child could
+                # inherit locks held by other threads
+                result = run_ci_pipeline(
+                    workspace, isolated=False, checks=request.get("checks"), parallel=False
+                )
+        except Exception as e:
+            result = {"action": "run_ci_pipeline", "status": "fail", "error": f"CI error - {e}"}
+        self.wfile.write(json.dumps(result).encode() + b"\n")
+
+
+class CIWorkerServer(socketserver.ForkingMixIn, socketserver.UnixStreamServer):
+    """Unix socket server forking one child per CI request."""
+
+    block_on_close = False
+
+    def __init__(self, socket_path: str):
+        if os.path.exists(socket_path):
+            os.unlink(socket_path)  # Stale socket from a previous run
+        super().__init__(socket_path, _Handler)
+        self.socket_path = socket_path
+
+    def server_close(self) -> None:
+        super().server_close()
+        if os.path.exists(self.socket_path):
+            os.unlink(self.socket_path)
+
+
+def serve(socket_path: Optional[str] = None) -> None:
+    """Preload and warm up the CI tooling, then serve until interrupted."""
+    socket_path = socket_path or default_socket_path()
+    # Children run pipelines locally rather than calling back into the worker
+    os.environ.pop("CI_WORKER_SOCKET", None)
+    loaded = preload()
+    warm_up()
+    server = CIWorkerServer(socket_path)
+    # Clean up the socket on SIGTERM as on Ctrl-C
+    signal.signal(signal.SIGTERM, signal.default_int_handler)
+    print(f"CI worker listening on {socket_path} (preloaded: {', '.join(loaded)})", flush=True)
+    try:
+        server.serve_forever()
+    except KeyboardInterrupt:
+        pass
+    finally:
+        server.server_close()
+
+
+def _payload(workspace: str, checks: Optional[List[str]]) -> bytes:
+    request = {"workspace": os.path.abspath(workspace)}
+    if checks:
+        request["checks"] = list(checks)
+    return json.dumps(request).encode() + b"\n"
+
+
+def request(
+    workspace: str,
+    socket_path: Optional[str] = None,
+    timeout: Optional[float] = None,
+    checks: Optional[List[str]] = None,
+) -> Dict[str, Any]:
+    """Run the CI pipeline of workspace on the worker.
+
+    Raises socket.timeout when no result arrives within ``timeout`` (default
+    from CI_WORKER_TIMEOUT) and another OSError if the worker is down.
+    """
+    payload = _payload(workspace, checks)
+    with socket.socket(socket.AF_UNIX, socket.SOCK_STREAM) as sock:
+        sock.settimeout(default_timeout() if timeout is None else timeout)
+        sock.connect(socket_path or default_socket_path())
+        sock.sendall(payload)
+        with sock.makefile("rb") as reader:
+            line = reader.readline()
+    if not line:
+        raise ConnectionError("CI worker closed the connection without a result")
+    return json.loads(line)
+
+
+async def arequest(
+    workspace: str,
+    socket_path: Optional[str] = None,
+    timeout: Optional[float] = None,
+    checks: Optional[List[str]] = None,
+) -> Dict[str, Any]:
+    """Async counterpart of request; raises asyncio.TimeoutError on timeout."""
+    payload = _payload(workspace, checks)
+    reader, writer = await asyncio.open_unix_connection(socket_path or default_socket_path())
+    try:
+        writer.write(payload)
+        await writer.drain()
+        line = await asyncio.wait_for(
+            reader.readline(), default_timeout() if timeout is None else timeout
+        )
+    finally:
+        writer.close()
+    if not line:
+        raise ConnectionError("CI worker closed the connection without a result")
+    return json.loads(line)
+
+
+def main(argv=None) -> int:
+    """``python -m src.ci_worker {serve,run} [--socket PATH] [--checks LIST] [workspace]``"""
+    import argparse
+
+    parser = argparse.ArgumentParser(description="Persistent CI worker (fork server)")
+    parser.add_argument("command", choices=["serve", "run"])
+    parser.add_argument("workspace", nargs="?", default=".", help="Workspace for 'run'")
+    parser.add_argument("--socket", help="Unix socket (default: CI_WORKER_SOCKET or a temp path)")
+    parser.add_argument("--checks", help="Checks for 'run', e.g. syntax,lint (default: all)")
+    args = parser.parse_args(argv)
+
+    if args.command == "serve":
+        serve(args.socket)
+        return 0
+    checks = args.checks.split(",") if args.checks else None
+    result = request(args.workspace, args.socket, checks=checks)
+    print(json.dumps(result, indent=2))
+    return 0 if result.get("status") == "pass" else 1
+
+
+__all__ = [
+    "CIWorkerServer",
+    "serve",
+    "request",
+    "arequest",
+    "preload",
+    "warm_up",
+    "forked_run",
+    "default_socket_path",
+    "default_timeout",
+]
+
+
+if __name__ == "__main__":
+    raise SystemExit(main())
@@ -0,0 +1,191 @@
+"""Structured events and timing spans emitted by the ReAct runners"""
+
+from __future__ import annotations
+
+import json
+import os
+import threading
+import time
+import uuid
+from typing import Any, Callable, Dict, Iterable, List, Optional, Union
+
+EventSink = Callable[[Dict[str, Any]], None]
+
+_global_sinks: List[EventSink] = []
+_global_sinks_lock = threading.Lock()
+
+
+class JSONLEventSink:
+    """Append each event as one JSON line; safe to share between threads."""
+
+    def __init__(self, path: str):
+        self.path = path
+        self._lock = threading.Lock()
+        os.makedirs(os.path.dirname(os.path.abspath(path)), exist_ok=True)
+
+    def __call__(self, event: Dict[str, Any]) -> None:
+        line = json.dumps(event, default=str) + "\n"
+        with self._lock:
+            # One unbuffered O_APPEND write keeps lines from concurrent
+            # processes intact
+            fd = os.open(self.path, os.O_WRONLY | os.O_APPEND | os.O_CREAT, 0o644)
+            try:
+                os.write(fd, line.encode("utf-8"))
+            finally:
+                os.close(fd)
+
+
+class QueueEventSink:
+    """Put events on a queue.Queue / multiprocessing queue for a consumer."""
+
+    def __init__(self, queue: Any):
+        self.queue = queue
+
+    def __call__(self, event: Dict[str, Any]) -> None:
+        self.queue.put(event)
+
+
+def add_event_sink(sink: EventSink) -> None:
+    """Register a sink that receives the events of every run in the process."""
+    with _global_sinks_lock:
+        _global_sinks.append(sink)
+
+
+def remove_event_sink(sink: EventSink) -> None:
+    with _global_sinks_lock:
+        if sink in _global_sinks:
+            _global_sinks.remove(sink)
+
+
+_env_sinks: Dict[str, JSONLEventSink] = {}
+
+
+def _default_sinks() -> List[EventSink]:
+    """Registered sinks plus a JSONL file when REACT_EVENTS_PATH is set."""
+    with _global_sinks_lock:
+        sinks = list(_global_sinks)
+        path = os.getenv("REACT_EVENTS_PATH")
+        if path:
+            if path not in _env_sinks:
+                _env_sinks[path] = JSONLEventSink(path)
+            sinks.append(_env_sinks[path])
+    return sinks
+
+
+def _usage_totals(records: List[Dict[str, Any]]) -> Dict[str, Any]:
+    return {
+        "llm_calls": len(records),
+        "prompt_tokens": sum(r.get("prompt_tokens", 0) for r in records),
+        "completion_tokens": sum(r.get("completion_tokens", 0) for r in records),
+        "total_tokens": sum(r.get("total_tokens", 0) for r in records),
+        "cost_usd": round(sum(r.get("cost_usd", 0.0) for r in records), 6),
+    }
+
+
+class Span:
+    """A timed phase: emits ``<name>_start`` now and ``<name>_end`` on end().
+
+    ``end`` is idempotent; spans still open when the emitter closes them are
+    ended with ``completed: False``. When the emitter tracks LLM usage, the
+    end event carries the calls and tokens spent during the span.
+    """
+
+    def __init__(self, emitter: "EventEmitter", name: str, fields: Dict[str, Any]):
+        self.emitter = emitter
+        self.name = name
+        self.fields = fields
+        self.start = time.perf_counter()
+        self._usage_mark = len(emitter.usage) if emitter.usage is not None else 0
+        self.ended = False
+        emitter.emit(f"{name}_start", **fields)
+
+    def set(self, **fields: Any) -> None:
+        """Add fields to the end event."""
+        self.fields.update(fields)
+
+    def skip_usage(self) -> None:
+        """Leave the LLM usage recorded so far out of this span (e.g. a
+        streamed reasoning call that overlapped it and has its own span)."""
+        if self.emitter.usage is not None:
+            self._usage_mark = len(self.emitter.usage)
+
+    def end(self, **fields: Any) -> None:
+        if self.ended:
+            return
+        self.ended = True
+        self.fields.update(fields)
+        self.fields["duration_seconds"] = round(time.perf_counter() - self.start, 6)
+        usage = self.emitter.usage
+        if usage is not None and len(usage) > self._usage_mark:
+            self.fields.update(_usage_totals(usage[self._usage_mark:]))
+        self.emitter._open.discard(self)
+        self.emitter.emit(f"{self.name}_end", **self.fields)
+
+    def __enter__(self) -> "Span":
+        return self
+
+    def __exit__(self, exc_type, exc, tb) -> None:
+        if exc is not None:
+            self.fields.setdefault("error", f"{type(exc).__name__}: {exc}")
+        self.end()
+
+
+class EventEmitter:
+    """Sends run events to sinks; a sink failure never breaks the run.
+
+    ``sinks`` may be one callable or an iterable of them; sinks registered with
+    add_event_sink (and REACT_EVENTS_PATH) are always included. Every event
+    has ``type``, ``ts`` (epoch seconds), ``run_id`` and the emitter's context
+    fields (e.g. ``workspace``).
+    """
+
+    def __init__(
+        self,
+        sinks: Union[EventSink, Iterable[EventSink], None] = None,
+        usage: Optional[List[Dict[str, Any]]] = None,
+        **context: Any,
+    ):
+        if sinks is None:
+            sinks = []
+        elif callable(sinks):
+            sinks = [sinks]
+        self.sinks = list(sinks) + _default_sinks()
+        self.usage = usage
+        self.context = {"run_id": uuid.uuid4().hex[:12], **context}
+        self._open: "set[Span]" = set()
+
+    @property
+    def enabled(self) -> bool:
+        return bool(self.sinks)
+
+    def emit(self, event_type: str, **fields: Any) -> None:
+        if not self.sinks:
+            return
+        event = {"type": event_type, "ts": round(time.time(), 6), **self.context, **fields}
+        for sink in self.sinks:
+            try:
+                sink(event)
+            except Exception:
+                pass  # Telemetry must not affect the agent
+
+    def span(self, name: str, **fields: Any) -> Span:
+        span = Span(self, name, fields)
+        self._open.add(span)
+        return span
+
+    def end_open(self, after: Optional[Span] = None) -> None:
+        """End spans opened after ``after`` (all when None) that an early
+        continue/return left open, innermost first."""
+        for span in sorted(self._open, key=lambda s: s.start, reverse=True):
+            if after is None or (span is not after and span.start >= after.start):
+                span.end(completed=False)
+
+
+__all__ = [
+    "EventEmitter",
+    "Span",
+    "JSONLEventSink",
+    "QueueEventSink",
+    "add_event_sink",
+    "remove_event_sink",
+]
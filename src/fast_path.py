@@ -0,0 +1,120 @@
+"""Rule-based reasoning for CI failures that need no LLM"""
+
+import os
+import re
+import sys
+
+# Quotes and newlines inside observations may be escaped (they embed dict reprs)
+_Q = r"\\?['\"]"
+_PATH = r"(?:^|(?<=\\n)|(?<=[\s\"']))(?:\./)?([\w./-]+?\.py)"
+
+_SYNTAX_ERROR = re.compile(r"Syntax error in (?:\./)?([\w./-]+\.py): (.+?) at line (\d+)")
+# Only the codes the tool can fix: add_blank_lines always leaves two blank lines
+_LINT_ERROR = re.compile(rf"{_PATH}:(\d+):\d+: (E30[25])", re.M)
+_UNDEFINED_NAME = re.compile(
+    rf"{_PATH}:\d+:\d+: F821 undefined name {_Q}(\w+){_Q}", re.M
+)
+_NAME_ERROR = re.compile(rf"NameError: name {_Q}(\w+){_Q} is not defined")
+_NAME_ERROR_FILE = re.compile(rf"{_PATH}:\d+: NameError", re.M)
+# A fix was applied, or only a subset of the checks has been run
+_FIX_APPLIED = re.compile(
+    r"(?:completed successfully|CI checks passed: [\w, ]+)\. "
+    r"Run (?:the full )?CI pipeline to verify"
+)
+
+# Syntax error messages the fix_syntax_error tool knows how to repair
+_SYNTAX_FIXES = [
+    (re.compile(rf"expected {_Q}:{_Q}"), "add_colon"),
+    (re.compile(rf"Missing parentheses in call to {_Q}print{_Q}"), "add_parenthesis"),
+    (re.compile(r"expected an indented block|unexpected indent"), "fix_indentation"),
+]
+
+
+def _call(reasoning, tool, tool_input=""):
+    return {
+        "reasoning": reasoning,
+        "tool_call": {"tool": tool, "input": tool_input},
+        "source": "fast_path",
+    }
+
+
+def _is_module(name):
+    return name in getattr(sys, "stdlib_module_names", ())
+
+
+class FastPathReasoner:
+    """Maps recognizable CI failures straight to tool calls.
+
+    ``reason`` returns a reasoning dict like ``ReActAgent.reason`` or None when
+    no rule applies. A fix already issued for the same observation is not
+    repeated, so a fix that did not help falls back to the LLM.
+    """
+
+    def __init__(self):
+        self._issued = set()
+
+    def _match(self, observation):
+        if _FIX_APPLIED.search(observation):
+            return _call(
+                "A fix was applied; re-running CI to verify it.", "run_ci_pipeline"
+            )
+
+        match = _SYNTAX_ERROR.search(observation)
+        if match:
+            file_path, message, line = match.groups()
+            for pattern, fix in _SYNTAX_FIXES:
+                if pattern.search(message):
+                    return _call(
+                        f"Syntax error in {file_path} at line {line}: {message}.",
+                        "fix_syntax_error",
+                        f"{file_path}:{line}:{fix}",
+                    )
+            return None
+
+        match = _LINT_ERROR.search(observation)
+        if match:
+            file_path, line, code = match.groups()
+            return _call(
+                f"{code} blank-line lint error in {file_path} at line {line}.",
+                "fix_syntax_error",
+                f"{file_path}:{line}:add_blank_lines",
+            )
+
+        match = _UNDEFINED_NAME.search(observation)
+        if match and _is_module(match.group(2)):
+            file_path, name = match.groups()
+            return _call(
+                f"Module {name} is used in {file_path} without being imported.",
+                "add_import",
+                f"{file_path}:import {name}",
+            )
+
+        match = _NAME_ERROR.search(observation)
+        file_match = _NAME_ERROR_FILE.search(observation)
+        if match and file_match and _is_module(match.group(1)):
+            name, file_path = match.group(1), file_match.group(1)
+            return _call(
+                f"Module {name} is used in {file_path} without being imported.",
+                "add_import",
+                f"{file_path}:import {name}",
+            )
+        return None
+
+    def reason(self, observation):
+        """Return a tool call for observation, or None to defer to the LLM."""
+        reasoning = self._match(observation or "")
+        if reasoning is None:
+            return None
+
+        tool_call = reasoning["tool_call"]
+        if tool_call["tool"] != "run_ci_pipeline":
+            key = (observation, tool_call["tool"], tool_call["input"])
+            if key in self._issued:
+                return None  # Same failure after the same fix: let the LLM look
+            self._issued.add(key)
+        return reasoning
+
+
+def fast_path_enabled():
+    """The fast path is on unless AGENT_FAST_PATH is set to 0/false/no."""
+    return os.getenv("AGENT_FAST_PATH", "1").lower() not in ("0", "false", "no")
@@ -1,12 +1,14 @@
 """Helper functions for CI Agent"""
 
-import os
-
 
 def execute_tool_in_workspace(workspace_path, tool_name, params=""):
     """
     Execute a tool in the specified workspace directory.
 
+    Paths are resolved against workspace_path instead of changing the
+    process-wide working directory, so several workspaces can be worked on
+    from different threads at once.
+
     Args:
         workspace_path: Path to the workspace directory
         tool_name: Name of the tool to execute
@@ -15,14 +17,13 @@ def execute_tool_in_workspace(workspace_path, tool_name, params=""):
     Returns:
         Tool execution result
     """
-    original_cwd = os.getcwd()
-    try:
-        # Change to workspace directory for tool execution
-        if workspace_path:
-            os.chdir(workspace_path)
+    from src.tools import execute_action
+
+    return execute_action(tool_name, params, workspace=workspace_path or None)
+
 
-        from src.tools import execute_action
+async def aexecute_tool_in_workspace(workspace_path, tool_name, params=""):
+    """Async counterpart of execute_tool_in_workspace."""
+    from src.tools import aexecute_action
 
-        return execute_action(tool_name, params)
-    finally:
-        os.chdir(original_cwd)
+    return await aexecute_action(tool_name, params, workspace=workspace_path or None)
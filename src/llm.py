@@ -1,39 +1,519 @@
 from __future__ import annotations
 
 import os
-import json
+import asyncio
 import hashlib
-from typing import Any, Dict, List
+import re
+import weakref
+import sqlite3
+import threading
+import time
+from typing import Any, Awaitable, Callable, Dict, Iterator, List, Optional
 
 from dotenv import load_dotenv
-from openai import OpenAI
+from openai import (
+    AsyncOpenAI,
+    DefaultAsyncHttpxClient,
+    DefaultHttpxClient,
+    OpenAI,
+)
+
+from .llm_cache import CacheHitStats, LRUCache, SQLiteCacheStore
+from .llm_cassette import CassetteMissError, get_cassette
+from .llm_metrics import UsageTracker, last_call_record, usage_scope
+from .prompt_normalizer import PromptNormalizer
+from .rate_limiter import SharedRateLimiter, estimate_tokens
+from .llm_retry import (
+    LatencyTracker,
+    LLMRequestError,
+    RequestMetrics,
+    RetryPolicy,
+    acall_with_retries,
+    call_with_retries,
+)
+from .singleflight import AsyncSingleFlight, SingleFlight, StripedFileLock
+from .stream_parser import parse_reasoning_json
 
 
 load_dotenv()
 
+_DEFAULT_CACHE_PATH = os.path.join(
+    os.path.dirname(os.path.dirname(os.path.abspath(__file__))),
+    ".pytest_cache",
+    "llm_cache.sqlite3",
+)
+
+# Entries older than this are misses in both cache tiers (0 disables)
+_CACHE_TTL = float(os.getenv("LLM_CACHE_TTL", str(30 * 24 * 3600)))
+
+_cache_stores: Dict[str, SQLiteCacheStore] = {}
+_flight_locks: Dict[str, StripedFileLock] = {}
+_cache_stores_lock = threading.Lock()
+
+# Coalesce identical in-flight requests within the process
+_single_flight = SingleFlight()
+_async_single_flight = AsyncSingleFlight()
+
+# Outcome counters and latency window shared by every API request
+_request_metrics = RequestMetrics()
+_latencies = LatencyTracker()
+_usage_tracker = UsageTracker()
+
+# Process-local tier consulted before the on-disk store
+_memory_cache = LRUCache(
+    max_entries=int(os.getenv("LLM_MEMORY_CACHE_ENTRIES", "1024")),
+    max_bytes=int(os.getenv("LLM_MEMORY_CACHE_BYTES", str(32 * 1024 * 1024))),
+    ttl=_CACHE_TTL,
+)
+_cache_hit_stats = CacheHitStats()
+
+# Applied to prompts before hashing so volatile details don't defeat the cache
+_prompt_normalizer: Optional[Callable[[str], str]] = (
+    PromptNormalizer()
+    if os.getenv("LLM_NORMALIZE_PROMPTS", "1").lower() not in ("0", "false", "no")
+    else None
+)
+
+
+def cache_store_options() -> Dict[str, Any]:
+    """Read persistent cache limits from the environment.
+
+    LLM_CACHE_MAX_BYTES (default 256 MiB) and LLM_CACHE_TTL (seconds, default
+    30 days) bound the store; 0 disables either. LLM_CACHE_COMPRESS=0 stores
+    payloads uncompressed.
+    """
+    return {
+        "max_bytes": int(os.getenv("LLM_CACHE_MAX_BYTES", str(256 * 1024 * 1024))),
+        "ttl": float(os.getenv("LLM_CACHE_TTL", str(_CACHE_TTL))),
+        "compress": os.getenv("LLM_CACHE_COMPRESS", "1").lower()
+        not in ("0", "false", "no"),
+    }
+
+
+def get_cache_store() -> SQLiteCacheStore:
+    """Get the shared response cache (path overridable via LLM_CACHE_PATH)."""
+    path = os.getenv("LLM_CACHE_PATH") or _DEFAULT_CACHE_PATH
+    store = _cache_stores.get(path)
+    if store is None:
+        with _cache_stores_lock:
+            store = _cache_stores.get(path)
+            if store is None:
+                store = SQLiteCacheStore(path, **cache_store_options())
+                _cache_stores[path] = store
+    return store
+
+
+def get_flight_lock() -> StripedFileLock:
+    """Get the cross-process lock file that sits next to the cache store."""
+    path = get_cache_store().path + ".lock"
+    lock = _flight_locks.get(path)
+    if lock is None:
+        with _cache_stores_lock:
+            lock = _flight_locks.get(path)
+            if lock is None:
+                lock = StripedFileLock(
+                    path, timeout=float(os.getenv("LLM_SINGLEFLIGHT_TIMEOUT", "120"))
+                )
+                _flight_locks[path] = lock
+    return lock
+
+
+_rate_limiters: Dict[tuple, SharedRateLimiter] = {}
+
+
+def get_rate_limiter() -> SharedRateLimiter:
+    """Get the rate limiter shared by all processes using the same cache.
+
+    Limits come from LLM_RATE_LIMIT_RPM / LLM_RATE_LIMIT_TPM (0 disables) and
+    LLM_RATE_LIMIT_BURST_SECONDS; LLM_RATE_LIMIT_PATH overrides the state file.
+    """
+    path = os.getenv("LLM_RATE_LIMIT_PATH") or (
+        os.path.splitext(os.getenv("LLM_CACHE_PATH") or _DEFAULT_CACHE_PATH)[0]
+        + ".ratelimit"
+    )
+    config = (
+        path,
+        float(os.getenv("LLM_RATE_LIMIT_RPM", "0")),
+        float(os.getenv("LLM_RATE_LIMIT_TPM", "0")),
+        float(os.getenv("LLM_RATE_LIMIT_BURST_SECONDS", "5")),
+    )
+    limiter = _rate_limiters.get(config)
+    if limiter is None:
+        with _cache_stores_lock:
+            limiter = _rate_limiters.get(config)
+            if limiter is None:
+                limiter = SharedRateLimiter(*config)
+                _rate_limiters[config] = limiter
+    return limiter
+
+
+def get_memory_cache() -> LRUCache:
+    """Get the process-local LRU cache that fronts the persistent store."""
+    return _memory_cache
+
+
+def get_usage_tracker() -> UsageTracker:
+    """Get the tracker holding per-call token, latency and cost records."""
+    return _usage_tracker
+
+
+def set_prompt_normalizer(
+    normalizer: Optional[Callable[[str], str]],
+) -> Optional[Callable[[str], str]]:
+    """Replace the cache-key prompt normalizer (None disables); return the old one."""
+    global _prompt_normalizer
+    previous = _prompt_normalizer
+    _prompt_normalizer = normalizer
+    return previous
 
-def _get_cache_file(input_hash: str) -> str:
-    """Get cache file path based on input content hash for persistence across runs."""
-    cache_dir = os.path.join(os.getcwd(), ".pytest_cache")
-    os.makedirs(cache_dir, exist_ok=True)
-    return os.path.join(cache_dir, f"cache_{input_hash[:8]}.json")
+
+def get_cache_stats() -> Dict[str, Any]:
+    """Return cache hit rates per tier plus memory-tier and normalizer counters."""
+    stats: Dict[str, Any] = _cache_hit_stats.stats()
+    stats["memory"] = _memory_cache.stats()
+    normalizer_stats = getattr(_prompt_normalizer, "stats", None)
+    if callable(normalizer_stats):
+        stats.update(normalizer_stats())
+    return stats
+
+
+def get_request_metrics() -> Dict[str, int]:
+    """Return API attempt/retry/timeout/failure/hedge and throttling counters."""
+    stats = _request_metrics.snapshot()
+    stats.update(get_rate_limiter().stats())
+    return stats
 
 
 def _get_input_hash(prompt: str, system_msg: str, model: str, max_tokens: int) -> str:
     """Create a hash of input parameters for caching."""
+    normalize = _prompt_normalizer
+    if normalize is not None:
+        system_msg, prompt = normalize(system_msg), normalize(prompt)
     input_str = f"{system_msg}|{prompt}|{model}|{max_tokens}"
     return hashlib.sha256(input_str.encode()).hexdigest()[:16]
 
 
-def get_openai_client() -> OpenAI:
-    """Initialize and return OpenAI client with proper configuration."""
+def _get_messages_hash(
+    messages: List[Dict[str, str]], model: str, max_tokens: int
+) -> str:
+    """Create a cache key for a full multi-turn message list."""
+    normalize = _prompt_normalizer or (lambda text: text)
+    hasher = hashlib.sha256(f"messages|{model}|{max_tokens}".encode())
+    for message in messages:
+        content = normalize(message.get("content") or "")
+        # Length-prefix each part so message boundaries can't be forged
+        for part in (message["role"], content):
+            data = part.encode()
+            hasher.update(len(data).to_bytes(8, "big") + data)
+    return hasher.hexdigest()[:16]
+
+
+def _cache_key(
+    prompt: str,
+    system_msg: Optional[str],
+    messages: Optional[List[Dict[str, str]]],
+    model: str,
+    max_tokens: int,
+) -> str:
+    if messages is not None:
+        return _get_messages_hash(messages, model, max_tokens)
+    return _get_input_hash(prompt, system_msg or "", model, max_tokens)
+
+
+def _cache_lookup(cache_key: str) -> tuple:
+    """Return (source, content) from the memory then disk tier, counting hits."""
+    cached = _memory_cache.get(cache_key)
+    if cached is not None:
+        _cache_hit_stats.record("memory")
+        return "memory", cached
+    cached = _disk_cache_get(cache_key)
+    _cache_hit_stats.record("disk" if cached is not None else "miss")
+    return "disk", cached
+
+
+def _disk_cache_get(cache_key: str) -> Optional[str]:
+    """Look up a response in the persistent store and promote it to memory."""
+    try:
+        entry = get_cache_store().get_entry(cache_key)
+    except (sqlite3.Error, OSError):
+        return None
+
+    if entry is None:
+        return None
+    content, created_at = entry
+    # Keep the stored age so the memory tier expires it on the same schedule
+    _memory_cache.set(cache_key, content, created_at)
+    return content
+
+
+def _cache_set(cache_key: str, content: str) -> None:
+    """Store a response in both cache tiers, ignoring storage errors."""
+    _memory_cache.set(cache_key, content)
+    try:
+        get_cache_store().set(cache_key, content)
+    except (sqlite3.Error, OSError):
+        pass  # Continue silently if caching fails
+
+
+_client: Optional[OpenAI] = None
+_client_config: Optional[tuple] = None
+_client_lock = threading.Lock()
+
+
+def _get_client_settings() -> Dict[str, float]:
+    """Read connection pool and timeout settings from the environment."""
+    return {
+        "max_connections": int(os.getenv("OPENAI_MAX_CONNECTIONS", "20")),
+        "max_keepalive_connections": int(
+            os.getenv("OPENAI_MAX_KEEPALIVE_CONNECTIONS", "10")
+        ),
+        "keepalive_expiry": float(os.getenv("OPENAI_KEEPALIVE_EXPIRY", "30")),
+        "timeout": float(os.getenv("OPENAI_TIMEOUT", "60")),
+        "connect_timeout": float(os.getenv("OPENAI_CONNECT_TIMEOUT", "10")),
+    }
+
+
+def _build_http_options() -> Dict[str, Any]:
+    """Build shared pool limits and timeouts for sync and async clients.
+
+    Uses the HTTP library openai itself depends on (its Limits / Timeout
+    types), so no separate httpx install is required.
+    """
+    import openai
+
+    settings = _get_client_settings()
+    limits_type = type(openai.DEFAULT_CONNECTION_LIMITS)
+    return {
+        "limits": limits_type(
+            max_connections=settings["max_connections"],
+            max_keepalive_connections=settings["max_keepalive_connections"],
+            keepalive_expiry=settings["keepalive_expiry"],
+        ),
+        "timeout": openai.Timeout(
+            settings["timeout"], connect=settings["connect_timeout"]
+        ),
+    }
+
+
+def _create_openai_client(api_key: str, api_base: Optional[str]) -> OpenAI:
+    """Build an OpenAI client backed by a keep-alive connection pool."""
+    options = _build_http_options()
+    return OpenAI(
+        api_key=api_key,
+        base_url=api_base,
+        timeout=options["timeout"],
+        max_retries=0,  # Retries are handled by call_with_retries
+        http_client=DefaultHttpxClient(**options),
+    )
+
+
+def _get_api_credentials() -> tuple:
+    """Return (api_key, api_base), failing fast when no key is configured."""
     api_key = os.getenv("OPENAI_API_KEY")
     api_base = os.getenv("OPENAI_API_BASE")
     if not api_key:
         raise RuntimeError(
             "OPENAI_API_KEY environment variable is required for LLM usage"
         )
-    return OpenAI(api_key=api_key, base_url=api_base)
+    return api_key, api_base
+
+
+def get_openai_client() -> OpenAI:
+    """Return the process-wide OpenAI client, creating it on first use.
+
+    The client (and its connection pool) is reused by every caller in the
+    process. It is rebuilt if the API key or base URL changes, or after a fork.
+    """
+    global _client, _client_config
+
+    api_key, api_base = _get_api_credentials()
+    config = (api_key, api_base, os.getpid())
+    client = _client
+    if client is not None and _client_config == config:
+        return client
+
+    with _client_lock:
+        if _client is None or _client_config != config:
+            previous, previous_config = _client, _client_config
+            _client = _create_openai_client(api_key, api_base)
+            _client_config = config
+            # Credentials changed: release the old pool (not one inherited by fork)
+            if previous is not None and previous_config[2] == os.getpid():
+                try:
+                    previous.close()
+                except Exception:
+                    pass
+        return _client
+
+
+def reset_openai_client() -> None:
+    """Close and drop the shared client so the next call builds a fresh one."""
+    global _client, _client_config
+
+    with _client_lock:
+        if _client is not None and _client_config[2] == os.getpid():
+            try:
+                _client.close()
+            except Exception:
+                pass
+        _client = None
+        _client_config = None
+
+
+# Async clients are bound to the event loop that created their connection pool
+_async_clients: "weakref.WeakKeyDictionary[asyncio.AbstractEventLoop, tuple]" = (
+    weakref.WeakKeyDictionary()
+)
+
+
+def get_async_openai_client() -> AsyncOpenAI:
+    """Return the AsyncOpenAI client shared by callers on the running event loop."""
+    api_key, api_base = _get_api_credentials()
+    loop = asyncio.get_running_loop()
+    cached = _async_clients.get(loop)
+    if cached is not None and cached[0] == (api_key, api_base):
+        return cached[1]
+    if cached is not None:
+        # Credentials changed: close the old pool once in-flight calls allow
+        loop.create_task(cached[1].close())
+
+    options = _build_http_options()
+    client = AsyncOpenAI(
+        api_key=api_key,
+        base_url=api_base,
+        timeout=options["timeout"],
+        max_retries=0,  # Retries are handled by acall_with_retries
+        http_client=DefaultAsyncHttpxClient(**options),
+    )
+    _async_clients[loop] = ((api_key, api_base), client)
+    return client
+
+
+def _build_messages(prompt: str, system_msg: str = None) -> List[Dict[str, str]]:
+    """Construct messages array with optional system message."""
+    messages = []
+    if system_msg:
+        messages.append({"role": "system", "content": system_msg})
+    messages.append({"role": "user", "content": prompt})
+    return messages
+
+
+def _build_request_kwargs(
+    messages: List[Dict[str, str]],
+    model: str,
+    max_tokens: int,
+    stop: List[str] = None,
+    seed: int = None,
+    response_format: Dict[str, str] = None,
+) -> Dict[str, Any]:
+    """Build chat.completions kwargs with only provided non-None values."""
+    kwargs = {
+        "model": model,
+        "messages": messages,
+        "temperature": 0.0,  # Force deterministic temperature
+        "top_p": 0.1,  # Very low top_p for more deterministic results
+        "n": 1,  # Always single response for consistency
+        "max_tokens": max_tokens,
+        "presence_penalty": 0.0,
+        "frequency_penalty": 0.0,
+    }
+
+    # Add optional parameters only if they're provided to avoid API conflicts
+    if stop is not None:
+        kwargs["stop"] = stop
+
+    # Try to add seed if provided, but handle gracefully if API doesn't support it
+    if seed is not None:
+        kwargs["seed"] = seed
+
+    if response_format is not None:
+        kwargs["response_format"] = response_format
+    return kwargs
+
+
+def _fetch_once(cache_key: str, fetch: Callable[[], str]) -> str:
+    """Fetch a response while holding the key's cross-process lock.
+
+    Another process may have answered the same prompt while we waited for the
+    lock, so the persistent store is checked again before calling the API.
+    """
+    try:
+        lock = get_flight_lock()
+    except OSError:
+        lock = None
+
+    if lock is None:
+        content = fetch()
+        _cache_set(cache_key, content)
+        return content
+
+    with lock.hold(cache_key):
+        cached = _disk_cache_get(cache_key)
+        if cached is not None:
+            return cached
+        content = fetch()
+        _cache_set(cache_key, content)
+        return content
+
+
+async def _afetch_once(cache_key: str, fetch: Callable[[], Awaitable[str]]) -> str:
+    """Async counterpart of _fetch_once; lock waits run in a worker thread."""
+    try:
+        lock = get_flight_lock()
+        acquired = await asyncio.to_thread(lock.acquire, cache_key)
+    except OSError:
+        lock, acquired = None, False
+
+    try:
+        if acquired:
+            cached = await asyncio.to_thread(_disk_cache_get, cache_key)
+            if cached is not None:
+                return cached
+        content = await fetch()
+        await asyncio.to_thread(_cache_set, cache_key, content)
+        return content
+    finally:
+        if acquired:
+            lock.release(cache_key)
+
+
+def _usage_dict(response: Any) -> Optional[Dict[str, int]]:
+    """Extract token usage from a completion response, if reported."""
+    usage = getattr(response, "usage", None)
+    if usage is None:
+        return None
+    return {
+        "prompt_tokens": getattr(usage, "prompt_tokens", 0) or 0,
+        "completion_tokens": getattr(usage, "completion_tokens", 0) or 0,
+        "total_tokens": getattr(usage, "total_tokens", 0) or 0,
+    }
+
+
+def _estimated_usage(prompt_tokens: int, content: str) -> Dict[str, int]:
+    """Usage of a response that reported none (4 characters per token)."""
+    completion_tokens = len(content) // 4
+    return {
+        "prompt_tokens": prompt_tokens,
+        "completion_tokens": completion_tokens,
+        "total_tokens": prompt_tokens + completion_tokens,
+    }
+
+
+def _settle_usage(
+    limiter: SharedRateLimiter, estimate: int, usage: Optional[Dict[str, int]]
+) -> None:
+    """Give back (or charge) the difference between estimated and real tokens."""
+    if usage and usage["total_tokens"]:
+        limiter.settle(estimate, usage["total_tokens"])
+
+
+def _record_usage(
+    call: Dict[str, Any], source: str, usage: Optional[Dict[str, int]]
+) -> None:
+    """Fill a usage-tracker record with where the answer came from and its tokens."""
+    call["source"] = source
+    if usage:
+        call.update(usage)
 
 
 def call_openai_chat(
@@ -46,103 +526,500 @@ def call_openai_chat(
     seed: int = None,
     response_format: Dict[str, str] = None,
     use_cache: bool = True,
+    raise_on_error: bool = False,
+    messages: List[Dict[str, str]] = None,
 ) -> str:
-    # Check cache first if caching is enabled
-    if use_cache:
-        cache_key = _get_input_hash(prompt, system_msg or "", model, max_tokens)
-        cache_file = _get_cache_file(cache_key)
+    """Return the completion for prompt, from cache when possible.
+
+    Failed requests are retried with backoff. When retries are exhausted the
+    error is returned as an "Error calling API: ..." string (never cached), or
+    raised as LLMRequestError if raise_on_error is set. Every call is recorded
+    by the usage tracker (tokens, latency, cache source, cost). Passing
+    ``messages`` sends that multi-turn conversation instead of prompt/system_msg.
+    """
+    history = messages  # Multi-turn callers pass the full message list
+    if messages is None:
+        messages = _build_messages(prompt, system_msg)
+    kwargs = _build_request_kwargs(
+        messages, model, max_tokens, stop, seed, response_format
+    )
+
+    with _usage_tracker.track(model) as call:
+        # Replay mode never touches the cache or the network
+        cassette = get_cassette()
+        if cassette is not None and cassette.replaying:
+            try:
+                entry = cassette.replay(kwargs, _prompt_normalizer)
+            except CassetteMissError as e:
+                call["error"] = True
+                if raise_on_error:
+                    raise LLMRequestError(str(e)) from e
+                return f"Error calling API: {str(e)}"
+            time.sleep(cassette.replay_delay(entry))
+            _record_usage(call, "replay", entry.get("usage"))
+            return entry["response"]
+        recording = cassette is not None and cassette.recording
+
+        # Check cache first if caching is enabled (recording always hits the API)
+        if use_cache:
+            cache_key = _cache_key(prompt, system_msg, history, model, max_tokens)
+            if not recording:
+                source, cached = _cache_lookup(cache_key)
+                if cached is not None:
+                    call["source"] = source
+                    return cached
 
-        # Check content-based cache file
+        client = get_openai_client()
+        policy = RetryPolicy.from_env()
+
+        limiter = get_rate_limiter()
+        estimate = estimate_tokens(messages, max_tokens)
+
+        def attempt() -> Any:
+            limiter.acquire(estimate)
+            return client.chat.completions.create(timeout=policy.timeout, **kwargs)
+
+        def fetch() -> str:
+            start = time.perf_counter()
+            response = call_with_retries(attempt, policy, _request_metrics, _latencies)
+            usage = _usage_dict(response)
+            _settle_usage(limiter, estimate, usage)
+            # Only the caller that actually hit the API is charged for it
+            _record_usage(call, "api", usage)
+            content = response.choices[0].message.content
+            if recording:
+                cassette.record(
+                    kwargs, content, time.perf_counter() - start, usage, _prompt_normalizer
+                )
+            return content
+
+        # Answers produced by another caller count as shared cache hits
+        call["source"] = "shared"
         try:
-            if os.path.exists(cache_file):
-                with open(cache_file, "r", encoding="utf-8") as f:
-                    cache_data = json.load(f)
-                    if cache_key in cache_data:
-                        return cache_data[cache_key]
-        except (json.JSONDecodeError, IOError, OSError):
-            pass  # Continue to API call if cache read fails
+            if not use_cache:
+                return fetch()
+            if recording:
+                content = fetch()
+                _cache_set(cache_key, content)
+                return content
+            # Concurrent callers with the same key wait for the first one's answer
+            return _single_flight.do(cache_key, lambda: _fetch_once(cache_key, fetch))
+        except Exception as e:
+            call["error"] = True
+            if raise_on_error:
+                if isinstance(e, LLMRequestError):
+                    raise
+                raise LLMRequestError(str(e)) from e
+            return f"Error calling API: {str(e)}"
 
-    client = get_openai_client()
 
-    # Construct messages array with optional system message
-    messages = []
-    if system_msg:
-        messages.append({"role": "system", "content": system_msg})
-    messages.append({"role": "user", "content": prompt})
+async def acall_openai_chat(
+    prompt: str,
+    system_msg: str = None,
+    *,  # Force remaining arguments to be keyword-only
+    model: str = "gpt-4o-mini",
+    max_tokens: int = 1000,
+    stop: List[str] = None,
+    seed: int = None,
+    response_format: Dict[str, str] = None,
+    use_cache: bool = True,
+    raise_on_error: bool = False,
+    messages: List[Dict[str, str]] = None,
+) -> str:
+    """Async counterpart of call_openai_chat sharing the same cache and keys."""
+    history = messages  # Multi-turn callers pass the full message list
+    if messages is None:
+        messages = _build_messages(prompt, system_msg)
+    kwargs = _build_request_kwargs(
+        messages, model, max_tokens, stop, seed, response_format
+    )
 
-    try:
-        # Build kwargs dict with only provided non-None values for cleaner API calls
-        kwargs = {
-            "model": model,
-            "messages": messages,
-            "temperature": 0.0,  # Force deterministic temperature
-            "top_p": 0.1,  # Very low top_p for more deterministic results
-            "n": 1,  # Always single response for consistency
-            "max_tokens": max_tokens,
-            "presence_penalty": 0.0,
-            "frequency_penalty": 0.0,
-        }
-
-        # Add optional parameters only if they're provided to avoid API conflicts
-        if stop is not None:
-            kwargs["stop"] = stop
-
-        # Try to add seed if provided, but handle gracefully if API doesn't support it
-        if seed is not None:
-            kwargs["seed"] = seed
-
-        if response_format is not None:
-            kwargs["response_format"] = response_format
-        response = client.chat.completions.create(**kwargs)
-        content = response.choices[0].message.content
-
-        # Cache the response if caching is enabled
+    with _usage_tracker.track(model) as call:
+        cassette = get_cassette()
+        if cassette is not None and cassette.replaying:
+            try:
+                entry = cassette.replay(kwargs, _prompt_normalizer)
+            except CassetteMissError as e:
+                call["error"] = True
+                if raise_on_error:
+                    raise LLMRequestError(str(e)) from e
+                return f"Error calling API: {str(e)}"
+            await asyncio.sleep(cassette.replay_delay(entry))
+            _record_usage(call, "replay", entry.get("usage"))
+            return entry["response"]
+        recording = cassette is not None and cassette.recording
+
+        # Check cache first if caching is enabled (recording always hits the API)
         if use_cache:
-            cache_file = _get_cache_file(cache_key)
+            cache_key = _cache_key(prompt, system_msg, history, model, max_tokens)
+        if use_cache and not recording:
+            cached = _memory_cache.get(cache_key)
+            if cached is not None:
+                _cache_hit_stats.record("memory")
+                call["source"] = "memory"
+                return cached
+            # Keep SQLite I/O off the event loop
+            cached = await asyncio.to_thread(_disk_cache_get, cache_key)
+            _cache_hit_stats.record("disk" if cached is not None else "miss")
+            if cached is not None:
+                call["source"] = "disk"
+                return cached
+
+        client = get_async_openai_client()
+        policy = RetryPolicy.from_env()
+
+        limiter = get_rate_limiter()
+        estimate = estimate_tokens(messages, max_tokens)
+
+        async def attempt() -> Any:
+            if limiter.enabled:
+                wait = await asyncio.to_thread(limiter.reserve, estimate)
+                await asyncio.sleep(wait)
+            return await client.chat.completions.create(
+                timeout=policy.timeout, **kwargs
+            )
+
+        async def fetch() -> str:
+            start = time.perf_counter()
+            response = await acall_with_retries(
+                attempt, policy, _request_metrics, _latencies
+            )
+            usage = _usage_dict(response)
+            _settle_usage(limiter, estimate, usage)
+            _record_usage(call, "api", usage)
+            content = response.choices[0].message.content
+            if recording:
+                await asyncio.to_thread(
+                    cassette.record,
+                    kwargs,
+                    content,
+                    time.perf_counter() - start,
+                    usage,
+                    _prompt_normalizer,
+                )
+            return content
 
-            # Save to content-based cache file (persists across runs!)
+        call["source"] = "shared"
+        try:
+            if not use_cache:
+                return await fetch()
+            if recording:
+                content = await fetch()
+                await asyncio.to_thread(_cache_set, cache_key, content)
+                return content
+            return await _async_single_flight.do(
+                cache_key, lambda: _afetch_once(cache_key, fetch)
+            )
+        except Exception as e:
+            call["error"] = True
+            if raise_on_error:
+                if isinstance(e, LLMRequestError):
+                    raise
+                raise LLMRequestError(str(e)) from e
+            return f"Error calling API: {str(e)}"
+
+
+def stream_openai_chat(
+    prompt: str,
+    system_msg: str = None,
+    *,  # Force remaining arguments to be keyword-only
+    model: str = "gpt-4o-mini",
+    max_tokens: int = 1000,
+    stop: List[str] = None,
+    seed: int = None,
+    response_format: Dict[str, str] = None,
+    use_cache: bool = True,
+    messages: List[Dict[str, str]] = None,
+) -> Iterator[str]:
+    """Yield completion text incrementally, caching the full text at the end.
+
+    A cache hit is yielded as a single chunk. A request that fails before any
+    text arrives yields one "Error calling API: ..." chunk; a failure after
+    text was yielded raises LLMRequestError. The HTTP stream is closed when
+    the consumer stops early. Partial streams are never cached.
+    """
+    history = messages  # Multi-turn callers pass the full message list
+    if messages is None:
+        messages = _build_messages(prompt, system_msg)
+    kwargs = _build_request_kwargs(
+        messages, model, max_tokens, stop, seed, response_format
+    )
+
+    with _usage_tracker.track(model) as call:
+        cassette = get_cassette()
+        if cassette is not None and cassette.replaying:
             try:
-                # Read existing cache from content-based file
-                cache_data = {}
-                if os.path.exists(cache_file):
-                    with open(cache_file, "r", encoding="utf-8") as f:
-                        cache_data = json.load(f)
+                entry = cassette.replay(kwargs, _prompt_normalizer)
+            except CassetteMissError as e:
+                call["error"] = True
+                yield f"Error calling API: {str(e)}"
+                return
+            time.sleep(cassette.replay_delay(entry))
+            _record_usage(call, "replay", entry.get("usage"))
+            yield entry["response"]
+            return
+        recording = cassette is not None and cassette.recording
 
-                # Add new entry
-                cache_data[cache_key] = content
+        if use_cache:
+            cache_key = _cache_key(prompt, system_msg, history, model, max_tokens)
+            if not recording:
+                source, cached = _cache_lookup(cache_key)
+                if cached is not None:
+                    call["source"] = source
+                    yield cached
+                    return
 
-                # Write back to content-based file
-                os.makedirs(os.path.dirname(cache_file), exist_ok=True)
-                with open(cache_file, "w", encoding="utf-8") as f:
-                    json.dump(cache_data, f, indent=2)
+        client = get_openai_client()
+        policy = RetryPolicy.from_env()
+        policy.hedge = False  # A duplicate stream would be left open
+        limiter = get_rate_limiter()
+        estimate = estimate_tokens(messages, max_tokens)
 
-            except Exception:
-                pass  # Continue silently if caching fails
+        def attempt() -> Any:
+            limiter.acquire(estimate)
+            return client.chat.completions.create(
+                stream=True,
+                # The last chunk then reports the real token usage
+                stream_options={"include_usage": True},
+                timeout=policy.timeout,
+                **kwargs,
+            )
 
-        return content
-    except Exception as e:
-        return f"Error calling API: {str(e)}"
+        start = time.perf_counter()
+        try:
+            # Only opening the stream is retried; tokens already yielded can't be
+            response = call_with_retries(attempt, policy, _request_metrics, _latencies)
+        except Exception as e:
+            call["error"] = True
+            yield f"Error calling API: {str(e)}"
+            return
+
+        parts = []
+        usage = None
+        try:
+            for chunk in response:
+                if getattr(chunk, "usage", None) is not None:
+                    usage = _usage_dict(chunk)
+                if not chunk.choices:
+                    continue
+                delta = chunk.choices[0].delta.content
+                if delta:
+                    parts.append(delta)
+                    yield delta
+        except Exception as e:
+            call["error"] = True
+            # Error text appended to partial output would corrupt it
+            raise LLMRequestError(f"Stream interrupted: {str(e)}") from e
+        finally:
+            # Also on early exit (GeneratorExit): return the pooled connection
+            response.close()
+            if usage is None:
+                # Server ignored include_usage (or the stream stopped early)
+                usage = _estimated_usage(estimate - max_tokens, "".join(parts))
+            # Give back the unused part of the max_tokens reservation
+            _settle_usage(limiter, estimate, usage)
+
+        content = "".join(parts)
+        _record_usage(call, "api", usage)
+        if recording:
+            cassette.record(
+                kwargs, content, time.perf_counter() - start, normalize=_prompt_normalizer
+            )
+        if use_cache:
+            _cache_set(cache_key, content)
+
+
+class LLMResponse:
+    """Response object with a .content attribute to match LangChain's interface.
+
+    ``usage`` holds the call's accounting record (tokens, latency, source).
+    """
+
+    def __init__(self, content: str, usage: Optional[Dict[str, Any]] = None):
+        self.content = content
+        self.usage = usage
+
+    def __str__(self):
+        return self.content
 
 
 class CachedLLM:
-    """LangChain-compatible LLM wrapper that uses persistent file-based caching."""
+    """LangChain-compatible LLM wrapper that uses the persistent response cache."""
 
-    def __init__(self, model: str = "gpt-4o-mini"):
+    def __init__(self, model: str = "gpt-4o-mini", raise_on_error: bool = False):
         self.model = model
+        self.raise_on_error = raise_on_error
+
+    @staticmethod
+    def cache_stats() -> Dict[str, Any]:
+        """Return cache hit rates, memory-tier counters and normalizer counters."""
+        return get_cache_stats()
+
+    @staticmethod
+    def usage_summary(scope: str = None) -> Dict[str, Any]:
+        """Return token, latency, cache and cost totals (optionally for one scope)."""
+        return _usage_tracker.summary(scope)
+
+    @staticmethod
+    def request_stats() -> Dict[str, int]:
+        """Return API attempt/retry/timeout/failure/hedge counters."""
+        return get_request_metrics()
 
     def invoke(self, prompt: str, system_msg: str = None) -> Any:
         """Invoke the LLM with caching, compatible with LangChain interface."""
-        content = call_openai_chat(prompt, system_msg, model=self.model)
+        content = call_openai_chat(
+            prompt, system_msg, model=self.model, raise_on_error=self.raise_on_error
+        )
+        return LLMResponse(content, usage=last_call_record())
 
-        # Return an object with .content attribute to match LangChain's interface
-        class Response:
-            def __init__(self, content: str):
-                self.content = content
+    def stream(self, prompt: str, system_msg: str = None) -> Iterator[str]:
+        """Stream the completion token by token; the full text is cached."""
+        return stream_openai_chat(prompt, system_msg, model=self.model)
+
+    def session(self, system_msg: str = None, **kwargs: Any) -> Any:
+        """Start a multi-turn ChatSession using this model."""
+        from .chat_session import ChatSession
+
+        kwargs.setdefault("raise_on_error", self.raise_on_error)
+        return ChatSession(system_msg, model=self.model, **kwargs)
+
+
+class AsyncCachedLLM(CachedLLM):
+    """Asyncio variant of CachedLLM for fanning out many calls on one loop."""
+
+    async def ainvoke(self, prompt: str, system_msg: str = None) -> Any:
+        """Invoke the LLM without blocking the event loop, sharing the cache."""
+        content = await acall_openai_chat(
+            prompt, system_msg, model=self.model, raise_on_error=self.raise_on_error
+        )
+        return LLMResponse(content, usage=last_call_record())
 
-            def __str__(self):
-                return self.content
 
-        return Response(content)
+# Observations a small model reliably handles (single, well-located errors)
+SIMPLE_OBSERVATION_PATTERNS = [
+    r"expected ':'",
+    r"\bE30[1-5]\b",
+    r"\bF401\b",
+    r"\bF821\b",
+    r"NameError: name '\w+' is not defined",
+]
+
+
+class ModelRouter:
+    """Chooses a model tier per request, cheapest first.
+
+    ``tiers`` are ordered from cheapest to strongest. Observations matching a
+    simple pattern start at tier 0, everything else at ``default_tier``; each
+    prior failure (an invalid tool call or a failed action reported through
+    ``RoutedLLM.record_failure``) starts one tier higher.
+    """
+
+    def __init__(
+        self,
+        tiers: List[str],
+        default_tier: int = 0,
+        simple_patterns: List[str] = None,
+    ):
+        if not tiers:
+            raise ValueError("ModelRouter needs at least one model tier")
+        self.tiers = list(tiers)
+        self.default_tier = min(max(default_tier, 0), len(self.tiers) - 1)
+        self._simple = [
+            re.compile(p)
+            for p in (
+                SIMPLE_OBSERVATION_PATTERNS if simple_patterns is None else simple_patterns
+            )
+        ]
+
+    @classmethod
+    def from_env(cls) -> "ModelRouter":
+        """Read LLM_MODEL_TIERS (comma-separated) and LLM_ROUTER_DEFAULT_TIER."""
+        tiers = [
+            m.strip()
+            for m in os.getenv("LLM_MODEL_TIERS", "gpt-4o-mini").split(",")
+            if m.strip()
+        ]
+        return cls(tiers, default_tier=int(os.getenv("LLM_ROUTER_DEFAULT_TIER", "0")))
+
+    def is_simple(self, prompt: str) -> bool:
+        return any(p.search(prompt) for p in self._simple)
+
+    def select(self, prompt: str, prior_failures: int = 0) -> int:
+        """Return the index of the tier to try first for prompt."""
+        base = 0 if self.is_simple(prompt) else self.default_tier
+        return min(base + prior_failures, len(self.tiers) - 1)
+
+
+def is_valid_tool_call(content: str) -> bool:
+    """True when content is reasoning JSON with a named tool call (or tool_calls)."""
+    data = parse_reasoning_json(content)
+    if not data:
+        return False
+    calls = data.get("tool_calls")
+    if not isinstance(calls, list) or not calls:
+        calls = [data.get("tool_call")]
+    return all(
+        isinstance(call, dict) and isinstance(call.get("tool"), str) and bool(call["tool"])
+        for call in calls
+    )
+
+
+class RoutedLLM(CachedLLM):
+    """CachedLLM that routes each call through a ModelRouter.
+
+    A reply rejected by ``validator`` is retried on the next stronger tier;
+    the last tier's reply is returned as-is. ``route_stats`` counts calls per
+    model and escalations.
+    """
+
+    def __init__(
+        self,
+        router: ModelRouter,
+        validator: Optional[Callable[[str], bool]] = is_valid_tool_call,
+        raise_on_error: bool = False,
+    ):
+        super().__init__(model=router.tiers[0], raise_on_error=raise_on_error)
+        self.router = router
+        self.validator = validator
+        self.prior_failures = 0
+        self._route_stats: Dict[str, int] = {"escalations": 0}
+
+    def record_failure(self) -> None:
+        """Start later requests one tier higher (e.g. after a failed action)."""
+        self.prior_failures += 1
+
+    def record_success(self) -> None:
+        self.prior_failures = 0
+
+    def route_stats(self) -> Dict[str, int]:
+        return dict(self._route_stats)
+
+    def invoke(self, prompt: str, system_msg: str = None) -> Any:
+        """Invoke the cheapest suitable model, escalating on invalid replies."""
+        tiers = self.router.tiers
+        start = self.router.select(prompt, self.prior_failures)
+        for index in range(start, len(tiers)):
+            model = tiers[index]
+            self._route_stats[model] = self._route_stats.get(model, 0) + 1
+            content = call_openai_chat(
+                prompt, system_msg, model=model, raise_on_error=self.raise_on_error
+            )
+            usage = last_call_record()
+            if self.validator is None or self.validator(content):
+                break
+            if index + 1 < len(tiers):
+                self._route_stats["escalations"] += 1
+        return LLMResponse(content, usage=usage)
+
+    def stream(self, prompt: str, system_msg: str = None) -> Iterator[str]:
+        """Stream from the selected tier (streams are not escalated)."""
+        model = self.router.tiers[self.router.select(prompt, self.prior_failures)]
+        return stream_openai_chat(prompt, system_msg, model=model)
+
+
+def get_routed_llm() -> RoutedLLM:
+    """Get an LLM that routes agent calls across LLM_MODEL_TIERS."""
+    return RoutedLLM(ModelRouter.from_env())
 
 
 def get_llm() -> Any:
@@ -151,4 +1028,22 @@ def get_llm() -> Any:
     return CachedLLM(model=model)
 
 
-__all__ = ["get_llm"]
+def get_async_llm() -> AsyncCachedLLM:
+    """Get cached async LLM instance using the same model as get_llm()."""
+    model = "gpt-4o-mini"
+    return AsyncCachedLLM(model=model)
+
+
+__all__ = [
+    "get_llm",
+    "get_async_llm",
+    "get_routed_llm",
+    "AsyncCachedLLM",
+    "ModelRouter",
+    "RoutedLLM",
+    "LLMRequestError",
+    "get_usage_tracker",
+    "get_cache_stats",
+    "set_prompt_normalizer",
+    "usage_scope",
+]
@@ -0,0 +1,396 @@
+"""Cache storage tiers for LLM responses"""
+
+from __future__ import annotations
+
+import os
+import sqlite3
+import threading
+import time
+import zlib
+from collections import OrderedDict
+from typing import Any, Dict, Optional, Tuple
+
+
+class SQLiteCacheStore:
+    """Single-file response cache shared by threads and processes.
+
+    Entries live in one SQLite database in WAL mode, so any number of readers
+    can run alongside a writer (e.g. pytest-xdist workers), lookups go through
+    the primary-key index and each insert is a single atomic statement.
+
+    Payloads larger than ``compress_min_bytes`` are stored zlib-compressed.
+    Entries older than ``ttl`` seconds are treated as misses and, together with
+    least recently used entries beyond ``max_bytes``, removed by ``prune()``,
+    which also runs automatically every ``prune_every`` writes. A limit of 0
+    disables that check.
+    """
+
+    # Access times are only rewritten this often to keep reads mostly read-only
+    TOUCH_INTERVAL = 60.0
+
+    def __init__(
+        self,
+        path: str,
+        timeout: float = 30.0,
+        max_bytes: int = 0,
+        ttl: float = 0,
+        compress: bool = True,
+        compress_min_bytes: int = 256,
+        prune_every: int = 200,
+    ):
+        self.path = path
+        self.timeout = timeout
+        self.max_bytes = max_bytes
+        self.ttl = ttl
+        self.compress = compress
+        self.compress_min_bytes = compress_min_bytes
+        self.prune_every = prune_every
+        self._local = threading.local()
+        self._writes = 0
+        self._writes_lock = threading.Lock()
+        os.makedirs(os.path.dirname(os.path.abspath(path)), exist_ok=True)
+        self._init_schema()
+
+    def _connect(self) -> sqlite3.Connection:
+        """Return a connection owned by the current thread and process."""
+        conn = getattr(self._local, "conn", None)
+        # Connections must not cross a fork, so reopen when the pid changes
+        if conn is None or getattr(self._local, "pid", None) != os.getpid():
+            conn = sqlite3.connect(self.path, timeout=self.timeout)
+            conn.execute(f"PRAGMA busy_timeout = {int(self.timeout * 1000)}")
+            conn.execute("PRAGMA synchronous = NORMAL")
+            self._local.conn = conn
+            self._local.pid = os.getpid()
+        return conn
+
+    def _init_schema(self) -> None:
+        conn = self._connect()
+        conn.execute("PRAGMA journal_mode = WAL")
+        with conn:
+            conn.execute(
+                "CREATE TABLE IF NOT EXISTS responses ("
+                " key TEXT PRIMARY KEY,"
+                " value TEXT NOT NULL,"
+                " created_at REAL NOT NULL,"
+                " accessed_at REAL NOT NULL DEFAULT 0,"
+                " size INTEGER NOT NULL DEFAULT 0"
+                ") WITHOUT ROWID"
+            )
+            # Databases created before eviction support lack these columns
+            columns = {row[1] for row in conn.execute("PRAGMA table_info(responses)")}
+            if "accessed_at" not in columns:
+                conn.execute(
+                    "ALTER TABLE responses ADD COLUMN accessed_at REAL NOT NULL DEFAULT 0"
+                )
+                conn.execute("UPDATE responses SET accessed_at = created_at")
+            if "size" not in columns:
+                conn.execute(
+                    "ALTER TABLE responses ADD COLUMN size INTEGER NOT NULL DEFAULT 0"
+                )
+                conn.execute(
+                    "UPDATE responses SET size = length(CAST(key AS BLOB))"
+                    " + length(CAST(value AS BLOB))"
+                )
+            conn.execute(
+                "CREATE INDEX IF NOT EXISTS responses_accessed_at"
+                " ON responses (accessed_at)"
+            )
+
+    def _encode(self, value: str):
+        data = value.encode()
+        if self.compress and len(data) >= self.compress_min_bytes:
+            packed = zlib.compress(data, 6)
+            if len(packed) < len(data):
+                return packed  # Stored as a BLOB; plain TEXT rows stay readable
+        return value
+
+    @staticmethod
+    def _decode(stored) -> str:
+        if isinstance(stored, bytes):
+            return zlib.decompress(stored).decode()
+        return stored
+
+    def get(self, key: str) -> Optional[str]:
+        """Return the cached value for key, or None on a miss or expired entry."""
+        entry = self.get_entry(key)
+        return entry[0] if entry is not None else None
+
+    def get_entry(self, key: str) -> Optional[Tuple[str, float]]:
+        """Return (value, created_at) for key, or None on a miss or expired entry."""
+        conn = self._connect()
+        row = conn.execute(
+            "SELECT value, created_at, accessed_at FROM responses WHERE key = ?",
+            (key,),
+        ).fetchone()
+        if row is None:
+            return None
+
+        value, created_at, accessed_at = row
+        now = time.time()
+        if self.ttl and created_at < now - self.ttl:
+            return None
+        if now - accessed_at > self.TOUCH_INTERVAL:
+            try:
+                with conn:
+                    conn.execute(
+                        "UPDATE responses SET accessed_at = ? WHERE key = ?", (now, key)
+                    )
+            except sqlite3.OperationalError:
+                pass  # A busy writer only costs us LRU precision
+        return self._decode(value), created_at
+
+    def set(self, key: str, value: str) -> None:
+        """Atomically insert or replace the value stored for key."""
+        stored = self._encode(value)
+        size = len(key.encode()) + len(
+            stored if isinstance(stored, bytes) else stored.encode()
+        )
+        now = time.time()
+        conn = self._connect()
+        with conn:
+            conn.execute(
+                "INSERT OR REPLACE INTO responses"
+                " (key, value, created_at, accessed_at, size)"
+                " VALUES (?, ?, ?, ?, ?)",
+                (key, stored, now, now, size),
+            )
+
+        with self._writes_lock:
+            self._writes += 1
+            due = self.prune_every > 0 and self._writes % self.prune_every == 0
+        if due and (self.ttl or self.max_bytes):
+            try:
+                self.prune()
+            except sqlite3.OperationalError:
+                pass  # Another process is pruning; try again later
+
+    def prune(self) -> Dict[str, int]:
+        """Delete expired entries, then LRU entries until under max_bytes."""
+        conn = self._connect()
+        expired = evicted = 0
+        with conn:
+            if self.ttl:
+                expired = conn.execute(
+                    "DELETE FROM responses WHERE created_at < ?",
+                    (time.time() - self.ttl,),
+                ).rowcount
+            if self.max_bytes:
+                total = conn.execute(
+                    "SELECT COALESCE(SUM(size), 0) FROM responses"
+                ).fetchone()[0]
+                # Evict down to 90% so the next few writes don't prune again
+                excess = total - int(self.max_bytes * 0.9) if total > self.max_bytes else 0
+                victims = []
+                if excess > 0:
+                    for key, size in conn.execute(
+                        "SELECT key, size FROM responses ORDER BY accessed_at"
+                    ):
+                        victims.append((key,))
+                        excess -= size
+                        if excess <= 0:
+                            break
+                    conn.executemany("DELETE FROM responses WHERE key = ?", victims)
+                evicted = len(victims)
+        return {"expired": expired, "evicted": evicted}
+
+    def compact(self) -> Dict[str, int]:
+        """Prune, then checkpoint the WAL and VACUUM to return space to the OS."""
+        before = self.file_bytes()
+        result = self.prune()
+        conn = self._connect()
+        conn.execute("PRAGMA wal_checkpoint(TRUNCATE)")
+        conn.execute("VACUUM")
+        result["bytes_before"] = before
+        result["bytes_after"] = self.file_bytes()
+        return result
+
+    def file_bytes(self) -> int:
+        """Return the on-disk size of the database and its WAL."""
+        total = 0
+        for suffix in ("", "-wal", "-shm"):
+            try:
+                total += os.path.getsize(self.path + suffix)
+            except OSError:
+                pass
+        return total
+
+    def stats(self) -> Dict[str, Any]:
+        """Return entry counts, payload and file sizes and entry ages."""
+        conn = self._connect()
+        entries, payload, compressed, oldest, newest = conn.execute(
+            "SELECT COUNT(*), COALESCE(SUM(size), 0),"
+            " COALESCE(SUM(typeof(value) = 'blob'), 0),"
+            " MIN(created_at), MAX(created_at) FROM responses"
+        ).fetchone()
+        expired = 0
+        if self.ttl:
+            expired = conn.execute(
+                "SELECT COUNT(*) FROM responses WHERE created_at < ?",
+                (time.time() - self.ttl,),
+            ).fetchone()[0]
+        return {
+            "path": self.path,
+            "entries": entries,
+            "compressed_entries": compressed,
+            "expired_entries": expired,
+            "payload_bytes": payload,
+            "file_bytes": self.file_bytes(),
+            "max_bytes": self.max_bytes,
+            "ttl_seconds": self.ttl,
+            "oldest_age_seconds": round(time.time() - oldest, 1) if oldest else None,
+            "newest_age_seconds": round(time.time() - newest, 1) if newest else None,
+        }
+
+    def __contains__(self, key: str) -> bool:
+        return self.get(key) is not None
+
+    def __len__(self) -> int:
+        return self._connect().execute("SELECT COUNT(*) FROM responses").fetchone()[0]
+
+    def close(self) -> None:
+        """Close the connection held by the current thread."""
+        conn = getattr(self._local, "conn", None)
+        if conn is not None:
+            conn.close()
+            self._local.conn = None
+
+
+class LRUCache:
+    """Thread-safe in-memory LRU cache bounded by entry count and total bytes.
+
+    Entries older than ``ttl`` seconds (0 disables) are misses, as in
+    SQLiteCacheStore; ``set`` takes the entry's creation time so a value
+    promoted from disk keeps its original age.
+    """
+
+    def __init__(
+        self, max_entries: int = 1024, max_bytes: int = 32 * 1024 * 1024, ttl: float = 0
+    ):
+        self.max_entries = max_entries
+        self.max_bytes = max_bytes
+        self.ttl = ttl
+        self._data: "OrderedDict[str, Tuple[str, float]]" = OrderedDict()
+        self._bytes = 0
+        self._lock = threading.Lock()
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+
+    @staticmethod
+    def _size(key: str, value: str) -> int:
+        return len(key.encode()) + len(value.encode())
+
+    def get(self, key: str) -> Optional[str]:
+        """Return the value for key and mark it most recently used."""
+        with self._lock:
+            entry = self._data.get(key)
+            if entry is not None and self.ttl and entry[1] < time.time() - self.ttl:
+                del self._data[key]
+                self._bytes -= self._size(key, entry[0])
+                entry = None
+            if entry is None:
+                self.misses += 1
+                return None
+            self._data.move_to_end(key)
+            self.hits += 1
+            return entry[0]
+
+    def set(self, key: str, value: str, created_at: Optional[float] = None) -> None:
+        """Insert value, evicting least recently used entries to stay in bounds."""
+        size = self._size(key, value)
+        if self.max_entries <= 0 or size > self.max_bytes:
+            return  # Never cache entries that could not fit on their own
+
+        with self._lock:
+            old = self._data.pop(key, None)
+            if old is not None:
+                self._bytes -= self._size(key, old[0])
+            self._data[key] = (value, time.time() if created_at is None else created_at)
+            self._bytes += size
+
+            while len(self._data) > self.max_entries or self._bytes > self.max_bytes:
+                old_key, (old_value, _) = self._data.popitem(last=False)
+                self._bytes -= self._size(old_key, old_value)
+                self.evictions += 1
+
+    def clear(self) -> None:
+        with self._lock:
+            self._data.clear()
+            self._bytes = 0
+
+    def stats(self) -> Dict[str, int]:
+        """Return size and hit/miss/eviction counters."""
+        with self._lock:
+            return {
+                "entries": len(self._data),
+                "bytes": self._bytes,
+                "hits": self.hits,
+                "misses": self.misses,
+                "evictions": self.evictions,
+            }
+
+    def __len__(self) -> int:
+        return len(self._data)
+
+
+class CacheHitStats:
+    """Counts cache lookups by the tier that answered them."""
+
+    TIERS = ("memory", "disk", "miss")
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._counts = dict.fromkeys(self.TIERS, 0)
+
+    def record(self, tier: str) -> None:
+        with self._lock:
+            self._counts[tier] += 1
+
+    def stats(self) -> Dict[str, float]:
+        """Return lookups, per-tier hits and the overall hit rate."""
+        with self._lock:
+            counts = dict(self._counts)
+        lookups = sum(counts.values())
+        hits = counts["memory"] + counts["disk"]
+        return {
+            "lookups": lookups,
+            "memory_hits": counts["memory"],
+            "disk_hits": counts["disk"],
+            "lookup_misses": counts["miss"],
+            "hit_rate": round(hits / lookups, 4) if lookups else 0.0,
+        }
+
+    def reset(self) -> None:
+        with self._lock:
+            self._counts = dict.fromkeys(self.TIERS, 0)
+
+
+def main(argv=None) -> int:
+    """``python -m src.llm_cache {stats,compact} [--path PATH]``"""
+    import argparse
+    import json
+
+    parser = argparse.ArgumentParser(description="Inspect or compact the LLM response cache")
+    parser.add_argument("command", choices=["stats", "compact"])
+    parser.add_argument("--path", help="Cache database (default: the one get_llm() uses)")
+    args = parser.parse_args(argv)
+
+    if args.path:
+        from .llm import cache_store_options
+
+        store = SQLiteCacheStore(args.path, **cache_store_options())
+    else:
+        from .llm import get_cache_store
+
+        store = get_cache_store()
+
+    result = store.stats() if args.command == "stats" else store.compact()
+    print(json.dumps(result, indent=2))
+    return 0
+
+
+__all__ = ["SQLiteCacheStore", "LRUCache", "CacheHitStats"]
+
+
+if __name__ == "__main__":
+    raise SystemExit(main())
@@ -0,0 +1,167 @@
+"""Record/replay cassettes for offline, deterministic LLM runs"""
+
+from __future__ import annotations
+
+import hashlib
+import json
+import os
+import threading
+import time
+from typing import Any, Callable, Dict, List, Optional
+
+Normalizer = Optional[Callable[[str], str]]
+
+
+class CassetteMissError(LookupError):
+    """Raised in replay mode when a request was never recorded."""
+
+
+def request_key(request: Dict[str, Any], normalize: Normalizer = None) -> str:
+    """Hash the full chat.completions request (model, messages and options).
+
+    With ``normalize`` (the LLM cache's prompt normalizer) message contents
+    are normalized first, so volatile paths, pids and timings in prompts do
+    not change the key.
+    """
+    if normalize is not None:
+        request = dict(
+            request,
+            messages=[
+                dict(message, content=normalize(message.get("content") or ""))
+                for message in request.get("messages", [])
+            ],
+        )
+    payload = json.dumps(request, sort_keys=True, ensure_ascii=False)
+    return hashlib.sha256(payload.encode()).hexdigest()
+
+
+class Cassette:
+    """JSONL file of recorded request/response pairs with latency metadata.
+
+    In ``record`` mode every API response is appended as one line (a single
+    O_APPEND write, so concurrent workers can record into the same file). In
+    ``replay`` mode responses are served from the file and identical requests
+    recorded several times are replayed in their recorded order.
+    """
+
+    MODES = ("record", "replay")
+
+    def __init__(self, path: str, mode: str, latency_scale: float = 0.0):
+        if mode not in self.MODES:
+            raise ValueError(f"Unknown cassette mode: {mode}")
+        self.path = path
+        self.mode = mode
+        self.latency_scale = latency_scale
+        self._lock = threading.Lock()
+        self._entries: Optional[Dict[str, List[Dict[str, Any]]]] = None
+        self._positions: Dict[str, int] = {}
+
+    @property
+    def recording(self) -> bool:
+        return self.mode == "record"
+
+    @property
+    def replaying(self) -> bool:
+        return self.mode == "replay"
+
+    def _load(self) -> Dict[str, List[Dict[str, Any]]]:
+        entries: Dict[str, List[Dict[str, Any]]] = {}
+        if os.path.exists(self.path):
+            with open(self.path, "r", encoding="utf-8") as f:
+                for line in f:
+                    line = line.strip()
+                    if not line:
+                        continue
+                    try:
+                        entry = json.loads(line)
+                    except json.JSONDecodeError:
+                        continue  # Skip a torn line from an interrupted recording
+                    entries.setdefault(entry["key"], []).append(entry)
+        return entries
+
+    def record(
+        self,
+        request: Dict[str, Any],
+        content: str,
+        latency: float,
+        usage: Optional[Dict[str, int]] = None,
+        normalize: Normalizer = None,
+    ) -> None:
+        """Append one request/response pair to the cassette."""
+        entry = {
+            "key": request_key(request, normalize),
+            "request": request,
+            "response": content,
+            "latency": round(latency, 4),
+            "usage": usage,
+            "recorded_at": time.time(),
+        }
+        line = json.dumps(entry, ensure_ascii=False) + "\n"
+
+        os.makedirs(os.path.dirname(os.path.abspath(self.path)), exist_ok=True)
+        fd = os.open(self.path, os.O_WRONLY | os.O_APPEND | os.O_CREAT, 0o644)
+        try:
+            os.write(fd, line.encode("utf-8"))
+        finally:
+            os.close(fd)
+
+    def replay(self, request: Dict[str, Any], normalize: Normalizer = None) -> Dict[str, Any]:
+        """Return the recorded entry for request, or raise CassetteMissError.
+
+        Pass the ``normalize`` used when recording; entries recorded without
+        one are still found under the raw request key.
+        """
+        key = request_key(request, normalize)
+        with self._lock:
+            if self._entries is None:
+                self._entries = self._load()
+            recorded = self._entries.get(key)
+            if not recorded and normalize is not None:
+                key = request_key(request)
+                recorded = self._entries.get(key)
+            if not recorded:
+                raise CassetteMissError(
+                    f"No recorded response for request {key[:12]} in {self.path}"
+                )
+            position = self._positions.get(key, 0)
+            self._positions[key] = position + 1
+            # Past the end of the recording, keep returning the last response
+            return recorded[min(position, len(recorded) - 1)]
+
+    def replay_delay(self, entry: Dict[str, Any]) -> float:
+        """Seconds to wait to simulate the recorded latency of entry."""
+        return max(0.0, float(entry.get("latency") or 0.0) * self.latency_scale)
+
+
+_DEFAULT_CASSETTE_PATH = os.path.join(
+    os.path.dirname(os.path.dirname(os.path.abspath(__file__))),
+    "cassettes",
+    "llm.jsonl",
+)
+
+_cassettes: Dict[tuple, Cassette] = {}
+_cassettes_lock = threading.Lock()
+
+
+def get_cassette() -> Optional[Cassette]:
+    """Return the cassette selected by LLM_CASSETTE_MODE, or None when off.
+
+    LLM_CASSETTE_PATH chooses the file and LLM_CASSETTE_LATENCY_SCALE (default
+    0) scales the recorded latency simulated during replay.
+    """
+    mode = os.getenv("LLM_CASSETTE_MODE", "").strip().lower()
+    if mode in ("", "off", "none"):
+        return None
+
+    path = os.getenv("LLM_CASSETTE_PATH") or _DEFAULT_CASSETTE_PATH
+    scale = float(os.getenv("LLM_CASSETTE_LATENCY_SCALE", "0"))
+    config = (mode, path, scale)
+    with _cassettes_lock:
+        cassette = _cassettes.get(config)
+        if cassette is None:
+            cassette = Cassette(path, mode, latency_scale=scale)
+            _cassettes[config] = cassette
+        return cassette
+
+
+__all__ = ["Cassette", "CassetteMissError", "get_cassette", "request_key"]
@@ -0,0 +1,198 @@
+"""Token, latency and cost accounting for LLM calls"""
+
+from __future__ import annotations
+
+import contextlib
+import contextvars
+import json
+import os
+import threading
+import time
+from collections import deque
+from typing import Any, Dict, Iterator, List, Optional
+
+# USD per 1M (prompt, completion) tokens; override with LLM_PRICING as JSON
+DEFAULT_PRICING = {
+    "gpt-4o-mini": (0.15, 0.60),
+    "gpt-4o": (2.50, 10.00),
+    "gpt-4.1-mini": (0.40, 1.60),
+    "gpt-4.1-nano": (0.10, 0.40),
+}
+
+_current_scope: contextvars.ContextVar[str] = contextvars.ContextVar(
+    "llm_usage_scope", default="default"
+)
+_last_record: contextvars.ContextVar[Optional[Dict[str, Any]]] = (
+    contextvars.ContextVar("llm_last_record", default=None)
+)
+_collector: contextvars.ContextVar[Optional[List[Dict[str, Any]]]] = (
+    contextvars.ContextVar("llm_usage_collector", default=None)
+)
+
+
+def _load_pricing() -> Dict[str, tuple]:
+    pricing = dict(DEFAULT_PRICING)
+    override = os.getenv("LLM_PRICING")
+    if override:
+        try:
+            pricing.update({k: tuple(v) for k, v in json.loads(override).items()})
+        except (ValueError, TypeError):
+            pass
+    return pricing
+
+
+def _empty_summary() -> Dict[str, Any]:
+    return {
+        "calls": 0,
+        "api_calls": 0,
+        "cache_hits": 0,
+        "errors": 0,
+        "prompt_tokens": 0,
+        "completion_tokens": 0,
+        "total_tokens": 0,
+        "latency_seconds": 0.0,
+        "cost_usd": 0.0,
+    }
+
+
+class UsageTracker:
+    """Aggregates per-call LLM records by scope (e.g. run or scenario).
+
+    Aggregates are kept per scope; only the most recent records are retained
+    individually so long-lived processes stay bounded.
+    """
+
+    # Sources that did not reach the API for this caller
+    CACHED_SOURCES = ("memory", "disk", "shared", "replay")
+
+    def __init__(self, max_records: int = 1000):
+        self._lock = threading.Lock()
+        self._records: "deque[Dict[str, Any]]" = deque(maxlen=max_records)
+        self._scopes: Dict[str, Dict[str, Any]] = {}
+        self._pricing = _load_pricing()
+
+    def cost(self, model: str, prompt_tokens: int, completion_tokens: int) -> float:
+        prompt_price, completion_price = self._pricing.get(model, (0.0, 0.0))
+        return (prompt_tokens * prompt_price + completion_tokens * completion_price) / 1e6
+
+    def record(self, record: Dict[str, Any]) -> Dict[str, Any]:
+        """Price a finished call record and add it to its scope."""
+        record["cost_usd"] = (
+            0.0
+            if record["source"] in self.CACHED_SOURCES
+            else self.cost(
+                record["model"], record["prompt_tokens"], record["completion_tokens"]
+            )
+        )
+        with self._lock:
+            self._records.append(record)
+            summary = self._scopes.setdefault(record["scope"], _empty_summary())
+            summary["calls"] += 1
+            if record["error"]:
+                summary["errors"] += 1
+            elif record["source"] in self.CACHED_SOURCES:
+                summary["cache_hits"] += 1
+            else:
+                summary["api_calls"] += 1
+            for field in ("prompt_tokens", "completion_tokens", "total_tokens"):
+                summary[field] += record[field]
+            summary["latency_seconds"] += record["latency"]
+            summary["cost_usd"] += record["cost_usd"]
+        _last_record.set(record)
+        collector = _collector.get()
+        if collector is not None:
+            collector.append(record)
+        return record
+
+    @contextlib.contextmanager
+    def track(self, model: str) -> Iterator[Dict[str, Any]]:
+        """Time a call; the body fills in source, usage and error."""
+        record = {
+            "model": model,
+            "scope": _current_scope.get(),
+            "source": "api",
+            "error": False,
+            "prompt_tokens": 0,
+            "completion_tokens": 0,
+            "total_tokens": 0,
+        }
+        start = time.perf_counter()
+        try:
+            yield record
+        except BaseException:
+            record["error"] = True
+            raise
+        finally:
+            record["latency"] = round(time.perf_counter() - start, 4)
+            self.record(record)
+
+    def summary(self, scope: str = None, prefix: str = None) -> Dict[str, Any]:
+        """Totals for one scope, for scopes starting with prefix, or for all."""
+        with self._lock:
+            if scope is not None:
+                scopes = [self._scopes.get(scope, _empty_summary())]
+            else:
+                scopes = [
+                    summary
+                    for name, summary in self._scopes.items()
+                    if prefix is None or name.startswith(prefix)
+                ]
+            total = _empty_summary()
+            for summary in scopes:
+                for field, value in summary.items():
+                    total[field] += value
+        total["latency_seconds"] = round(total["latency_seconds"], 4)
+        total["cost_usd"] = round(total["cost_usd"], 6)
+        total["cache_hit_rate"] = (
+            round(total["cache_hits"] / total["calls"], 4) if total["calls"] else 0.0
+        )
+        return total
+
+    def summary_by_scope(self) -> Dict[str, Dict[str, Any]]:
+        with self._lock:
+            names = list(self._scopes)
+        return {name: self.summary(name) for name in names}
+
+    def records(self, scope: str = None) -> List[Dict[str, Any]]:
+        with self._lock:
+            return [dict(r) for r in self._records if scope is None or r["scope"] == scope]
+
+    def reset(self) -> None:
+        with self._lock:
+            self._records.clear()
+            self._scopes.clear()
+
+
+@contextlib.contextmanager
+def usage_scope(name: str) -> Iterator[str]:
+    """Attribute LLM calls made inside the block (same thread/task) to name."""
+    token = _current_scope.set(name)
+    try:
+        yield name
+    finally:
+        _current_scope.reset(token)
+
+
+@contextlib.contextmanager
+def collect_usage() -> Iterator[List[Dict[str, Any]]]:
+    """Collect the records of calls made inside the block (same thread/task)."""
+    records: List[Dict[str, Any]] = []
+    token = _collector.set(records)
+    try:
+        yield records
+    finally:
+        _collector.reset(token)
+
+
+def last_call_record() -> Optional[Dict[str, Any]]:
+    """Return the record of the most recent call in the current context."""
+    return _last_record.get()
+
+
+__all__ = [
+    "UsageTracker",
+    "usage_scope",
+    "collect_usage",
+    "last_call_record",
+    "DEFAULT_PRICING",
+]
@@ -0,0 +1,286 @@
+"""Retries, backoff and hedged requests for LLM API calls"""
+
+from __future__ import annotations
+
+import asyncio
+import os
+import random
+import threading
+import time
+from collections import deque
+from concurrent.futures import FIRST_COMPLETED, ThreadPoolExecutor, wait
+from concurrent.futures import TimeoutError as FutureTimeoutError
+from typing import Any, Awaitable, Callable, Dict, Optional
+
+import openai
+
+
+class LLMRequestError(RuntimeError):
+    """Raised when an LLM request fails after all retries."""
+
+
+class RetryPolicy:
+    """Bounded retries with jittered exponential backoff and optional hedging."""
+
+    def __init__(
+        self,
+        max_retries: int = 3,
+        base_delay: float = 0.5,
+        max_delay: float = 8.0,
+        timeout: float = 60.0,
+        hedge: bool = False,
+        hedge_delay: float = 0.0,
+    ):
+        self.max_retries = max_retries
+        self.base_delay = base_delay
+        self.max_delay = max_delay
+        self.timeout = timeout
+        self.hedge = hedge
+        # Fallback hedge delay used until enough latencies are observed (0 = wait)
+        self.hedge_delay = hedge_delay
+
+    @classmethod
+    def from_env(cls) -> "RetryPolicy":
+        return cls(
+            max_retries=int(os.getenv("LLM_MAX_RETRIES", "3")),
+            base_delay=float(os.getenv("LLM_RETRY_BASE_DELAY", "0.5")),
+            max_delay=float(os.getenv("LLM_RETRY_MAX_DELAY", "8")),
+            timeout=float(os.getenv("LLM_REQUEST_TIMEOUT", "60")),
+            hedge=os.getenv("LLM_HEDGE_REQUESTS", "").lower() in ("1", "true", "yes"),
+            hedge_delay=float(os.getenv("LLM_HEDGE_DELAY", "0")),
+        )
+
+    def backoff(self, attempt: int, retry_after: Optional[float] = None) -> float:
+        """Full-jitter exponential delay, never shorter than a Retry-After hint."""
+        delay = random.uniform(0, min(self.max_delay, self.base_delay * (2**attempt)))
+        if retry_after is not None:
+            delay = max(delay, min(retry_after, self.max_delay))
+        return delay
+
+
+class LatencyTracker:
+    """Rolling window of successful request latencies."""
+
+    def __init__(self, window: int = 200, min_samples: int = 20):
+        self.min_samples = min_samples
+        self._samples: "deque[float]" = deque(maxlen=window)
+        self._lock = threading.Lock()
+
+    def add(self, seconds: float) -> None:
+        with self._lock:
+            self._samples.append(seconds)
+
+    def percentile(self, pct: float) -> Optional[float]:
+        """Return the pct-th percentile, or None until min_samples are seen."""
+        with self._lock:
+            if len(self._samples) < self.min_samples:
+                return None
+            ordered = sorted(self._samples)
+        return ordered[min(len(ordered) - 1, int(pct / 100 * len(ordered)))]
+
+
+class RequestMetrics:
+    """Thread-safe counters describing API request outcomes."""
+
+    FIELDS = (
+        "attempts",
+        "successes",
+        "retries",
+        "timeouts",
+        "failures",
+        "hedges_fired",
+        "hedges_won",
+    )
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._counts = dict.fromkeys(self.FIELDS, 0)
+
+    def incr(self, field: str, amount: int = 1) -> None:
+        with self._lock:
+            self._counts[field] += amount
+
+    def snapshot(self) -> Dict[str, int]:
+        with self._lock:
+            return dict(self._counts)
+
+    def reset(self) -> None:
+        with self._lock:
+            self._counts = dict.fromkeys(self.FIELDS, 0)
+
+
+def is_retryable(error: BaseException) -> bool:
+    """Timeouts, connection errors, 429s and 5xx responses are worth retrying."""
+    if isinstance(error, (openai.APITimeoutError, openai.APIConnectionError)):
+        return True
+    if isinstance(error, openai.APIStatusError):
+        return error.status_code == 429 or error.status_code >= 500
+    return False
+
+
+def _retry_after(error: BaseException) -> Optional[float]:
+    response = getattr(error, "response", None)
+    headers = getattr(response, "headers", None) or {}
+    try:
+        return float(headers.get("retry-after"))
+    except (TypeError, ValueError):
+        return None
+
+
+_hedge_executor: Optional[ThreadPoolExecutor] = None
+_hedge_executor_lock = threading.Lock()
+
+
+def _get_hedge_executor() -> ThreadPoolExecutor:
+    global _hedge_executor
+    with _hedge_executor_lock:
+        if _hedge_executor is None:
+            _hedge_executor = ThreadPoolExecutor(
+                max_workers=int(os.getenv("LLM_HEDGE_WORKERS", "16")),
+                thread_name_prefix="llm-hedge",
+            )
+        return _hedge_executor
+
+
+def _hedge_after(policy: RetryPolicy, latencies: LatencyTracker) -> Optional[float]:
+    """Seconds to wait before sending a duplicate request, or None to not hedge."""
+    if not policy.hedge:
+        return None
+    p95 = latencies.percentile(95)
+    if p95 is not None:
+        return p95
+    return policy.hedge_delay or None
+
+
+def _hedged(fn: Callable[[], Any], delay: float, metrics: RequestMetrics) -> Any:
+    executor = _get_hedge_executor()
+    primary = executor.submit(fn)
+    try:
+        return primary.result(timeout=delay)
+    except FutureTimeoutError:
+        pass
+
+    metrics.incr("hedges_fired")
+    hedge = executor.submit(fn)
+    pending = {primary, hedge}
+    error = None
+    try:
+        while pending:
+            done, pending = wait(pending, return_when=FIRST_COMPLETED)
+            for future in done:
+                if future.exception() is None:
+                    if future is hedge:
+                        metrics.incr("hedges_won")
+                    return future.result()
+                error = future.exception()
+        raise error
+    finally:
+        # A loser still queued never starts. One already running can't be
+        # interrupted: it holds its worker until the request returns (at most
+        # the request timeout), so LLM_HEDGE_WORKERS should allow for that
+        for future in pending:
+            future.cancel()
+
+
+async def _ahedged(
+    fn: Callable[[], Awaitable[Any]], delay: float, metrics: RequestMetrics
+) -> Any:
+    primary = asyncio.ensure_future(fn())
+    done, _ = await asyncio.wait({primary}, timeout=delay)
+    if done:
+        return primary.result()
+
+    metrics.incr("hedges_fired")
+    hedge = asyncio.ensure_future(fn())
+    pending = {primary, hedge}
+    error = None
+    try:
+        while pending:
+            done, pending = await asyncio.wait(pending, return_when=FIRST_COMPLETED)
+            for task in done:
+                if task.exception() is None:
+                    if task is hedge:
+                        metrics.incr("hedges_won")
+                    return task.result()
+                error = task.exception()
+        raise error
+    finally:
+        for task in pending:
+            task.cancel()
+
+
+def call_with_retries(
+    fn: Callable[[], Any],
+    policy: RetryPolicy,
+    metrics: RequestMetrics,
+    latencies: LatencyTracker,
+) -> Any:
+    """Call fn, retrying retryable errors with backoff and optionally hedging."""
+    for attempt in range(policy.max_retries + 1):
+        metrics.incr("attempts")
+        start = time.perf_counter()
+        try:
+            hedge_delay = _hedge_after(policy, latencies)
+            if hedge_delay is None:
+                result = fn()
+            else:
+                result = _hedged(fn, hedge_delay, metrics)
+        except Exception as e:
+            if isinstance(e, openai.APITimeoutError):
+                metrics.incr("timeouts")
+            if not is_retryable(e) or attempt == policy.max_retries:
+                metrics.incr("failures")
+                raise LLMRequestError(
+                    f"{type(e).__name__}: {e} (after {attempt + 1} attempts)"
+                ) from e
+            metrics.incr("retries")
+            time.sleep(policy.backoff(attempt, _retry_after(e)))
+            continue
+
+        latencies.add(time.perf_counter() - start)
+        metrics.incr("successes")
+        return result
+
+
+async def acall_with_retries(
+    fn: Callable[[], Awaitable[Any]],
+    policy: RetryPolicy,
+    metrics: RequestMetrics,
+    latencies: LatencyTracker,
+) -> Any:
+    """Async counterpart of call_with_retries."""
+    for attempt in range(policy.max_retries + 1):
+        metrics.incr("attempts")
+        start = time.perf_counter()
+        try:
+            hedge_delay = _hedge_after(policy, latencies)
+            if hedge_delay is None:
+                result = await fn()
+            else:
+                result = await _ahedged(fn, hedge_delay, metrics)
+        except Exception as e:
+            if isinstance(e, openai.APITimeoutError):
+                metrics.incr("timeouts")
+            if not is_retryable(e) or attempt == policy.max_retries:
+                metrics.incr("failures")
+                raise LLMRequestError(
+                    f"{type(e).__name__}: {e} (after {attempt + 1} attempts)"
+                ) from e
+            metrics.incr("retries")
+            await asyncio.sleep(policy.backoff(attempt, _retry_after(e)))
+            continue
+
+        latencies.add(time.perf_counter() - start)
+        metrics.incr("successes")
+        return result
+
+
+__all__ = [
+    "LLMRequestError",
+    "RetryPolicy",
+    "LatencyTracker",
+    "RequestMetrics",
+    "call_with_retries",
+    "acall_with_retries",
+    "is_retryable",
+]
@@ -1,3 +1,4 @@
+import asyncio
 import sys
 import os
 import shutil
@@ -8,9 +9,10 @@ sys.path.append("scripts")
 sys.path.append(".")
 
 from .agent import ReActAgent
-from .llm import get_llm
-from .react_runner import run_react_loop
+from .llm import get_routed_llm
+from .react_runner import arun_react_loop, run_react_loop
 from src.tools import known_actions
+from src.tools.ci_runner import load_ci_pipeline
 
 
 def orchestrate_ci_fix(seed_name):
@@ -56,6 +58,58 @@ def orchestrate_ci_fix(seed_name):
         }
 
 
+async def aorchestrate_ci_fix(seed_name):
+    """Asyncio variant of orchestrate_ci_fix for driving many seeds on one loop."""
+    try:
+        workspace_result = await asyncio.to_thread(create_error_workspace, seed_name)
+        if workspace_result["status"] == "fail":
+            return workspace_result
+
+        workspace_path = Path(workspace_result["data"]["workspace_path"])
+        error_info = workspace_result["data"]["error_info"]
+
+        try:
+            agent = ReActAgent(known_actions, get_routed_llm())
+            result = await arun_react_loop(agent, str(workspace_path), max_turns=10)
+            agent_result = {
+                "status": "pass" if result == "success" else "fail",
+                "data": {"result": result},
+            }
+        except Exception as e:
+            return {
+                "status": "fail",
+                "error": f"Agent execution failed in workspace '{workspace_path}': {type(e).__name__}: {str(e)}",
+            }
+
+        ci_result = await asyncio.to_thread(check_ci_status, workspace_path)
+        success = agent_result["status"] == "pass" and ci_result["status"] == "pass"
+
+        return {
+            "status": "pass" if success else "fail",
+            "data": {
+                "seed_scenario": seed_name,
+                "error_description": error_info.get("description", ""),
+                "agent_result": agent_result["data"]["result"],
+                "final_ci_status": ci_result.get("data", {}).get(
+                    "overall_status", "unknown"
+                ),
+                "workspace": str(workspace_path),
+            },
+            "error": (
+                None
+                if success
+                else f"Agent result: {agent_result['status']}, CI status: {ci_result.get('status', 'unknown')}, Final CI: {ci_result.get('data', {}).get('overall_status', 'unknown')}"
+            ),
+        }
+
+    except Exception as e:
+        return {
+            "status": "fail",
+            "error": f"Orchestration failed at main level: {type(e).__name__}: {str(e)}",
+            "data": {"seed_scenario": seed_name},
+        }
+
+
 def create_error_workspace(seed_name):
     try:
         workspaces_dir = Path("workspaces")
@@ -93,7 +147,7 @@ def create_error_workspace(seed_name):
 
 def run_ci_agent(workspace_path):
     try:
-        llm = get_llm()
+        llm = get_routed_llm()
         agent = ReActAgent(known_actions, llm)
         result = run_react_loop(agent, str(workspace_path), max_turns=10)
 
@@ -110,10 +164,7 @@ def run_ci_agent(workspace_path):
 
 
 def check_ci_status(workspace_path):
-    original_cwd = os.getcwd()
     try:
-        import importlib.util
-
         workspace_path = Path(workspace_path).resolve()
         ci_pipeline_path = workspace_path / "ci_pipeline.py"
 
@@ -123,13 +174,8 @@ def check_ci_status(workspace_path):
                 "error": f"CI pipeline file missing: {ci_pipeline_path} does not exist",
             }
 
-        os.chdir(workspace_path)
-
-        spec = importlib.util.spec_from_file_location("ci_pipeline", ci_pipeline_path)
-        ci_pipeline_module = importlib.util.module_from_spec(spec)
-        spec.loader.exec_module(ci_pipeline_module)
-
-        pipeline = ci_pipeline_module.CIPipeline(".")
+        ci_pipeline_module = load_ci_pipeline(ci_pipeline_path)
+        pipeline = ci_pipeline_module.CIPipeline(workspace_path)
         result = pipeline.run_all_checks()
 
         return {
@@ -142,5 +188,3 @@ def check_ci_status(workspace_path):
             "status": "fail",
             "error": f"CI status check failed in workspace '{workspace_path}': {type(e).__name__}: {str(e)}",
         }
-    finally:
-        os.chdir(original_cwd)
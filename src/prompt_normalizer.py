@@ -0,0 +1,117 @@
+"""Prompt normalization applied before computing LLM cache keys"""
+
+from __future__ import annotations
+
+import json
+import os
+import re
+import threading
+from typing import Callable, Dict, Iterable, List, Optional, Pattern, Tuple, Union
+
+Replacement = Union[str, Callable[["re.Match[str]"], str]]
+
+# Volatile fragments that do not change what the model should answer
+DEFAULT_RULES: List[Tuple[str, Replacement]] = [
+    # Per-worker scratch dirs: temp_baseline_{worker_id}_{pid}_{seed}
+    (r"temp_baseline_[\w.-]+_\d+_", "temp_baseline_"),
+    (r"(?:/private)?/tmp/[\w.-]+", "<tmp>"),
+    (r"/var/folders/[\w./-]+?/T/[\w.-]+", "<tmp>"),
+    (r"\b(pid|process)([=: ]+)\d+", r"\1\2<pid>"),
+    (r"\b(?:ThreadPoolExecutor-\d+_\d+|Thread-\d+(?: \(\w+\))?|MainThread)\b", "<thread>"),
+    (
+        r"\b\d{4}-\d{2}-\d{2}[T ]\d{2}:\d{2}:\d{2}(?:[.,]\d+)?(?:Z|[+-]\d{2}:?\d{2})?",
+        "<timestamp>",
+    ),
+    # pytest / unittest timings, e.g. "1 failed in 0.12s", "Ran 3 tests in 0.004s"
+    (r"\bin \d+(?:\.\d+)?s\b", "in <duration>"),
+    (r"\b\d+(?:\.\d+)?\s?(?:ms|seconds)\b", "<duration>"),
+    (r"\b0x[0-9a-fA-F]{6,}\b", "0x<addr>"),
+]
+
+
+class PromptNormalizer:
+    """Scrub paths, pids, timestamps and canonicalize embedded JSON.
+
+    The normalized text is only used to build the cache key; the request sent
+    to the model is unchanged. ``roots`` are absolute directories rewritten to
+    ``<root>``; by default the current directory, looked up at call time.
+    """
+
+    def __init__(
+        self,
+        rules: Iterable[Tuple[str, Replacement]] = DEFAULT_RULES,
+        roots: Optional[Iterable[str]] = None,
+        canonicalize_json: bool = True,
+    ):
+        self._rules: List[Tuple[Pattern[str], Replacement]] = [
+            (re.compile(pattern), repl) for pattern, repl in rules
+        ]
+        self._roots = list(roots) if roots is not None else None
+        self.canonicalize_json = canonicalize_json
+        self._lock = threading.Lock()
+        self._calls = 0
+        self._changed = 0
+
+    def add_rule(self, pattern: str, replacement: Replacement) -> None:
+        """Append a regex substitution applied after the existing rules."""
+        self._rules.append((re.compile(pattern), replacement))
+
+    def _current_roots(self) -> List[str]:
+        if self._roots is not None:
+            roots = self._roots
+        else:
+            roots = [os.getcwd()]
+        # Longest first so nested roots are replaced as a whole
+        roots = {r.rstrip(os.sep) for r in roots if len(r) > 1}
+        return sorted(roots, key=len, reverse=True)
+
+    def __call__(self, text: str) -> str:
+        if not text:
+            return text
+        normalized = text
+        for pattern, repl in self._rules:
+            normalized = pattern.sub(repl, normalized)
+        for root in self._current_roots():
+            normalized = normalized.replace(root, "<root>")
+        if self.canonicalize_json:
+            normalized = canonicalize_embedded_json(normalized)
+
+        with self._lock:
+            self._calls += 1
+            if normalized != text:
+                self._changed += 1
+        return normalized
+
+    def stats(self) -> Dict[str, int]:
+        """Return how many prompts were normalized and how many changed."""
+        with self._lock:
+            return {"normalized": self._calls, "normalized_changed": self._changed}
+
+
+_decoder = json.JSONDecoder()
+
+
+def canonicalize_embedded_json(text: str) -> str:
+    """Re-serialize JSON objects found in text with sorted keys and no padding.
+
+    CI output is printed with ``json.dumps(indent=2)``; canonical form makes
+    whitespace and key-order differences irrelevant for the cache key.
+    """
+    parts = []
+    pos = 0
+    start = text.find("{")
+    while start != -1:
+        try:
+            value, end = _decoder.raw_decode(text, start)
+        except ValueError:
+            start = text.find("{", start + 1)
+            continue
+        parts.append(text[pos:start])
+        parts.append(json.dumps(value, sort_keys=True, separators=(",", ":")))
+        pos = end
+        start = text.find("{", end)
+    parts.append(text[pos:])
+    return "".join(parts)
+
+
+__all__ = ["PromptNormalizer", "DEFAULT_RULES", "canonicalize_embedded_json"]
@@ -0,0 +1,143 @@
+"""Cross-process token-bucket rate limiting for LLM traffic"""
+
+from __future__ import annotations
+
+import os
+import struct
+import threading
+import time
+from typing import Dict, Optional
+
+try:
+    import fcntl
+except ImportError:  # pragma: no cover - Windows falls back to a process-local lock
+    fcntl = None
+
+# requests balance, requests timestamp, tokens balance, tokens timestamp
+_STATE = struct.Struct("<dddd")
+
+
+class SharedRateLimiter:
+    """Requests-per-minute and tokens-per-minute buckets shared via a file.
+
+    Every process reserves capacity under an exclusive lock on the state file.
+    Balances may go negative: a reservation that overdraws a bucket is told how
+    long to wait until the refill covers it, so concurrent callers are spaced
+    out at the configured rate instead of bursting and then stalling on 429s.
+    A limit of 0 disables that bucket.
+    """
+
+    def __init__(
+        self,
+        path: str,
+        requests_per_minute: float = 0,
+        tokens_per_minute: float = 0,
+        burst_seconds: float = 5.0,
+    ):
+        self.path = path
+        self.rpm = requests_per_minute
+        self.tpm = tokens_per_minute
+        # Allow up to burst_seconds of traffic (and at least one request) at once
+        self.request_capacity = max(1.0, self.rpm / 60.0 * burst_seconds)
+        self.token_capacity = max(1.0, self.tpm / 60.0 * burst_seconds)
+        self._lock = threading.Lock()
+        self._fd: Optional[int] = None
+        self._pid: Optional[int] = None
+        self._waits = 0
+        self._waited = 0.0
+
+    @property
+    def enabled(self) -> bool:
+        return self.rpm > 0 or self.tpm > 0
+
+    def _get_fd(self) -> int:
+        if self._fd is None or self._pid != os.getpid():
+            os.makedirs(os.path.dirname(os.path.abspath(self.path)), exist_ok=True)
+            self._fd = os.open(self.path, os.O_RDWR | os.O_CREAT, 0o644)
+            self._pid = os.getpid()
+        return self._fd
+
+    @staticmethod
+    def _refill(balance, updated, now, rate_per_minute, capacity):
+        if updated <= 0:
+            return capacity  # Fresh state file starts with full buckets
+        return min(capacity, balance + (now - updated) * rate_per_minute / 60.0)
+
+    def reserve(self, tokens: int = 0) -> float:
+        """Reserve one request and tokens; return seconds to wait before sending."""
+        if not self.enabled:
+            return 0.0
+
+        with self._lock:
+            fd = self._get_fd()
+            if fcntl is not None:
+                fcntl.flock(fd, fcntl.LOCK_EX)
+            try:
+                raw = os.pread(fd, _STATE.size, 0)
+                if len(raw) == _STATE.size:
+                    req, req_at, tok, tok_at = _STATE.unpack(raw)
+                else:
+                    req, req_at, tok, tok_at = 0.0, 0.0, 0.0, 0.0
+
+                now = time.time()
+                wait = 0.0
+                if self.rpm > 0:
+                    req = self._refill(req, req_at, now, self.rpm, self.request_capacity)
+                    req -= 1
+                    if req < 0:
+                        wait = max(wait, -req * 60.0 / self.rpm)
+                if self.tpm > 0:
+                    tok = self._refill(tok, tok_at, now, self.tpm, self.token_capacity)
+                    tok -= tokens
+                    if tok < 0:
+                        wait = max(wait, -tok * 60.0 / self.tpm)
+
+                os.pwrite(fd, _STATE.pack(req, now, tok, now), 0)
+            finally:
+                if fcntl is not None:
+                    fcntl.flock(fd, fcntl.LOCK_UN)
+
+            if wait > 0:
+                self._waits += 1
+                self._waited += wait
+            return wait
+
+    def acquire(self, tokens: int = 0) -> float:
+        """Block until the reservation is allowed; return the time waited."""
+        wait = self.reserve(tokens)
+        if wait > 0:
+            time.sleep(wait)
+        return wait
+
+    def settle(self, estimated: int, actual: int) -> None:
+        """Correct the token bucket once the real usage of a request is known."""
+        if self.tpm <= 0 or actual == estimated:
+            return
+        with self._lock:
+            fd = self._get_fd()
+            if fcntl is not None:
+                fcntl.flock(fd, fcntl.LOCK_EX)
+            try:
+                raw = os.pread(fd, _STATE.size, 0)
+                if len(raw) != _STATE.size:
+                    return
+                req, req_at, tok, tok_at = _STATE.unpack(raw)
+                tok = min(self.token_capacity, tok + estimated - actual)
+                os.pwrite(fd, _STATE.pack(req, req_at, tok, tok_at), 0)
+            finally:
+                if fcntl is not None:
+                    fcntl.flock(fd, fcntl.LOCK_UN)
+
+    def stats(self) -> Dict[str, float]:
+        """Return how often and how long this process was throttled."""
+        with self._lock:
+            return {"throttled": self._waits, "throttled_seconds": round(self._waited, 3)}
+
+
+def estimate_tokens(messages, max_tokens: int) -> int:
+    """Rough token estimate (4 characters per token) plus the completion budget."""
+    chars = sum(len(m.get("content") or "") for m in messages)
+    return chars // 4 + max_tokens
+
+
+__all__ = ["SharedRateLimiter", "estimate_tokens"]
@@ -0,0 +1,178 @@
+"""Request coalescing for identical in-flight LLM calls"""
+
+from __future__ import annotations
+
+import asyncio
+import contextlib
+import os
+import threading
+import time
+import weakref
+import zlib
+from typing import Any, Awaitable, Callable, Dict, Iterator
+
+try:
+    import fcntl
+except ImportError:  # pragma: no cover - Windows has no POSIX record locks
+    fcntl = None
+
+
+class _Call:
+    def __init__(self):
+        self.event = threading.Event()
+        self.result: Any = None
+        self.error: BaseException = None
+
+
+class SingleFlight:
+    """Run at most one call per key at a time within the process.
+
+    The first caller for a key executes the function; callers that arrive while
+    it is running block and receive the same result (or exception).
+    """
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._calls: Dict[str, _Call] = {}
+
+    def do(self, key: str, fn: Callable[[], Any]) -> Any:
+        with self._lock:
+            call = self._calls.get(key)
+            leader = call is None
+            if leader:
+                call = _Call()
+                self._calls[key] = call
+
+        if not leader:
+            call.event.wait()
+            if call.error is not None:
+                raise call.error
+            return call.result
+
+        try:
+            call.result = fn()
+            return call.result
+        except BaseException as e:
+            call.error = e
+            raise
+        finally:
+            with self._lock:
+                del self._calls[key]
+            call.event.set()
+
+    def in_flight(self) -> int:
+        with self._lock:
+            return len(self._calls)
+
+
+class _AsyncCall:
+    def __init__(self, task: "asyncio.Task"):
+        self.task = task
+        self.waiters = 0
+
+
+class AsyncSingleFlight:
+    """Asyncio counterpart of SingleFlight, scoped to each event loop.
+
+    The call runs as its own task that every caller awaits through
+    ``asyncio.shield``, so cancelling one caller (e.g. a client timeout)
+    leaves the others waiting; the call is cancelled only when no caller is
+    left.
+    """
+
+    def __init__(self):
+        # Calls in flight per event loop
+        self._calls: "weakref.WeakKeyDictionary[Any, Dict[str, _AsyncCall]]" = (
+            weakref.WeakKeyDictionary()
+        )
+
+    async def do(self, key: str, fn: Callable[[], Awaitable[Any]]) -> Any:
+        loop = asyncio.get_running_loop()
+        calls = self._calls.setdefault(loop, {})
+
+        call = calls.get(key)
+        if call is None:
+
+            async def run() -> Any:
+                try:
+                    return await fn()
+                finally:
+                    if calls.get(key) is call:
+                        del calls[key]
+
+            call = _AsyncCall(loop.create_task(run()))
+            calls[key] = call
+
+        call.waiters += 1
+        try:
+            return await asyncio.shield(call.task)
+        finally:
+            call.waiters -= 1
+            if not call.waiters and not call.task.done():
+                call.task.cancel()  # Every caller gave up
+
+
+class StripedFileLock:
+    """Cross-process per-key lock built on byte-range locks in one file.
+
+    Keys are hashed onto a fixed number of stripes, so a single lock file
+    serves every key. POSIX record locks are owned by the process, which makes
+    this a coordination point between processes only; threads in the same
+    process are deduplicated by SingleFlight first. Where fcntl is unavailable
+    the lock is a no-op.
+    """
+
+    def __init__(self, path: str, stripes: int = 4096, timeout: float = 120.0):
+        self.path = path
+        self.stripes = stripes
+        self.timeout = timeout
+        self._fd = None
+        self._pid = None
+        self._lock = threading.Lock()
+
+    def _get_fd(self) -> int:
+        with self._lock:
+            if self._fd is None or self._pid != os.getpid():
+                os.makedirs(os.path.dirname(os.path.abspath(self.path)), exist_ok=True)
+                self._fd = os.open(self.path, os.O_RDWR | os.O_CREAT, 0o644)
+                self._pid = os.getpid()
+            return self._fd
+
+    def _stripe(self, key: str) -> int:
+        return zlib.crc32(key.encode()) % self.stripes
+
+    def acquire(self, key: str) -> bool:
+        """Wait up to timeout for the key's stripe; return whether it was taken."""
+        if fcntl is None:
+            return False
+
+        fd = self._get_fd()
+        offset = self._stripe(key)
+        deadline = time.monotonic() + self.timeout
+        delay = 0.005
+        while True:
+            try:
+                fcntl.lockf(fd, fcntl.LOCK_EX | fcntl.LOCK_NB, 1, offset)
+                return True
+            except OSError:
+                if time.monotonic() >= deadline:
+                    return False  # Give up coalescing rather than stall forever
+                time.sleep(delay)
+                delay = min(delay * 2, 0.1)
+
+    def release(self, key: str) -> None:
+        if fcntl is None:
+            return
+        fcntl.lockf(self._get_fd(), fcntl.LOCK_UN, 1, self._stripe(key))
+
+    @contextlib.contextmanager
+    def hold(self, key: str) -> Iterator[bool]:
+        acquired = self.acquire(key)
+        try:
+            yield acquired
+        finally:
+            if acquired:
+                self.release(key)
+
+
+__all__ = ["SingleFlight", "AsyncSingleFlight", "StripedFileLock"]
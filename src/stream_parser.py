@@ -0,0 +1,159 @@
+"""Incremental extraction of tool calls from streamed LLM output"""
+
+from __future__ import annotations
+
+import contextvars
+import json
+import re
+import threading
+from typing import Any, Dict, Iterable, Iterator, Optional
+
+
+class ToolCallStreamParser:
+    """Scan streamed JSON text and emit the tool call object once it is complete.
+
+    Only the top-level object is tracked: when the value of its ``tool_call``
+    key closes, the value is decoded and returned from ``feed`` so the caller
+    can act on it while the rest of the response (e.g. a trailing
+    ``reasoning`` string) is still being generated.
+    """
+
+    def __init__(self, key: str = "tool_call"):
+        self.key = key
+        self.text = ""
+        self.tool_call: Optional[Any] = None
+        self._pos = 0
+        self._depth = 0
+        self._in_string = False
+        self._escape = False
+        self._string_start = 0
+        self._last_string: Optional[str] = None
+        self._current_key: Optional[str] = None
+        self._value_start: Optional[int] = None
+
+    def feed(self, chunk: str) -> Optional[Any]:
+        """Consume a chunk; return the tool call the first time it completes."""
+        self.text += chunk
+        if self.tool_call is not None:
+            return None
+
+        text = self.text
+        for i in range(self._pos, len(text)):
+            c = text[i]
+
+            if self._in_string:
+                if self._escape:
+                    self._escape = False
+                elif c == "\\":
+                    self._escape = True
+                elif c == '"':
+                    self._in_string = False
+                    if self._depth == 1:
+                        self._last_string = text[self._string_start + 1 : i]
+                continue
+
+            if c == '"':
+                self._in_string = True
+                self._string_start = i
+            elif c == ":" and self._depth == 1:
+                self._current_key = self._last_string
+            elif c == "," and self._depth == 1:
+                self._current_key = None
+            elif c in "{[":
+                if self._depth == 1 and self._current_key == self.key:
+                    self._value_start = i
+                self._depth += 1
+            elif c in "}]":
+                self._depth -= 1
+                if self._depth == 1 and self._value_start is not None:
+                    try:
+                        self.tool_call = json.loads(text[self._value_start : i + 1])
+                    except json.JSONDecodeError:
+                        pass
+                    self._value_start = None
+                    self._current_key = None
+                    if self.tool_call is not None:
+                        self._pos = i + 1
+                        return self.tool_call
+
+        self._pos = len(text)
+        return None
+
+
+def parse_reasoning_json(text: str) -> Optional[Dict[str, Any]]:
+    """Parse a complete reasoning response, tolerating markdown code fences."""
+    match = re.search(r"\{.*\}", text, re.DOTALL)
+    if not match:
+        return None
+    try:
+        data = json.loads(match.group())
+    except json.JSONDecodeError:
+        return None
+    return data if isinstance(data, dict) else None
+
+
+class StreamedReasoning:
+    """Reasoning result whose tool call is available before the stream ends.
+
+    ``wait_for_tool_call`` reads tokens until the tool call is complete, then
+    keeps draining the remaining tokens on a background thread (which lets the
+    LLM layer cache the full text). ``result`` waits for the stream to finish
+    and returns the full reasoning dict.
+    """
+
+    def __init__(self, tokens: Iterable[str], key: str = "tool_call"):
+        self._tokens: Iterator[str] = iter(tokens)
+        self._parser = ToolCallStreamParser(key)
+        self._drainer: Optional[threading.Thread] = None
+        self._error: Optional[BaseException] = None
+        self._started = False
+
+    def wait_for_tool_call(self) -> Optional[Any]:
+        """Block until the tool call is parsed (or the stream ends)."""
+        if self._started:
+            return self._parser.tool_call
+        self._started = True
+
+        try:
+            for token in self._tokens:
+                if self._parser.feed(token) is not None:
+                    break
+        except Exception as e:
+            self._error = e
+            return None
+
+        # Run in the caller's context so the call's usage record reaches its
+        # collect_usage / usage_scope
+        ctx = contextvars.copy_context()
+        self._drainer = threading.Thread(target=ctx.run, args=(self._drain,), daemon=True)
+        self._drainer.start()
+        return self._parser.tool_call
+
+    def _drain(self) -> None:
+        try:
+            for token in self._tokens:
+                self._parser.feed(token)
+        except Exception as e:
+            self._error = e
+
+    @property
+    def text(self) -> str:
+        return self._parser.text
+
+    def result(self, timeout: float = None) -> Dict[str, Any]:
+        """Return the full reasoning dict once the stream has been consumed."""
+        self.wait_for_tool_call()
+        if self._drainer is not None:
+            self._drainer.join(timeout)
+
+        data = parse_reasoning_json(self._parser.text)
+        if data is not None:
+            return data
+        if self._parser.tool_call is not None:
+            return {"reasoning": "", "tool_call": self._parser.tool_call}
+        if self._error is not None:
+            return {"error": f"Streaming failed: {self._error}"}
+        return {"error": f"Could not parse reasoning: {self._parser.text[:200]}"}
+
+
+__all__ = ["ToolCallStreamParser", "StreamedReasoning", "parse_reasoning_json"]
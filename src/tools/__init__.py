@@ -1,7 +1,9 @@
 """Tool registry and execution - PROVIDED"""
 
 # Import all tools
-from .ci_runner import run_ci_pipeline
+import asyncio
+
+from .ci_runner import arun_ci_pipeline, run_ci_pipeline
 from .file_analyzer import analyze_file
 from .syntax_fixer import fix_syntax_error
 from .import_manager import add_import
@@ -10,7 +12,7 @@ from .dependency_manager import add_dependency
 from .config_fixer import fix_yaml_syntax
 
 known_actions = {
-    "run_ci_pipeline": "Check CI status",
+    "run_ci_pipeline": "Check CI status (input: optional checks to run, e.g. syntax,lint)",
     "analyze_file": "Read file content and identify errors",
     "fix_syntax_error": "Fix Python syntax errors",
     "add_import": "Add missing import statement",
@@ -20,22 +22,22 @@ known_actions = {
 }
 
 
-def execute_action(action_name, params):
-    """Execute a tool action"""
+def execute_action(action_name, params, workspace=None):
+    """Execute a tool action; relative paths resolve against workspace (or the cwd)"""
     if action_name == "run_ci_pipeline":
-        return run_ci_pipeline()
+        return run_ci_pipeline(workspace, checks=params)
     elif action_name == "analyze_file":
-        return analyze_file(params)
+        return analyze_file(params, workspace)
     elif action_name == "fix_syntax_error":
-        return fix_syntax_error(params)
+        return fix_syntax_error(params, workspace)
     elif action_name == "add_import":
-        return add_import(params)
+        return add_import(params, workspace)
     elif action_name == "fix_test_assertion":
-        return fix_test_assertion(params)
+        return fix_test_assertion(params, workspace)
     elif action_name == "add_dependency":
-        return add_dependency(params)
+        return add_dependency(params, workspace)
     elif action_name == "fix_yaml_syntax":
-        return fix_yaml_syntax(params)
+        return fix_yaml_syntax(params, workspace)
     else:
         return {
             "action": "unknown_action",
@@ -44,4 +46,12 @@ def execute_action(action_name, params):
         }
 
 
+async def aexecute_action(action_name, params, workspace=None):
+    """Execute a tool action without blocking the event loop"""
+    if action_name == "run_ci_pipeline":
+        return await arun_ci_pipeline(workspace, checks=params)
+    # The remaining tools are quick file edits; run them on a worker thread
+    return await asyncio.to_thread(execute_action, action_name, params, workspace)
+
+
 # All tool implementations are now in separate files
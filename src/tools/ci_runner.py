@@ -1,17 +1,208 @@
+import asyncio
+import contextlib
+import contextvars
+import hashlib
+import inspect
+import json
+import os
+import re
+import socket
 import subprocess
 import sys
+import threading
+import types
 from pathlib import Path
 
+# CIPipeline checks, in the order the pipeline runs them
+CHECK_NAMES = ("syntax", "lint", "tests", "dependencies", "config", "security")
 
-def run_ci_pipeline():
-    """Run complete CI pipeline and return status"""
+# Loaded ci_pipeline.py modules by content hash; workspaces share one copy
+_pipeline_modules = {}
+_pipeline_modules_lock = threading.Lock()
+
+# Per-check wall times of in-process runs, for telemetry only (collect_ci_timings)
+_timings_collector = contextvars.ContextVar("ci_timings_collector", default=None)
+
+
+def load_ci_pipeline(ci_script):
+    """Import a ci_pipeline.py, reusing the module for identical content"""
+    source = Path(ci_script).read_bytes()
+    digest = hashlib.sha256(source).hexdigest()
+    with _pipeline_modules_lock:
+        module = _pipeline_modules.get(digest)
+        if module is None:
+            module = types.ModuleType(f"_ci_pipeline_{digest[:12]}")
+            module.__file__ = str(ci_script)
+            exec(compile(source, str(ci_script), "exec"), module.__dict__)
+            _pipeline_modules[digest] = module
+    return module
+
+
+def parse_checks(checks):
+    """Normalize a check subset ("syntax,lint" or a list) to a list of names.
+
+    Returns None, meaning the full pipeline, for an empty or "all" selection
+    or when any name is not a known check.
+    """
+    if isinstance(checks, str):
+        checks = re.split(r"[,\s]+", checks.strip())
+    names = [name for name in (checks or []) if name]
+    if not names or any(name not in CHECK_NAMES for name in names):
+        return None
+    selected = [name for name in CHECK_NAMES if name in names]
+    return selected if len(selected) < len(CHECK_NAMES) else None
+
+
+@contextlib.contextmanager
+def collect_ci_timings():
+    """Collect the per-check wall times of in-process runs made inside the
+    block (same thread/task, including asyncio.to_thread and child tasks).
+
+    Timings vary run to run, so they never go into the run_ci_pipeline
+    result: that is pasted into prompts and would defeat the LLM cache.
+    """
+    records = []
+    token = _timings_collector.set(records)
+    try:
+        yield records
+    finally:
+        _timings_collector.reset(token)
+
+
+def pop_ci_timings():
+    """Return and clear the timings collected so far in this context."""
+    records = _timings_collector.get()
+    if not records:
+        return []
+    taken = list(records)
+    records.clear()
+    return taken
+
+
+def _record_timings(timings, checks):
+    records = _timings_collector.get()
+    if records is not None and timings:
+        records.append({"checks": checks or list(CHECK_NAMES), "timings": timings})
+
+
+def _pipeline_result(passed, error=None, checks=None):
+    """run_ci_pipeline result; subset runs list their checks so a pass is
+    not mistaken for a fully green pipeline"""
+    result = {"action": "run_ci_pipeline", "status": "pass" if passed else "fail"}
+    if not passed:
+        result["error"] = error
+    if checks:
+        result["checks"] = checks
+    return result
+
+
+def ci_isolated():
+    """Subprocess isolation is opt-in with CI_RUNNER=subprocess"""
+    return os.getenv("CI_RUNNER", "inprocess").lower() == "subprocess"
+
+
+def ci_parallel():
+    """Run independent checks concurrently per CI_PARALLEL_CHECKS, by default
+    only with more than one CPU (lint and tests are both CPU-bound processes)"""
+    setting = os.getenv("CI_PARALLEL_CHECKS")
+    if setting is None:
+        return (os.cpu_count() or 1) > 1
+    return setting.lower() not in ("0", "false", "no")
+
+
+def _pipeline_class(ci_script, isolated):
+    """The workspace's CIPipeline, or None when it must run in a subprocess"""
+    if ci_isolated() if isolated is None else isolated:
+        return None
+    try:
+        return load_ci_pipeline(ci_script).CIPipeline
+    except Exception:
+        return None  # e.g. its imports are missing here: fall back to isolation
+
+
+def _worker_socket():
+    """CI_WORKER_SOCKET when a CI worker (python -m src.ci_worker serve) is up"""
+    path = os.getenv("CI_WORKER_SOCKET")
+    return path if path and os.path.exists(path) else None
+
+
+def _worker_timeout():
+    return {
+        "action": "run_ci_pipeline",
+        "status": "fail",
+        "error": "CI pipeline timed out on the CI worker",
+    }
+
+
+def _run_in_process(pipeline_class, workspace_path, checks=None, parallel=False):
+    workspace_path = workspace_path.absolute()
+    pipeline = pipeline_class(workspace_path)
+    supported = inspect.signature(pipeline.run_all_checks).parameters
+    options = {"parallel": parallel} if "parallel" in supported else {}
+    if checks and "only" in supported:
+        options["only"] = checks
+    else:
+        checks = None  # Pipeline predates check selection: run everything
+    result = pipeline.run_all_checks(**options)
+    # Wall times vary run to run; keep them out of the report the agent reads
+    _record_timings(result.pop("timings", None), checks)
+    if result["overall_status"] == "pass":
+        return _pipeline_result(True, checks=checks)
+    # Match `python3 ci_pipeline.py .`: file-walking checks report paths
+    # relative to the workspace (lint and tests already run with cwd=workspace)
+    prefix = f"{workspace_path}{os.sep}"
+    for check in result["checks"]:
+        if check["test"] not in ("lint", "tests") and check.get("error"):
+            check["error"] = check["error"].replace(prefix, "")
+    return _pipeline_result(
+        False, f"CI pipeline failed\n{json.dumps(result, indent=2)}\n", checks
+    )
+
+
+def _pipeline_command(checks, parallel):
+    command = ["python3", "ci_pipeline.py", "."]
+    if checks:
+        command += ["--only", ",".join(checks)]
+    return command + ["--parallel"] if parallel else command
+
+
+def run_ci_pipeline(workspace=None, isolated=None, checks=None, parallel=None):
+    """Run complete CI pipeline and return status
+
+    ``checks`` selects a subset such as "syntax,lint" (see parse_checks) for a
+    quick check after a fix; the reply then lists the checks that ran.
+    ``parallel`` (default from CI_PARALLEL_CHECKS) runs independent checks
+    concurrently; in-process runs record per-check wall times for
+    collect_ci_timings, never in the result.
+
+    A CI worker serves the run when CI_WORKER_SOCKET is set; a worker that
+    does not answer within CI_WORKER_TIMEOUT is reported as a timeout, not
+    retried locally. Without a worker the workspace's CIPipeline runs in this
+    process; with ``isolated`` (default from CI_RUNNER) or when it cannot be
+    imported here, ``ci_pipeline.py`` runs in a fresh interpreter instead.
+    """
     try:
-        workspace_path = Path.cwd()
+        workspace_path = Path(workspace) if workspace else Path.cwd()
+        checks = parse_checks(checks)
+        parallel = ci_parallel() if parallel is None else parallel
+        socket_path = _worker_socket()
+        if socket_path:
+            from ..ci_worker import request
+
+            try:
+                return request(str(workspace_path), socket_path, checks=checks)
+            except socket.timeout:
+                # The worker is running it: don't start the whole run over here
+                return _worker_timeout()
+            except (OSError, ValueError):
+                pass  # Worker unavailable: run locally
+
         ci_script = workspace_path / "ci_pipeline.py"
 
         if not ci_script.exists():
             result = subprocess.run(
                 ["python3", "-m", "pytest", "-v"],
+                cwd=workspace_path,
                 capture_output=True,
                 text=True,
                 timeout=60,
@@ -25,8 +216,12 @@ def run_ci_pipeline():
                     "error": f"Test failures:\n{result.stdout}\n{result.stderr}",
                 }
 
+        pipeline_class = _pipeline_class(ci_script, isolated)
+        if pipeline_class is not None:
+            return _run_in_process(pipeline_class, workspace_path, checks, parallel)
+
         result = subprocess.run(
-            ["python3", "ci_pipeline.py", "."],
+            _pipeline_command(checks, parallel),
             cwd=workspace_path,
             capture_output=True,
             text=True,
@@ -34,15 +229,86 @@ def run_ci_pipeline():
         )
 
         if result.returncode == 0:
-            return {"action": "run_ci_pipeline", "status": "pass"}
+            return _pipeline_result(True, checks=checks)
         else:
+            return _pipeline_result(False, f"CI pipeline failed\n{result.stdout}", checks)
+
+    except subprocess.TimeoutExpired:
+        return {
+            "action": "run_ci_pipeline",
+            "status": "fail",
+            "error": "CI pipeline timed out",
+        }
+    except Exception as e:
+        return {
+            "action": "run_ci_pipeline",
+            "status": "fail",
+            "error": f"CI error - {str(e)}",
+        }
+
+
+async def _arun(args, cwd, timeout):
+    """Run args without blocking the event loop; return (returncode, stdout, stderr)."""
+    proc = await asyncio.create_subprocess_exec(
+        *args,
+        cwd=cwd,
+        stdout=asyncio.subprocess.PIPE,
+        stderr=asyncio.subprocess.PIPE,
+    )
+    try:
+        stdout, stderr = await asyncio.wait_for(proc.communicate(), timeout)
+    except (asyncio.TimeoutError, asyncio.CancelledError):
+        proc.kill()
+        await proc.wait()
+        raise
+    return proc.returncode, stdout.decode(errors="replace"), stderr.decode(errors="replace")
+
+
+async def arun_ci_pipeline(workspace=None, isolated=None, checks=None, parallel=None):
+    """Async counterpart of run_ci_pipeline; in-process runs use a worker thread"""
+    try:
+        workspace_path = Path(workspace) if workspace else Path.cwd()
+        checks = parse_checks(checks)
+        parallel = ci_parallel() if parallel is None else parallel
+        socket_path = _worker_socket()
+        if socket_path:
+            from ..ci_worker import arequest
+
+            try:
+                return await arequest(str(workspace_path), socket_path, checks=checks)
+            except asyncio.TimeoutError:
+                return _worker_timeout()
+            except (OSError, ValueError):
+                pass  # Worker unavailable: run locally
+
+        ci_script = workspace_path / "ci_pipeline.py"
+
+        if not ci_script.exists():
+            returncode, stdout, stderr = await _arun(
+                ["python3", "-m", "pytest", "-v"], workspace_path, 60
+            )
+            if returncode == 0:
+                return {"action": "run_ci_pipeline", "status": "pass"}
             return {
                 "action": "run_ci_pipeline",
                 "status": "fail",
-                "error": f"CI pipeline failed\n{result.stdout}",
+                "error": f"Test failures:\n{stdout}\n{stderr}",
             }
 
-    except subprocess.TimeoutExpired:
+        pipeline_class = _pipeline_class(ci_script, isolated)
+        if pipeline_class is not None:
+            return await asyncio.to_thread(
+                _run_in_process, pipeline_class, workspace_path, checks, parallel
+            )
+
+        returncode, stdout, _ = await _arun(
+            _pipeline_command(checks, parallel), workspace_path, 120
+        )
+        if returncode == 0:
+            return _pipeline_result(True, checks=checks)
+        return _pipeline_result(False, f"CI pipeline failed\n{stdout}", checks)
+
+    except asyncio.TimeoutError:
         return {
             "action": "run_ci_pipeline",
             "status": "fail",
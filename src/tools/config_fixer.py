@@ -1,7 +1,11 @@
-def fix_yaml_syntax(params):
+from .paths import resolve_path
+
+
+def fix_yaml_syntax(params, workspace=None):
     """Fix YAML syntax: file:line:fix_type"""
     try:
         file_path, line_num, fix_type = params.split(":")
+        file_path = resolve_path(file_path, workspace)
         line_num = int(line_num)
 
         with open(file_path, "r") as f:
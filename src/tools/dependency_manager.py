@@ -1,7 +1,10 @@
-def add_dependency(package_name):
+from .paths import resolve_path
+
+
+def add_dependency(package_name, workspace=None):
     """Add package to requirements.txt"""
     try:
-        with open("requirements.txt", "a") as f:
+        with open(resolve_path("requirements.txt", workspace), "a") as f:
             f.write(f"\n{package_name}\n")
         return {"action": "add_dependency", "status": "pass"}
     except Exception as e:
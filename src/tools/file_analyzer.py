@@ -1,10 +1,10 @@
-import subprocess
+from .paths import resolve_path
 
 
-def analyze_file(filename):
+def analyze_file(filename, workspace=None):
     """Read file and identify errors"""
     try:
-        with open(filename, "r") as f:
+        with open(resolve_path(filename, workspace), "r") as f:
             lines = f.readlines()
 
         content = ""
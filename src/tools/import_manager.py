@@ -1,7 +1,11 @@
-def add_import(params):
+from .paths import resolve_path
+
+
+def add_import(params, workspace=None):
     """Add import: file:import_statement"""
     try:
         file_path, import_stmt = params.split(":", 1)
+        file_path = resolve_path(file_path, workspace)
 
         with open(file_path, "r") as f:
             content = f.read()
@@ -0,0 +1,10 @@
+"""Workspace-relative path resolution shared by the tools"""
+
+import os
+
+
+def resolve_path(path, workspace=None):
+    """Resolve path against workspace; relative paths use the cwd when it is None."""
+    if workspace is None or os.path.isabs(path):
+        return path
+    return os.path.join(workspace, path)
@@ -1,7 +1,11 @@
-def fix_syntax_error(params):
+from .paths import resolve_path
+
+
+def fix_syntax_error(params, workspace=None):
     """Fix syntax error: file:line:fix_type"""
     try:
         file_path, line_num, fix_type = params.split(":")
+        file_path = resolve_path(file_path, workspace)
         line_num = int(line_num)
 
         with open(file_path, "r") as f:
@@ -1,4 +1,7 @@
-def fix_test_assertion(params):
+from .paths import resolve_path
+
+
+def fix_test_assertion(params, workspace=None):
     """Fix test assertion: file:line:correct_value or file:line:param_name:correct_value"""
     try:
         parts = params.split(":")
@@ -8,6 +11,7 @@ def fix_test_assertion(params):
             file_path, line_num, _, correct_value = parts  # Skip param name
         else:
             raise ValueError(f"Expected 3 or 4 parts, got {len(parts)}")
+        file_path = resolve_path(file_path, workspace)
         line_num = int(line_num)
 
         with open(file_path, "r") as f: